@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'review',
     'users',
     'rest_framework',
@@ -145,15 +146,177 @@ PUSHGATEWAY_URL = os.environ.get('PUSHGATEWAY_URL', '').rstrip('/')
 PUSHGATEWAY_JOB_NAME = os.environ.get('PUSHGATEWAY_JOB_NAME', 'critic_refresh_review_items')
 PUSHGATEWAY_TIMEOUT_SECONDS = int(os.environ.get('PUSHGATEWAY_TIMEOUT_SECONDS', '5'))
 
+# Pooled keep-alive connections to external item providers (per provider session).
+UPSTREAM_HTTP_POOL_CONNECTIONS = int(os.environ.get('UPSTREAM_HTTP_POOL_CONNECTIONS', '4'))
+UPSTREAM_HTTP_POOL_MAXSIZE = int(os.environ.get('UPSTREAM_HTTP_POOL_MAXSIZE', '10'))
+UPSTREAM_HTTP_POOL_BLOCK = os.environ.get('UPSTREAM_HTTP_POOL_BLOCK', 'False').lower() == 'true'
+UPSTREAM_HTTP_POOL_TIMEOUT_SECONDS = float(os.environ.get('UPSTREAM_HTTP_POOL_TIMEOUT_SECONDS', '5'))
+# Async lookups (ASGI) hold many more requests in flight per worker.
+UPSTREAM_ASYNC_HTTP_MAX_CONNECTIONS = int(os.environ.get('UPSTREAM_ASYNC_HTTP_MAX_CONNECTIONS', '100'))
+
+# Cache backends. LocMemCache (LRU-evicting, per process) is the default; point
+# CACHE_BACKEND/CACHE_LOCATION at a shared backend in production.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+
+
+# Only Django's culling backends take MAX_ENTRIES; Redis and memcached pass
+# OPTIONS straight to their client, which rejects it.
+_CULLING_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+
+
+def _cache_options(max_entries: int) -> dict:
+    if CACHE_BACKEND in _CULLING_CACHE_BACKENDS:
+        return {'MAX_ENTRIES': max_entries}
+    return {}
+
+
+# State that must be the same in every web worker and refresh pod (circuit
+# breaker, upstream throttle, review ETag/Last-Modified versions, background
+# refresh dedup) lives in the 'shared' alias. It has to point at a
+# cross-process backend (DatabaseCache in the shipped k8s config, or Redis);
+# startup logs a warning when it resolves to LocMemCache.
+SHARED_CACHE_BACKEND = os.environ.get('SHARED_CACHE_BACKEND', CACHE_BACKEND)
+SHARED_CACHE_LOCATION = os.environ.get('SHARED_CACHE_LOCATION', CACHE_LOCATION)
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION or 'critic-default',
+    },
+    'shared': {
+        'BACKEND': SHARED_CACHE_BACKEND,
+        'LOCATION': SHARED_CACHE_LOCATION or 'critic-shared',
+        'KEY_PREFIX': 'shared',
+    },
+    'lookup': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION or 'critic-lookup',
+        'KEY_PREFIX': 'lookup',
+        'OPTIONS': _cache_options(int(os.environ.get('LOOKUP_CACHE_MAX_ENTRIES', '5000'))),
+    },
+    'review_list': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION or 'critic-review-list',
+        'KEY_PREFIX': 'review_list',
+        'OPTIONS': _cache_options(int(os.environ.get('REVIEW_LIST_CACHE_MAX_ENTRIES', '2000'))),
+    },
+}
+
+# Per-provider TTLs for cached external search results (0 disables caching).
+LOOKUP_SEARCH_CACHE_TTL_SECONDS = {
+    'omdb': int(os.environ.get('LOOKUP_SEARCH_CACHE_TTL_OMDB', '21600')),
+    'rawg': int(os.environ.get('LOOKUP_SEARCH_CACHE_TTL_RAWG', '21600')),
+    'jikan': int(os.environ.get('LOOKUP_SEARCH_CACHE_TTL_JIKAN', '3600')),
+}
+
+# Single-flight coalescing of identical upstream lookups across threads/workers.
+SINGLE_FLIGHT_CROSS_PROCESS = os.environ.get('SINGLE_FLIGHT_CROSS_PROCESS', 'True').lower() == 'true'
+SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS = float(os.environ.get('SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS', '30'))
+SINGLE_FLIGHT_RESULT_TTL_SECONDS = int(os.environ.get('SINGLE_FLIGHT_RESULT_TTL_SECONDS', '15'))
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR', '')
+
+# Review list search: 'auto' uses Postgres full-text search or SQLite FTS5
+# where available; 'like' forces the icontains scan.
+REVIEW_SEARCH_BACKEND = os.environ.get('REVIEW_SEARCH_BACKEND', 'auto')
+# match=fuzzy: minimum share of a query word's trigrams found in a title/tag
+# word (in-process index only; Postgres uses pg_trgm.word_similarity_threshold).
+REVIEW_FUZZY_THRESHOLD = float(os.environ.get('REVIEW_FUZZY_THRESHOLD', '0.6'))
+REVIEW_TRIGRAM_INDEX_MAX_AGE_SECONDS = int(os.environ.get('REVIEW_TRIGRAM_INDEX_MAX_AGE_SECONDS', '300'))
+# Exact review list counts are cached per filter set until the next review write.
+REVIEW_COUNT_CACHE_TTL_SECONDS = int(os.environ.get('REVIEW_COUNT_CACHE_TTL_SECONDS', '300'))
+# include_count=estimate: planner estimates below this are counted exactly (Postgres).
+REVIEW_COUNT_ESTIMATE_MIN_ROWS = int(os.environ.get('REVIEW_COUNT_ESTIMATE_MIN_ROWS', '1000'))
+# Serialize review list pages from values() rows instead of per-row DRF serializers.
+REVIEW_LIST_FAST_SERIALIZATION = os.environ.get('REVIEW_LIST_FAST_SERIALIZATION', 'True').lower() == 'true'
+# Anonymous review list responses are cached this long (0 disables); writes move requests to new keys.
+REVIEW_LIST_CACHE_TTL_SECONDS = int(os.environ.get('REVIEW_LIST_CACHE_TTL_SECONDS', '60'))
+# review_data=excerpt: characters of review_data returned (and read from the database) per row.
+REVIEW_EXCERPT_LENGTH = int(os.environ.get('REVIEW_EXCERPT_LENGTH', '280'))
+
+# Per-provider circuit breaker for upstream lookups (state in the 'shared' cache).
+UPSTREAM_CIRCUIT_BREAKER_ENABLED = os.environ.get('UPSTREAM_CIRCUIT_BREAKER_ENABLED', 'True').lower() == 'true'
+UPSTREAM_CIRCUIT_WINDOW_SECONDS = int(os.environ.get('UPSTREAM_CIRCUIT_WINDOW_SECONDS', '60'))
+UPSTREAM_CIRCUIT_MIN_REQUESTS = int(os.environ.get('UPSTREAM_CIRCUIT_MIN_REQUESTS', '5'))
+UPSTREAM_CIRCUIT_ERROR_RATE = float(os.environ.get('UPSTREAM_CIRCUIT_ERROR_RATE', '0.5'))
+UPSTREAM_CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get('UPSTREAM_CIRCUIT_SLOW_CALL_SECONDS', '5'))
+UPSTREAM_CIRCUIT_SLOW_CALL_RATE = float(os.environ.get('UPSTREAM_CIRCUIT_SLOW_CALL_RATE', '0.5'))
+UPSTREAM_CIRCUIT_OPEN_SECONDS = int(os.environ.get('UPSTREAM_CIRCUIT_OPEN_SECONDS', '30'))
+
+# Adaptive (AIMD) request rate per provider: starts at the max, grows by
+# UPSTREAM_THROTTLE_INCREASE_RPS per success and is multiplied by
+# UPSTREAM_THROTTLE_DECREASE_FACTOR on each 429. Kept in the 'shared' cache.
+UPSTREAM_THROTTLE_ENABLED = os.environ.get('UPSTREAM_THROTTLE_ENABLED', 'True').lower() == 'true'
+UPSTREAM_THROTTLE_MAX_RPS = {
+    'omdb': float(os.environ.get('UPSTREAM_THROTTLE_MAX_RPS_OMDB', '10')),
+    'rawg': float(os.environ.get('UPSTREAM_THROTTLE_MAX_RPS_RAWG', '5')),
+    'jikan': float(os.environ.get('UPSTREAM_THROTTLE_MAX_RPS_JIKAN', '1')),
+}
+UPSTREAM_THROTTLE_MIN_RPS = float(os.environ.get('UPSTREAM_THROTTLE_MIN_RPS', '0.2'))
+UPSTREAM_THROTTLE_INCREASE_RPS = float(os.environ.get('UPSTREAM_THROTTLE_INCREASE_RPS', '0.1'))
+UPSTREAM_THROTTLE_DECREASE_FACTOR = float(os.environ.get('UPSTREAM_THROTTLE_DECREASE_FACTOR', '0.5'))
+UPSTREAM_THROTTLE_MAX_WAIT_SECONDS = float(os.environ.get('UPSTREAM_THROTTLE_MAX_WAIT_SECONDS', '30'))
+
+# Total time budget for upstream calls made while serving a lookup request.
+LOOKUP_SEARCH_DEADLINE_SECONDS = float(os.environ.get('LOOKUP_SEARCH_DEADLINE_SECONDS', '8'))
+LOOKUP_DETAILS_DEADLINE_SECONDS = float(os.environ.get('LOOKUP_DETAILS_DEADLINE_SECONDS', '12'))
+# Federated search: per-provider budget and size of the shared fan-out thread pool.
+LOOKUP_FEDERATED_PROVIDER_TIMEOUT_SECONDS = float(os.environ.get('LOOKUP_FEDERATED_PROVIDER_TIMEOUT_SECONDS', '4'))
+LOOKUP_FEDERATED_MAX_WORKERS = int(os.environ.get('LOOKUP_FEDERATED_MAX_WORKERS', '16'))
+
+# Stale-while-revalidate for stored items: per-category staleness thresholds
+# and the background refresh pool used by the item lookup views.
+LOOKUP_ITEM_STALE_AFTER_SECONDS = {
+    'movie': int(os.environ.get('LOOKUP_ITEM_STALE_AFTER_MOVIE', str(14 * 24 * 3600))),
+    'game': int(os.environ.get('LOOKUP_ITEM_STALE_AFTER_GAME', str(14 * 24 * 3600))),
+    'anime': int(os.environ.get('LOOKUP_ITEM_STALE_AFTER_ANIME', str(3 * 24 * 3600))),
+    'manga': int(os.environ.get('LOOKUP_ITEM_STALE_AFTER_MANGA', str(3 * 24 * 3600))),
+}
+LOOKUP_REVALIDATE_ENABLED = os.environ.get('LOOKUP_REVALIDATE_ENABLED', 'True').lower() == 'true'
+LOOKUP_REVALIDATE_MAX_WORKERS = int(os.environ.get('LOOKUP_REVALIDATE_MAX_WORKERS', '2'))
+LOOKUP_REVALIDATE_MAX_PENDING = int(os.environ.get('LOOKUP_REVALIDATE_MAX_PENDING', '100'))
+LOOKUP_REVALIDATE_DEDUP_TTL_SECONDS = int(os.environ.get('LOOKUP_REVALIDATE_DEDUP_TTL_SECONDS', '300'))
+LOOKUP_REVALIDATE_MIN_RETRY_SECONDS = int(os.environ.get('LOOKUP_REVALIDATE_MIN_RETRY_SECONDS', str(6 * 3600)))
+
+# Refresh scheduling: failed items back off exponentially from the minimum
+# retry interval up to REFRESH_MAX_BACKOFF_SECONDS, and items the provider
+# reports as missing this many times in a row are tombstoned (0 disables).
+REFRESH_MAX_BACKOFF_SECONDS = int(os.environ.get('REFRESH_MAX_BACKOFF_SECONDS', str(7 * 24 * 3600)))
+REFRESH_TOMBSTONE_AFTER_NOT_FOUND = int(os.environ.get('REFRESH_TOMBSTONE_AFTER_NOT_FOUND', '3'))
+# Stale items are refreshed in order of review count, recent lookups and staleness.
+REFRESH_PRIORITY_WEIGHTS = {
+    'reviews': float(os.environ.get('REFRESH_PRIORITY_WEIGHT_REVIEWS', '1.0')),
+    'hits': float(os.environ.get('REFRESH_PRIORITY_WEIGHT_HITS', '1.0')),
+    'staleness': float(os.environ.get('REFRESH_PRIORITY_WEIGHT_STALENESS', '1.0')),
+}
+REFRESH_PRIORITY_HIT_WINDOW_SECONDS = int(os.environ.get('REFRESH_PRIORITY_HIT_WINDOW_SECONDS', str(7 * 24 * 3600)))
+REFRESH_PRIORITY_HIT_FLUSH_SECONDS = int(os.environ.get('REFRESH_PRIORITY_HIT_FLUSH_SECONDS', '300'))
+
+
+# Render and parse API JSON with orjson when it is installed (same output as DRF's JSON classes).
+API_FAST_JSON = os.environ.get('API_FAST_JSON', 'True').lower() == 'true'
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_VERSIONING_CLASS': 'review.versioning.URLPathAndHeaderVersioning',
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'review.pagination.ReviewLimitOffsetPagination',
     'ALLOWED_VERSIONS': ('2.0',),
     'DEFAULT_VERSION': '2.0',
     'PAGE_SIZE': 20,
+    'DEFAULT_RENDERER_CLASSES': [
+        'review.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'review.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
@@ -15,4 +15,10 @@ DATABASES = {
 ALLOWED_HOSTS = ['*']
 
 STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
-WHITENOISE_USE_FINDERS = True
\ No newline at end of file
+WHITENOISE_USE_FINDERS = True
+
+# Tests opt in to background item refreshes so they never reach real providers.
+LOOKUP_REVALIDATE_ENABLED = False
+
+# Upstream calls are mocked; pacing them would only slow the suite down.
+UPSTREAM_THROTTLE_ENABLED = False
@@ -1,6 +1,29 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+SHARED_CACHE_ALIAS = 'shared'
+_LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+_logger = logging.getLogger(__name__)
+
+
+def warn_if_shared_cache_is_local():
+    """The circuit breaker, upstream throttle and review version stamps only work across processes through a shared backend."""
+    backend = settings.CACHES.get(SHARED_CACHE_ALIAS, {}).get('BACKEND')
+    if backend in _LOCAL_CACHE_BACKENDS:
+        _logger.warning(
+            "The '%s' cache uses %s, so circuit breaker, throttle and review version state is per process. "
+            'Set SHARED_CACHE_BACKEND to a cross-process backend (db, redis) in production.',
+            SHARED_CACHE_ALIAS, backend,
+        )
 
 
 class ReviewConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'review'
+
+    def ready(self):
+        from review import signals  # noqa: F401
+        warn_if_shared_cache_is_local()
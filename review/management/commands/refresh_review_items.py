@@ -1,14 +1,92 @@
 from datetime import timedelta
+import signal
+import threading
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
 from django.db.models import Q
 from django.utils import timezone
 
 from review.models import ReviewItem
-from review.utils import api_utils
-from review.utils.metrics import normalize_provider, push_refresh_run_metrics
+from review.utils import (
+    api_utils, deadlines, item_refresh, rate_limit, refresh_checkpoints, refresh_leases, refresh_priority,
+    review_versions, single_flight,
+)
+from review.utils.metrics import (
+    normalize_provider,
+    push_refresh_run_metrics,
+    record_refresh_daemon_iteration,
+    record_refresh_provider_latency,
+    start_metrics_server,
+)
+
+
+class _RunTotals:
+    """Item counts for one run, overall and per provider."""
+
+    def __init__(self):
+        self.processed = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.by_provider = defaultdict(lambda: defaultdict(int))
+
+    def add(self, provider_name, result):
+        setattr(self, result, getattr(self, result) + 1)
+        self.by_provider[provider_name][result] += 1
+
+
+class _WriteBuffer:
+    """Pending ReviewItem writes grouped by the fields they touch, flushed in chunks with bulk_update."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._pending = defaultdict(list)
+
+    def add(self, item, fields):
+        fields = tuple(fields)
+        self._pending[fields].append(item)
+        if len(self._pending[fields]) >= self.batch_size:
+            self._flush_fields(fields)
+
+    def flush(self):
+        for fields in list(self._pending):
+            self._flush_fields(fields)
+
+    def _flush_fields(self, fields):
+        items = self._pending.pop(fields, [])
+        if items:
+            ReviewItem.objects.bulk_update(items, fields, batch_size=self.batch_size)
+            # bulk_update() sends no post_save signals.
+            if any(field in item_refresh.REFRESHED_FIELDS for field in fields):
+                review_versions.bump(review_versions.SCOPE_ITEMS)
+
+
+def _time_left(stop_at):
+    """Seconds until the --max-duration cut-off, or None without one."""
+    return None if stop_at is None else stop_at - time.monotonic()
+
+
+def _item_budget(request_budget_seconds, stop_at):
+    """Lookup budget for the next item, cut short so it cannot outlast the run."""
+    time_left = _time_left(stop_at)
+    return request_budget_seconds if time_left is None else min(request_budget_seconds, time_left)
+
+
+def _parse_provider_rate(value):
+    provider, sep, rate = value.partition('=')
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = None
+    if not sep or not provider.strip() or rate is None or rate <= 0:
+        raise ValueError(value)
+    return normalize_provider(provider.strip()), rate
 
 
 class Command(BaseCommand):
@@ -31,7 +109,28 @@ class Command(BaseCommand):
             '--min-retry-hours',
             type=int,
             default=6,
-            help='Minimum hours between refresh attempts for the same item (default: 6).',
+            help='Minimum hours between refresh attempts for the same item; each further consecutive '
+                 'failure doubles the wait (default: 6).',
+        )
+        parser.add_argument(
+            '--max-backoff-hours',
+            type=int,
+            default=None,
+            help='Upper bound on the retry backoff of failing items (default: REFRESH_MAX_BACKOFF_SECONDS, 7 days).',
+        )
+        parser.add_argument(
+            '--tombstone-after',
+            type=int,
+            default=None,
+            help='Stop refreshing items the provider reports as not found this many times in a row; '
+                 '0 disables (default: REFRESH_TOMBSTONE_AFTER_NOT_FOUND, 3).',
+        )
+        parser.add_argument(
+            '--order',
+            choices=('priority', 'oldest'),
+            default='priority',
+            help='Refresh the most reviewed and most looked-up stale items first, or strictly the oldest first '
+                 '(default: priority).',
         )
         parser.add_argument(
             '--dry-run',
@@ -44,16 +143,94 @@ class Command(BaseCommand):
             default=400,
             help='Delay between external refresh requests in milliseconds (default: 400).',
         )
+        parser.add_argument(
+            '--request-budget-seconds',
+            type=float,
+            default=30.0,
+            help='Total time budget per item lookup, including retries and Retry-After waits (default: 30).',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Concurrent lookups per provider; 1 keeps the serial mode (default: 1).',
+        )
+        parser.add_argument(
+            '--provider-rate',
+            action='append',
+            default=[],
+            metavar='PROVIDER=RPS',
+            help='Requests per second for one provider in concurrent mode, e.g. jikan=2 (repeatable). '
+                 'Providers without a rate are limited by --request-delay-ms.',
+        )
+        parser.add_argument(
+            '--lease-seconds',
+            type=int,
+            default=900,
+            help='How long claimed items stay leased to this worker; expired leases are reclaimed by other runs (default: 900).',
+        )
+        parser.add_argument(
+            '--max-duration',
+            type=float,
+            default=None,
+            help='Stop starting new lookups after this many seconds; set it below the job deadline. '
+                 'Items not reached are checkpointed for the next run (default: no limit).',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default='refresh_review_items',
+            help='Checkpoint name; runs sharing it resume each other\'s unfinished items (default: refresh_review_items).',
+        )
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            help='Keep running, refreshing batch after batch until SIGTERM, and serve metrics over HTTP '
+                 'instead of pushing them.',
+        )
+        parser.add_argument(
+            '--daemon-min-sleep',
+            type=float,
+            default=1.0,
+            help='Daemon pause after a full batch, in seconds (default: 1).',
+        )
+        parser.add_argument(
+            '--daemon-max-sleep',
+            type=float,
+            default=300.0,
+            help='Longest daemon pause when few items are due, in seconds (default: 300).',
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=9108,
+            help='Port for the daemon\'s Prometheus metrics endpoint; 0 disables it (default: 9108).',
+        )
+        parser.add_argument(
+            '--write-batch-size',
+            type=int,
+            default=100,
+            help='Rows per bulk UPDATE when writing refresh results (default: 100).',
+        )
+        parser.add_argument(
+            '--worker-id',
+            default='',
+            help='Lease owner name for this run (default: hostname, pid and a random suffix).',
+        )
 
     def handle(self, *args, **options):
         started_monotonic = time.monotonic()
         stale_days = options['stale_days']
         max_items = options['max_items']
         min_retry_hours = options['min_retry_hours']
-        dry_run = options['dry_run']
+        max_backoff_hours = options['max_backoff_hours']
+        tombstone_after = options['tombstone_after']
         request_delay_ms = options['request_delay_ms']
-        emit_metrics = False
-        run_success = False
+        request_budget_seconds = options['request_budget_seconds']
+        concurrency = options['concurrency']
+        lease_seconds = options['lease_seconds']
+        write_batch_size = options['write_batch_size']
+        max_duration = options['max_duration']
+        worker_id = options['worker_id'] or refresh_leases.make_owner_id()
 
         if stale_days < 0:
             self.stderr.write(self.style.ERROR('--stale-days must be >= 0'))
@@ -64,110 +241,421 @@ class Command(BaseCommand):
         if min_retry_hours < 0:
             self.stderr.write(self.style.ERROR('--min-retry-hours must be >= 0'))
             return
+        if max_backoff_hours is not None and max_backoff_hours < 0:
+            self.stderr.write(self.style.ERROR('--max-backoff-hours must be >= 0'))
+            return
+        if tombstone_after is not None and tombstone_after < 0:
+            self.stderr.write(self.style.ERROR('--tombstone-after must be >= 0'))
+            return
         if request_delay_ms < 0:
             self.stderr.write(self.style.ERROR('--request-delay-ms must be >= 0'))
             return
+        if request_budget_seconds <= 0:
+            self.stderr.write(self.style.ERROR('--request-budget-seconds must be > 0'))
+            return
+        if lease_seconds <= 0:
+            self.stderr.write(self.style.ERROR('--lease-seconds must be > 0'))
+            return
+        if max_duration is not None and max_duration <= 0:
+            self.stderr.write(self.style.ERROR('--max-duration must be > 0'))
+            return
+        if write_batch_size <= 0:
+            self.stderr.write(self.style.ERROR('--write-batch-size must be > 0'))
+            return
+        if concurrency < 1:
+            self.stderr.write(self.style.ERROR('--concurrency must be >= 1'))
+            return
+        if options['daemon_min_sleep'] < 0 or options['daemon_max_sleep'] < 0:
+            self.stderr.write(self.style.ERROR('--daemon-min-sleep and --daemon-max-sleep must be >= 0'))
+            return
+        if options['metrics_port'] < 0:
+            self.stderr.write(self.style.ERROR('--metrics-port must be >= 0'))
+            return
+        try:
+            provider_rates = dict(_parse_provider_rate(value) for value in options['provider_rate'])
+        except ValueError as ex:
+            self.stderr.write(self.style.ERROR(f'--provider-rate must look like PROVIDER=RPS with RPS > 0, got "{ex}"'))
+            return
 
-        emit_metrics = True
+        stop_at = started_monotonic + max_duration if max_duration is not None else None
+        # Unset options fall back to the REFRESH_* settings in record_refresh_failure.
+        self._failure_policy = {
+            'min_retry': timedelta(hours=min_retry_hours),
+            'max_backoff': timedelta(hours=max_backoff_hours) if max_backoff_hours is not None else None,
+            'tombstone_after': tombstone_after,
+        }
+        self._writes = _WriteBuffer(write_batch_size)
+        # Providers (and their pooled HTTP sessions) live as long as the command.
+        self._providers = {}
+        self._rates = self._provider_rates(request_delay_ms, provider_rates)
+        self._stopping = threading.Event()
 
-        now = timezone.now()
-        stale_cutoff = now - timedelta(days=stale_days)
-        retry_cutoff = now - timedelta(hours=min_retry_hours)
+        if options['daemon']:
+            self._run_daemon(options, worker_id, stop_at)
+            return
+
+        totals = _RunTotals()
+        remaining = []
+        run_success = False
+        try:
+            _, remaining = self._run_batch(options, worker_id, totals, stop_at)
+            if remaining:
+                self.stdout.write(self.style.WARNING(
+                    f'Stopped early; {len(remaining)} items left for the next run.'
+                ))
+            self.stdout.write(self.style.SUCCESS(
+                f'Refresh complete. processed={totals.processed} refreshed={totals.refreshed} '
+                f'failed={totals.failed} skipped={totals.skipped} '
+                f'changed={totals.changed} unchanged={totals.unchanged} '
+                f'remaining={len(remaining)} dry_run={options["dry_run"]}'
+            ))
+            run_success = True
+        finally:
+            push_refresh_run_metrics(
+                processed=totals.processed,
+                refreshed=totals.refreshed,
+                failed=totals.failed,
+                skipped=totals.skipped,
+                changed=totals.changed,
+                unchanged=totals.unchanged,
+                remaining=len(remaining),
+                duration_seconds=time.monotonic() - started_monotonic,
+                dry_run=options['dry_run'],
+                success=run_success,
+                provider_totals=totals.by_provider,
+            )
 
-        stale_items = (
+    def _stale_queryset(self, options, now):
+        """Items due for a refresh, oldest first."""
+        stale_cutoff = now - timedelta(days=options['stale_days'])
+        retry_cutoff = now - timedelta(hours=options['min_retry_hours'])
+        return (
             ReviewItem.objects.filter(
                 Q(last_refreshed_at__isnull=True) | Q(last_refreshed_at__lte=stale_cutoff),
                 Q(last_refresh_attempt_at__isnull=True) | Q(last_refresh_attempt_at__lte=retry_cutoff),
+                Q(refresh_next_attempt_at__isnull=True) | Q(refresh_next_attempt_at__lte=now),
+                refresh_tombstoned_at__isnull=True,
             )
-            .order_by('last_refreshed_at', 'item_id')[:max_items]
+            .order_by('last_refreshed_at', 'item_id')
         )
 
-        providers = {}
-        processed = 0
-        refreshed = 0
-        failed = 0
-        skipped = 0
-        provider_totals = defaultdict(lambda: defaultdict(int))
+    def _run_batch(self, options, worker_id, totals, stop_at):
+        """
+        Claim and refresh one batch of up to --max-items stale items.
+
+        Returns ``(batch, remaining)``: the items selected and those not
+        reached before ``stop_at`` or a stop request.
+        """
+        max_items = options['max_items']
+        dry_run = options['dry_run']
+        checkpoint = options['checkpoint']
+        now = timezone.now()
+        stale_queryset = self._stale_queryset(options, now)
+
+        # Items a previous time-limited run did not reach go first, if still due.
+        checkpoint_ids = refresh_checkpoints.pending_item_ids(checkpoint)
+        resume_ids = set(stale_queryset.filter(pk__in=checkpoint_ids).values_list('pk', flat=True))
+        resume_ids = [item_id for item_id in checkpoint_ids if item_id in resume_ids]
+        dropped_checkpoint_ids = set(checkpoint_ids) - set(resume_ids)
 
+        ranked_ids = None
+        if options['order'] == 'priority':
+            ranked_ids = refresh_priority.rank_items(
+                stale_queryset.filter(refresh_leases.lease_is_free(now)),
+                max_items,
+                timedelta(days=options['stale_days']),
+                now=now,
+            )
+        elif resume_ids:
+            ranked_ids = list(
+                stale_queryset.filter(refresh_leases.lease_is_free(now))
+                .values_list('pk', flat=True)[:max_items * refresh_priority.POOL_FACTOR]
+            )
+        if ranked_ids is not None:
+            stale_queryset = refresh_priority.in_rank_order(
+                stale_queryset,
+                resume_ids + [item_id for item_id in ranked_ids if item_id not in resume_ids]
+            )
+
+        if dry_run:
+            stale_items = list(stale_queryset.filter(refresh_leases.lease_is_free(now))[:max_items])
+        else:
+            # Parallel workers each lease a disjoint batch of stale items.
+            stale_items = refresh_leases.claim_items(
+                stale_queryset, max_items, worker_id, options['lease_seconds'], now=now,
+            )
+
+        try:
+            if options['concurrency'] > 1:
+                remaining = self._refresh_concurrently(
+                    stale_items, totals, now, dry_run, options['request_budget_seconds'], options['concurrency'],
+                    self._rates, stop_at,
+                )
+            else:
+                remaining = self._refresh_serially(
+                    stale_items, totals, now, dry_run, options['request_budget_seconds'], options['request_delay_ms'],
+                    stop_at,
+                )
+            self._writes.flush()
+
+            if not dry_run:
+                remaining_ids = [item.item_id for item in remaining]
+                done_ids = {item.item_id for item in stale_items} - set(remaining_ids)
+                refresh_checkpoints.update(checkpoint, done_ids | dropped_checkpoint_ids, remaining_ids)
+        finally:
+            if not dry_run:
+                try:
+                    # Keep the results of items finished before a crash.
+                    self._writes.flush()
+                finally:
+                    refresh_leases.release_items(worker_id)
+        return stale_items, remaining
+
+    def _run_daemon(self, options, worker_id, stop_at):
+        """
+        Refresh batch after batch until SIGTERM/SIGINT (or --max-duration).
+
+        After a full batch the next one starts after --daemon-min-sleep; when
+        fewer items are due the pause doubles up to --daemon-max-sleep. Live
+        metrics are served on --metrics-port instead of being pushed.
+        """
+        server = None
+        if options['metrics_port']:
+            server = start_metrics_server(options['metrics_port'])
+        previous_handlers = {
+            signum: signal.signal(signum, self._request_stop) for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        min_sleep = options['daemon_min_sleep']
+        max_sleep = max(options['daemon_max_sleep'], min_sleep)
+        sleep_seconds = min_sleep
+        self.stdout.write(f'Refresh daemon started as {worker_id}.')
         try:
-            for item in stale_items:
-                processed += 1
-                provider_name = self._provider_name_for_category(item.category)
-                provider_totals[provider_name]['processed'] += 1
-                provider = providers.get(item.category)
-                if item.category not in providers:
-                    provider = self._build_provider(item.category)
-                    providers[item.category] = provider
+            while not self._stopping.is_set():
+                time_left = _time_left(stop_at)
+                if time_left is not None and time_left <= 0:
+                    break
+                # Drop connections the database closed or that outlived CONN_MAX_AGE.
+                close_old_connections()
+                totals = _RunTotals()
+                iteration_started = time.monotonic()
+                batch = []
+                try:
+                    batch, _ = self._run_batch(options, worker_id, totals, stop_at)
+                    queue_depth = (
+                        self._stale_queryset(options, timezone.now())
+                        .filter(refresh_leases.lease_is_free(timezone.now()))
+                        .count()
+                    )
+                except Exception as ex:
+                    self.stderr.write(self.style.ERROR(f'Refresh iteration failed: {ex.__class__.__name__}: {ex}'))
+                    queue_depth = None
+                record_refresh_daemon_iteration(
+                    provider_totals=totals.by_provider,
+                    processed=totals.processed,
+                    duration_seconds=time.monotonic() - iteration_started,
+                    queue_depth=queue_depth,
+                )
+
+                if len(batch) >= options['max_items']:
+                    sleep_seconds = min_sleep
+                else:
+                    sleep_seconds = min(max(sleep_seconds * 2, min_sleep), max_sleep)
+                time_left = _time_left(stop_at)
+                self._stopping.wait(sleep_seconds if time_left is None else max(min(sleep_seconds, time_left), 0))
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        self.stdout.write('Refresh daemon stopped.')
 
+    def _request_stop(self, signum, frame):
+        # Finish the lookups in flight, checkpoint the rest and exit.
+        self._stopping.set()
+
+    def _refresh_serially(self, items, totals, now, dry_run, request_budget_seconds, request_delay_ms, stop_at):
+        """Refresh ``items`` one at a time and return those not reached before ``stop_at``."""
+        for index, item in enumerate(items):
+            if self._out_of_time(request_budget_seconds, stop_at):
+                return items[index:]
+            provider_name, provider = self._start_item(item, totals, now, dry_run)
+            if provider is None:
+                continue
+
+            if request_delay_ms:
+                time.sleep(request_delay_ms / 1000)
+            if self._out_of_time(request_budget_seconds, stop_at):
+                return items[index:]
+
+            totals.add(provider_name, 'processed')
+            details = self._fetch_details_before_stop(provider, item, provider_name, request_budget_seconds, stop_at)
+            if details is None:
+                return items[index:]
+            self._apply_details(item, details, provider_name, totals, now, dry_run)
+        return []
+
+    def _refresh_concurrently(
+        self, items, totals, now, dry_run, request_budget_seconds, concurrency, provider_rates, stop_at,
+    ):
+        """
+        Fetch with one worker pool and token bucket per provider.
+
+        Workers only talk to upstream; results are written back on this
+        thread as they complete, so all database writes stay on one
+        connection. Returns the items whose lookup had not started by
+        ``stop_at`` or was cut off by it.
+        """
+        pools = {}
+        buckets = {}
+        futures = {}
+        try:
+            for item in items:
+                provider_name, provider = self._start_item(item, totals, now, dry_run)
                 if provider is None:
-                    skipped += 1
-                    provider_totals[provider_name]['skipped'] += 1
-                    self.stderr.write(self.style.WARNING(
-                        f'Skipping {item.item_id}: no provider available for category "{item.category}".'
-                    ))
-                    if not dry_run:
-                        item.last_refresh_attempt_at = now
-                        item.refresh_error_count += 1
-                        item.save(update_fields=['last_refresh_attempt_at', 'refresh_error_count'])
                     continue
+                if provider_name not in pools:
+                    pools[provider_name] = ThreadPoolExecutor(
+                        max_workers=concurrency,
+                        thread_name_prefix=f'refresh-{provider_name}',
+                    )
+                    buckets[provider_name] = rate_limit.TokenBucket(provider_rates.get(provider_name))
+                future = pools[provider_name].submit(
+                    self._fetch_details_rate_limited,
+                    buckets[provider_name], provider, item, provider_name, request_budget_seconds, stop_at,
+                )
+                futures[future] = (item, provider_name)
 
-                if request_delay_ms:
-                    time.sleep(request_delay_ms / 1000)
-
-                details = provider.get_details(item.item_id)
-                if details.get('response') != 'True':
-                    failed += 1
-                    provider_totals[provider_name]['failed'] += 1
-                    if not dry_run:
-                        item.last_refresh_attempt_at = now
-                        item.refresh_error_count += 1
-                        item.save(update_fields=['last_refresh_attempt_at', 'refresh_error_count'])
-                    err_message = details.get("error", "Unknown error")
-                    status_code = details.get("status_code")
-                    upstream_reason = details.get("upstream_reason")
-                    if status_code:
-                        err_message = f'{err_message} status={status_code}'
-                    if upstream_reason:
-                        err_message = f'{err_message} reason={upstream_reason}'
-                    self.stderr.write(self.style.WARNING(
-                        f'Failed refresh for {item.item_id}: {err_message}.'
-                    ))
+            not_reached = set()
+            for future in as_completed(futures):
+                item, provider_name = futures[future]
+                details = future.result()
+                if details is None:
+                    not_reached.add(item.item_id)
                     continue
+                totals.add(provider_name, 'processed')
+                self._apply_details(item, details, provider_name, totals, now, dry_run)
+            return [item for item in items if item.item_id in not_reached]
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
 
-                refreshed += 1
-                provider_totals[provider_name]['refreshed'] += 1
-                if dry_run:
-                    continue
+    def _start_item(self, item, totals, now, dry_run):
+        """Return ``(provider_name, provider)`` for ``item``; provider is None if the item was skipped."""
+        provider_name = self._provider_name_for_category(item.category)
+        if item.category not in self._providers:
+            self._providers[item.category] = self._build_provider(item.category)
+        provider = self._providers[item.category]
 
-                item.title = details.get('title', item.title)
-                item.image_url = details.get('image_url', item.image_url)
-                item.year = details.get('year', item.year)
-                item.attr1 = details.get('attr1', item.attr1)
-                item.attr2 = details.get('attr2', item.attr2)
-                item.attr3 = details.get('attr3', item.attr3)
-                item.description = details.get('description', item.description)
-                item.rating = str(details.get('rating', item.rating))
-                item.last_refreshed_at = now
+        if provider is None:
+            totals.add(provider_name, 'processed')
+            totals.add(provider_name, 'skipped')
+            self.stderr.write(self.style.WARNING(
+                f'Skipping {item.item_id}: no provider available for category "{item.category}".'
+            ))
+            if not dry_run:
                 item.last_refresh_attempt_at = now
-                item.refresh_error_count = 0
-                item.save()
+                item.refresh_error_count += 1
+                self._writes.add(item, ('last_refresh_attempt_at', 'refresh_error_count'))
+        return provider_name, provider
 
-            self.stdout.write(self.style.SUCCESS(
-                f'Refresh complete. processed={processed} refreshed={refreshed} failed={failed} skipped={skipped} dry_run={dry_run}'
-            ))
-            run_success = True
+    def _out_of_time(self, request_budget_seconds, stop_at):
+        return self._stopping.is_set() or _item_budget(request_budget_seconds, stop_at) <= 0
+
+    def _fetch_details(self, provider, item, provider_name, request_budget_seconds):
+        started = time.monotonic()
+        with deadlines.deadline_scope(request_budget_seconds):
+            details, _ = single_flight.coalesce(
+                single_flight.details_key(item.item_id),
+                lambda: provider.get_details(item.item_id),
+                source_name=provider_name,
+            )
+        record_refresh_provider_latency(provider_name, time.monotonic() - started)
+        return details
+
+    def _fetch_details_before_stop(self, provider, item, provider_name, request_budget_seconds, stop_at):
+        """Fetch details for ``item``, or return None if the run's ``stop_at`` cut the lookup off."""
+        budget = _item_budget(request_budget_seconds, stop_at)
+        details = self._fetch_details(provider, item, provider_name, budget)
+        if details.get('deadline_exceeded') and budget < request_budget_seconds:
+            # --max-duration ended the lookup, not the provider: leave the
+            # item for the next run instead of backing it off.
+            return None
+        return details
+
+    def _fetch_details_rate_limited(self, bucket, provider, item, provider_name, request_budget_seconds, stop_at):
+        """Fetch details for ``item``, or return None if the run runs out of time before the lookup finishes."""
+        try:
+            if self._out_of_time(request_budget_seconds, stop_at):
+                return None
+            bucket.acquire()
+            if self._out_of_time(request_budget_seconds, stop_at):
+                return None
+            return self._fetch_details_before_stop(provider, item, provider_name, request_budget_seconds, stop_at)
         finally:
-            if emit_metrics:
-                push_refresh_run_metrics(
-                    processed=processed,
-                    refreshed=refreshed,
-                    failed=failed,
-                    skipped=skipped,
-                    duration_seconds=time.monotonic() - started_monotonic,
-                    dry_run=dry_run,
-                    success=run_success,
-                    provider_totals=provider_totals,
-                )
+            # Worker threads sit outside any request cycle; drop connections
+            # opened for cross-process single-flight locks.
+            connections.close_all()
+
+    def _apply_details(self, item, details, provider_name, totals, now, dry_run):
+        if details.get('circuit_open'):
+            # Provider is failing fast; leave the item's retry bookkeeping untouched.
+            totals.add(provider_name, 'skipped')
+            self.stderr.write(self.style.WARNING(
+                f'Skipping {item.item_id}: circuit open for {provider_name}.'
+            ))
+            return
+        if details.get('rate_limited'):
+            # The provider asked us to back off; this is not the item's fault.
+            totals.add(provider_name, 'skipped')
+            self.stderr.write(self.style.WARNING(
+                f'Skipping {item.item_id}: {provider_name} rate limit reached.'
+            ))
+            return
+
+        if details.get('response') != 'True':
+            totals.add(provider_name, 'failed')
+            tombstoned = False
+            if not dry_run:
+                tombstoned = item_refresh.record_refresh_failure(item, details, now, **self._failure_policy)
+                self._writes.add(item, item_refresh.FAILURE_BOOKKEEPING_FIELDS)
+            err_message = details.get("error", "Unknown error")
+            status_code = details.get("status_code")
+            upstream_reason = details.get("upstream_reason")
+            if status_code:
+                err_message = f'{err_message} status={status_code}'
+            if upstream_reason:
+                err_message = f'{err_message} reason={upstream_reason}'
+            self.stderr.write(self.style.WARNING(
+                f'Failed refresh for {item.item_id}: {err_message}.'
+            ))
+            if tombstoned:
+                self.stderr.write(self.style.WARNING(
+                    f'Tombstoned {item.item_id}: not found upstream {item.refresh_not_found_count} times in a row.'
+                ))
+            return
+
+        totals.add(provider_name, 'refreshed')
+        # Dry runs also diff, on the in-memory copy only, to report what would change.
+        changed = item_refresh.apply_refreshed_details(item, details, now)
+        totals.add(provider_name, 'changed' if changed else 'unchanged')
+        if dry_run:
+            return
+
+        # Unchanged items only get their timestamps bumped. Leave the lease
+        # columns to release_items: after a long run the lease may already
+        # have passed to another worker.
+        if changed:
+            self._writes.add(item, item_refresh.REFRESHED_FIELDS + item_refresh.REFRESH_BOOKKEEPING_FIELDS)
+        else:
+            self._writes.add(item, item_refresh.REFRESH_BOOKKEEPING_FIELDS)
+
+    def _provider_rates(self, request_delay_ms, provider_rates):
+        """Requests per second per provider; --request-delay-ms applies to each provider separately."""
+        default_rate = 1000 / request_delay_ms if request_delay_ms else None
+        rates = defaultdict(lambda: default_rate)
+        rates.update(provider_rates)
+        return rates
 
     def _provider_name_for_category(self, category):
         if category == 'movie':
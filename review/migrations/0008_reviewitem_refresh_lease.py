@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0007_reviewitem_refresh_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewitem',
+            name='refresh_lease_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='refresh_lease_owner',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
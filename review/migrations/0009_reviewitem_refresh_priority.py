@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0008_reviewitem_refresh_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewitem',
+            name='last_lookup_hit_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='lookup_hit_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='refresh_next_attempt_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='refresh_not_found_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reviewitem',
+            name='refresh_tombstoned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,138 @@
+"""
+Full-text search documents for reviews (see review.utils.review_search).
+
+The documents live outside the Django models and are maintained by triggers,
+so they stay current through bulk_update() and raw updates as well. On SQLite
+a migration that rebuilds review_review or review_reviewitem drops their
+triggers; such a migration must run this one's forward SQL again.
+"""
+
+from django.db import migrations, OperationalError, transaction
+
+POSTGRES_FORWARD = [
+    'ALTER TABLE review_review ADD COLUMN search_vector tsvector',
+    'CREATE INDEX review_review_search_vector_gin ON review_review USING gin (search_vector)',
+    """
+    CREATE FUNCTION review_review_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        SELECT setweight(to_tsvector('simple', coalesce(item.title, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(NEW.review_tags, '')), 'B')
+            || setweight(to_tsvector('simple', concat_ws(' ', item.attr1, item.attr2, item.attr3, item.year)), 'C')
+            || setweight(to_tsvector('simple', coalesce(item.description, '')), 'D')
+        INTO NEW.search_vector
+        FROM review_reviewitem item
+        WHERE item.item_id = NEW.review_item_id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER review_review_search_vector
+    BEFORE INSERT OR UPDATE OF review_tags, review_item_id ON review_review
+    FOR EACH ROW EXECUTE FUNCTION review_review_search_vector_update()
+    """,
+    """
+    CREATE FUNCTION review_reviewitem_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        -- Touching review_tags re-runs the review trigger with the new item text.
+        UPDATE review_review SET review_tags = review_tags WHERE review_item_id = NEW.item_id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER review_reviewitem_search_vector
+    AFTER UPDATE OF title, attr1, attr2, attr3, year, description ON review_reviewitem
+    FOR EACH ROW
+    WHEN (
+        OLD.title IS DISTINCT FROM NEW.title
+        OR OLD.attr1 IS DISTINCT FROM NEW.attr1
+        OR OLD.attr2 IS DISTINCT FROM NEW.attr2
+        OR OLD.attr3 IS DISTINCT FROM NEW.attr3
+        OR OLD.year IS DISTINCT FROM NEW.year
+        OR OLD.description IS DISTINCT FROM NEW.description
+    )
+    EXECUTE FUNCTION review_reviewitem_search_vector_update()
+    """,
+    'UPDATE review_review SET review_tags = review_tags',
+]
+
+POSTGRES_REVERSE = [
+    'DROP TRIGGER IF EXISTS review_reviewitem_search_vector ON review_reviewitem',
+    'DROP FUNCTION IF EXISTS review_reviewitem_search_vector_update()',
+    'DROP TRIGGER IF EXISTS review_review_search_vector ON review_review',
+    'DROP FUNCTION IF EXISTS review_review_search_vector_update()',
+    'ALTER TABLE review_review DROP COLUMN IF EXISTS search_vector',
+]
+
+_SQLITE_INSERT_REVIEW = """
+    INSERT INTO review_review_fts (rowid, title, tags, attrs, description)
+    SELECT NEW.id, item.title, coalesce(NEW.review_tags, ''),
+           item.attr1 || ' ' || item.attr2 || ' ' || item.attr3 || ' ' || item.year, item.description
+    FROM review_reviewitem item WHERE item.item_id = NEW.review_item_id;
+"""
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE review_review_fts USING fts5(title, tags, attrs, description, tokenize = 'unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER review_review_fts_insert AFTER INSERT ON review_review BEGIN'
+    + _SQLITE_INSERT_REVIEW + 'END',
+    'CREATE TRIGGER review_review_fts_update AFTER UPDATE OF review_tags, review_item_id ON review_review BEGIN'
+    ' DELETE FROM review_review_fts WHERE rowid = OLD.id;'
+    + _SQLITE_INSERT_REVIEW + 'END',
+    'CREATE TRIGGER review_review_fts_delete AFTER DELETE ON review_review BEGIN'
+    ' DELETE FROM review_review_fts WHERE rowid = OLD.id; END',
+    """
+    CREATE TRIGGER review_reviewitem_fts_update
+    AFTER UPDATE OF title, attr1, attr2, attr3, year, description ON review_reviewitem BEGIN
+        DELETE FROM review_review_fts WHERE rowid IN (SELECT id FROM review_review WHERE review_item_id = NEW.item_id);
+        INSERT INTO review_review_fts (rowid, title, tags, attrs, description)
+        SELECT review.id, NEW.title, coalesce(review.review_tags, ''),
+               NEW.attr1 || ' ' || NEW.attr2 || ' ' || NEW.attr3 || ' ' || NEW.year, NEW.description
+        FROM review_review review WHERE review.review_item_id = NEW.item_id;
+    END
+    """,
+    """
+    INSERT INTO review_review_fts (rowid, title, tags, attrs, description)
+    SELECT review.id, item.title, coalesce(review.review_tags, ''),
+           item.attr1 || ' ' || item.attr2 || ' ' || item.attr3 || ' ' || item.year, item.description
+    FROM review_review review JOIN review_reviewitem item ON item.item_id = review.review_item_id
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS review_reviewitem_fts_update',
+    'DROP TRIGGER IF EXISTS review_review_fts_delete',
+    'DROP TRIGGER IF EXISTS review_review_fts_update',
+    'DROP TRIGGER IF EXISTS review_review_fts_insert',
+    'DROP TABLE IF EXISTS review_review_fts',
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite':
+            try:
+                with transaction.atomic(using=schema_editor.connection.alias):
+                    schema_editor.execute('CREATE VIRTUAL TABLE review_fts5_probe USING fts5(body)')
+            except OperationalError:
+                # SQLite built without FTS5: search keeps using LIKE.
+                return
+            schema_editor.execute('DROP TABLE review_fts5_probe')
+        for statement in statements_by_vendor.get(vendor, []):
+            schema_editor.execute(statement, params=None)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0010_refresh_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,49 @@
+"""
+pg_trgm GIN indexes for fuzzy title/tag matching (see review.utils.trigram_search).
+
+Creating the extension needs sufficient privileges; without it the migration
+is skipped and fuzzy search runs as a regular search. Other databases are left
+untouched.
+"""
+
+from django.db import migrations, DatabaseError, transaction
+
+FORWARD = [
+    'CREATE INDEX IF NOT EXISTS review_reviewitem_title_trgm ON review_reviewitem USING gin (title gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS review_review_tags_trgm ON review_review USING gin (review_tags gin_trgm_ops)',
+]
+
+REVERSE = [
+    'DROP INDEX IF EXISTS review_review_tags_trgm',
+    'DROP INDEX IF EXISTS review_reviewitem_title_trgm',
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        return
+    for statement in FORWARD:
+        schema_editor.execute(statement)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in REVERSE:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0011_review_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,16 @@
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0012_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reviewitem',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='reviewitem_title_lower_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from decimal import Decimal
 
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -19,10 +20,35 @@ class ReviewItem(models.Model):
     last_refreshed_at = models.DateTimeField(null=True, blank=True, db_index=True)
     last_refresh_attempt_at = models.DateTimeField(null=True, blank=True)
     refresh_error_count = models.PositiveIntegerField(default=0)
+    # Exponential retry backoff and tombstoning of items the provider no longer has.
+    refresh_next_attempt_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    refresh_not_found_count = models.PositiveIntegerField(default=0)
+    refresh_tombstoned_at = models.DateTimeField(null=True, blank=True)
+    # Recent lookups of the stored item, used to prioritise refreshes.
+    lookup_hit_count = models.PositiveIntegerField(default=0)
+    last_lookup_hit_at = models.DateTimeField(null=True, blank=True)
+    # Claimed by a refresh worker until the lease expires (see refresh_review_items).
+    refresh_lease_owner = models.CharField(max_length=64, blank=True, default='')
+    refresh_lease_expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Case-insensitive alphabetical review ordering (ordering=alpha).
+            models.Index(Lower('title'), name='reviewitem_title_lower_idx'),
+        ]
 
     def __str__(self):
         return '{}({})'.format(self.title, self.item_id)
 
+class RefreshCheckpoint(models.Model):
+    """Items a time-limited refresh run claimed but did not reach, resumed first by the next run."""
+    name = models.CharField(max_length=64, primary_key=True)
+    item_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{}({} pending)'.format(self.name, len(self.item_ids))
+
 class Review(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     review_item = models.ForeignKey(ReviewItem, on_delete=models.CASCADE)
@@ -39,6 +65,12 @@ class Review(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['user', 'review_item'], name='unique review')
             ]
+        indexes = [
+            # Keyset pagination: each list ordering plus id as the tiebreaker.
+            models.Index(fields=['review_rating', 'id'], name='review_rating_id_idx'),
+            models.Index(fields=['modified_date', 'id'], name='review_modified_id_idx'),
+            models.Index(fields=['user', 'modified_date', 'id'], name='review_user_modified_id_idx'),
+        ]
 
     def __str__(self):
         return '{}'.format(self.review_item.title)
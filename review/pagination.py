@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination for the v2 review list.
+
+Pages are read with ``WHERE (sort keys) > (last row's keys) LIMIT n`` instead
+of ``OFFSET``, so every page costs the same however deep the client scrolls.
+Cursors are opaque, URL-safe tokens that carry the ordering they were issued
+for, the direction and the boundary row's sort key values.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.pagination import LimitOffsetPagination, _positive_int
+from rest_framework.settings import api_settings
+
+NEXT = 'n'
+PREVIOUS = 'p'
+_ALIAS_PREFIX = 'cursor_'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+_COUNT_QUERYSET = object()
+
+
+class ReviewLimitOffsetPagination(LimitOffsetPagination):
+    """LimitOffsetPagination that can take the total from the caller; ``count=None`` skips counting."""
+
+    def paginate_queryset(self, queryset, request, view=None, count=_COUNT_QUERYSET):
+        if count is _COUNT_QUERYSET:
+            return super().paginate_queryset(queryset, request, view=view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = count
+        self.offset = self.get_offset(request)
+        if count is not None and (count == 0 or self.offset > count):
+            return []
+        return list(queryset[self.offset:self.offset + self.limit])
+
+
+def encode_cursor(ordering: str, direction: str, values: list) -> str:
+    payload = json.dumps({'o': ordering, 'd': direction, 'v': values}, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, ordering: str, key_count: int) -> tuple[str, list]:
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        direction, values = payload['d'], payload['v']
+        issued_for = payload['o']
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise InvalidCursor('Malformed cursor.')
+    if issued_for != ordering:
+        raise InvalidCursor('Cursor was issued for a different ordering.')
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != key_count:
+        raise InvalidCursor('Malformed cursor.')
+    return direction, values
+
+
+def _after(keys, values, reverse: bool) -> Q:
+    """Rows strictly after ``values`` in the order of ``keys`` (before, with ``reverse``)."""
+    condition = Q()
+    equal_so_far = Q()
+    for (name, _, descending), value in zip(keys, values):
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition |= equal_so_far & Q(**{'{}{}__{}'.format(_ALIAS_PREFIX, name, lookup): value})
+        equal_so_far &= Q(**{_ALIAS_PREFIX + name: value})
+    first_name, _, first_descending = keys[0]
+    # A plain range bound on the leading key lets the database use its index.
+    bound = 'lte' if first_descending != reverse else 'gte'
+    return Q(**{'{}{}__{}'.format(_ALIAS_PREFIX, first_name, bound): values[0]}) & condition
+
+
+class ReviewCursorPagination:
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+
+    @classmethod
+    def requested(cls, request) -> bool:
+        """Cursor mode is opt-in: ``?pagination=cursor`` for the first page, ``?cursor=`` after that."""
+        return cls.cursor_query_param in request.query_params or request.query_params.get(cls.mode_query_param) == 'cursor'
+
+    def __init__(self):
+        self.limit = None
+        self.next_cursor = None
+        self.prev_cursor = None
+
+    def get_limit(self, request) -> int:
+        try:
+            return _positive_int(request.query_params[self.limit_query_param], strict=True)
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, ordering: str, keys) -> list:
+        """
+        Return one page of ``queryset`` sorted by ``keys`` (see review_utils.ORDERING_KEYS).
+
+        Raises InvalidCursor for tokens that were tampered with or issued for another ordering.
+        """
+        self.limit = self.get_limit(request)
+        token = request.query_params.get(self.cursor_query_param, '')
+        direction, values = decode_cursor(token, ordering, len(keys)) if token else (NEXT, None)
+        reverse = direction == PREVIOUS
+
+        queryset = queryset.annotate(**{_ALIAS_PREFIX + name: expression for name, expression, _ in keys})
+        if values is not None:
+            queryset = queryset.filter(_after(keys, values, reverse))
+        queryset = queryset.order_by(*[
+            F(_ALIAS_PREFIX + name).desc() if descending != reverse else F(_ALIAS_PREFIX + name).asc()
+            for name, _, descending in keys
+        ])
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else values is not None
+        if rows:
+            self.next_cursor = self._cursor(ordering, NEXT, keys, rows[-1]) if has_next else None
+            self.prev_cursor = self._cursor(ordering, PREVIOUS, keys, rows[0]) if has_previous else None
+        elif values is not None:
+            # Past either end: offer the way back.
+            self.next_cursor = encode_cursor(ordering, NEXT, values) if reverse else None
+            self.prev_cursor = None if reverse else encode_cursor(ordering, PREVIOUS, values)
+        return rows
+
+    def _cursor(self, ordering: str, direction: str, keys, row) -> str:
+        # Rows are model instances or values() dicts.
+        if isinstance(row, dict):
+            values = [row[_ALIAS_PREFIX + name] for name, _, _ in keys]
+        else:
+            values = [getattr(row, _ALIAS_PREFIX + name) for name, _, _ in keys]
+        return encode_cursor(ordering, direction, values)
+
+    def get_pagination_meta(self) -> dict:
+        return {
+            'limit': self.limit,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+        }
+
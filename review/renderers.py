@@ -0,0 +1,66 @@
+"""
+orjson-backed JSON renderer and parser for the DRF API.
+
+Both produce exactly what DRF's JSONRenderer/JSONParser produce with the
+project's settings, only faster. Values orjson does not handle the same way
+go through DRF's own encoder: datetimes (``Z`` suffix, full microseconds),
+dates, raw Decimals (serializers already turn ``review_rating`` into a
+string), lazy strings. Anything orjson rejects (integers beyond 64 bits,
+non-UTF-8 bodies, indented browsable output) is handed to the DRF class.
+
+Without orjson installed, or with ``API_FAST_JSON=False``, both classes
+behave exactly like their DRF parents.
+"""
+
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    _DUMPS_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+
+# DRF escapes the JavaScript line terminators that are valid in JSON strings.
+_LINE_TERMINATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+_UTF8 = ('utf-8', 'utf8')
+
+
+def fast_json_enabled() -> bool:
+    return orjson is not None and getattr(settings, 'API_FAST_JSON', True)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not fast_json_enabled() or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(data, default=self.encoder_class().default, option=_DUMPS_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Same result, or the same error, as the DRF renderer.
+            return super().render(data, accepted_media_type, renderer_context)
+        for terminator, escaped in _LINE_TERMINATORS:
+            if terminator in rendered:
+                rendered = rendered.replace(terminator, escaped)
+        return rendered
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not fast_json_enabled() or encoding.lower() not in _UTF8:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Let the DRF parser accept or reject it, with its own error message.
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -6,7 +6,10 @@ from .models import Review, ReviewItem
 class ReviewItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReviewItem
-        fields = '__all__'
+        exclude = (
+            'refresh_lease_owner', 'refresh_lease_expires_at', 'lookup_hit_count', 'last_lookup_hit_at',
+            'refresh_next_attempt_at', 'refresh_not_found_count', 'refresh_tombstoned_at',
+        )
         extra_kwargs = {
             'item_id': {
                 'validators': []
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from review.models import Review, ReviewItem
+from review.utils import item_refresh, review_versions, trigram_search
+
+# Item content shown in API output. Refresh bookkeeping (timestamps, error
+# counts) is left out: revalidations and failures rewrite it constantly.
+ITEM_OUTPUT_FIELDS = item_refresh.REFRESHED_FIELDS + ('category',)
+
+
+def _touches(update_fields, *field_names: str) -> bool:
+    return update_fields is None or any(field_name in update_fields for field_name in field_names)
+
+
+def _bump_versions_on_commit(instance, *scopes: str):
+    # Bumped before commit, new stamps could be paired with (and cached
+    # alongside) rows a concurrent request read before the write landed.
+    transaction.on_commit(lambda: review_versions.bump(*scopes), using=instance._state.db)
+
+
+@receiver(post_save, sender=ReviewItem)
+def item_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    if _touches(update_fields, 'title'):
+        trigram_search.invalidate()
+    # A new item shows up in output only with its first review, which bumps its own scopes.
+    if not created and _touches(update_fields, *ITEM_OUTPUT_FIELDS):
+        _bump_versions_on_commit(instance, review_versions.SCOPE_ITEMS)
+
+
+def _bump_review_versions(review):
+    scopes = [review_versions.SCOPE_REVIEWS, review_versions.review_scope(review.pk)]
+    if Review.user.is_cached(review):
+        scopes.append(review_versions.user_scope(review.user.username))
+    else:
+        # Not worth a query: invalidate every user's stamps instead.
+        scopes.append(review_versions.SCOPE_USERS)
+    _bump_versions_on_commit(review, *scopes)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, 'review_tags'):
+        trigram_search.invalidate()
+    _bump_review_versions(instance)
+
+
+@receiver(post_delete, sender=ReviewItem)
+@receiver(post_delete, sender=Review)
+def review_or_item_deleted(sender, instance, **kwargs):
+    trigram_search.invalidate()
+    if sender is Review:
+        _bump_review_versions(instance)
+    else:
+        _bump_versions_on_commit(instance, review_versions.SCOPE_ITEMS)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    # Usernames are part of review output; logins only touch last_login.
+    if not created and _touches(update_fields, 'username'):
+        _bump_versions_on_commit(instance, review_versions.SCOPE_USERS)
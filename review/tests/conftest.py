@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Cached lookups and shared counters must not leak between tests."""
+    for cache in caches.all():
+        cache.clear()
+    yield
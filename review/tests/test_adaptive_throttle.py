@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+
+from review.utils import adaptive_throttle
+from review.utils.api_utils import request_json_with_retry
+
+
+class _ResponseStub:
+    def __init__(self, status_code, json_data=None, headers=None):
+        self.status_code = status_code
+        self._json_data = json_data or {}
+        self.headers = headers or {}
+        self.reason = ''
+
+    def json(self):
+        return self._json_data
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+THROTTLE_SETTINGS = {
+    'UPSTREAM_THROTTLE_ENABLED': True,
+    'UPSTREAM_THROTTLE_MAX_RPS': {'omdb': 4.0, 'rawg': 2.0},
+    'UPSTREAM_THROTTLE_MIN_RPS': 0.5,
+    'UPSTREAM_THROTTLE_INCREASE_RPS': 0.5,
+    'UPSTREAM_THROTTLE_DECREASE_FACTOR': 0.5,
+}
+
+
+class RetryAfterParsingTest(SimpleTestCase):
+    def test_delta_seconds(self):
+        self.assertEqual(adaptive_throttle.parse_retry_after('120'), 120)
+        self.assertIsNone(adaptive_throttle.parse_retry_after('soon'))
+        self.assertIsNone(adaptive_throttle.parse_retry_after(None))
+
+    def test_http_date(self):
+        # Wed, 21 Oct 2015 07:28:00 GMT
+        now = 1445412480.0 - 30
+        self.assertEqual(adaptive_throttle.parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=now), 30)
+
+    def test_rate_limit_reset_accepts_epoch_timestamps(self):
+        headers = {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': '2000000010'}
+        self.assertEqual(adaptive_throttle.parse_rate_limit(headers, now=2000000000.0), (5, 10))
+        self.assertEqual(adaptive_throttle.parse_rate_limit({'RateLimit-Remaining': '3', 'RateLimit-Reset': '6'}), (3, 6))
+
+
+@override_settings(**THROTTLE_SETTINGS)
+class AdaptiveThrottleTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = _Clock()
+        self.throttle = adaptive_throttle.AdaptiveThrottle('OMDB API', clock=self.clock)
+
+    def test_halves_on_429_and_recovers_additively(self):
+        self.throttle.record_response(429, {})
+        self.assertEqual(self.throttle.rate, 2.0)
+        self.throttle.record_response(429, {})
+        self.throttle.record_response(429, {})
+        self.assertEqual(self.throttle.rate, 0.5)
+
+        self.throttle.record_response(200, {})
+        self.assertEqual(self.throttle.rate, 1.0)
+        for _ in range(10):
+            self.throttle.record_response(200, {})
+        self.assertEqual(self.throttle.rate, 4.0)
+        self.assertEqual(REGISTRY.get_sample_value('critic_upstream_allowed_rate_rps', {'provider': 'omdb'}), 4.0)
+
+    def test_window_limits_requests_to_allowed_rate(self):
+        self.assertEqual([self.throttle.try_acquire() for _ in range(4)], [0, 0, 0, 0])
+        self.assertEqual(self.throttle.try_acquire(), 1.0)
+
+        self.clock.now += 1
+        self.assertEqual(self.throttle.try_acquire(), 0)
+
+    def test_retry_after_pauses_provider(self):
+        self.throttle.record_response(503, {'Retry-After': '20'})
+
+        self.assertEqual(self.throttle.rate, 4.0)
+        self.assertEqual(self.throttle.try_acquire(), 20)
+        self.clock.now += 20
+        self.assertEqual(self.throttle.try_acquire(), 0)
+
+    def test_spent_quota_pauses_until_reset(self):
+        self.throttle.record_response(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '15'})
+
+        self.assertEqual(self.throttle.try_acquire(), 15)
+
+    def test_remaining_quota_caps_rate(self):
+        self.throttle.record_response(200, {'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': '10'})
+
+        self.assertEqual(self.throttle.rate, 1.0)
+
+    def test_providers_are_independent(self):
+        self.throttle.record_response(429, {'Retry-After': '60'})
+        other = adaptive_throttle.AdaptiveThrottle('RAWG API', clock=self.clock)
+
+        self.assertEqual(other.rate, 2.0)
+        self.assertEqual(other.try_acquire(), 0)
+
+    @override_settings(UPSTREAM_THROTTLE_ENABLED=False)
+    def test_disabled_throttle_never_waits(self):
+        self.throttle.record_response(429, {'Retry-After': '60'})
+
+        self.assertEqual(self.throttle.try_acquire(), 0)
+        self.assertEqual(self.throttle.rate, 4.0)
+
+
+@override_settings(**THROTTLE_SETTINGS)
+class ThrottledRequestTest(SimpleTestCase):
+    def test_request_waits_for_pause_then_succeeds(self):
+        clock = _Clock()
+        adaptive_throttle.AdaptiveThrottle('OMDB API', clock=clock)._pause(clock.now, 2)
+
+        def advance(seconds):
+            clock.now += seconds
+
+        with mock.patch('review.utils.adaptive_throttle.time.time', new=clock):
+            with mock.patch('review.utils.api_utils.time.sleep', side_effect=advance) as sleep_mock:
+                with mock.patch('review.utils.http_sessions.requests.Session.get', return_value=_ResponseStub(200, {'ok': True})):
+                    json_data, error = request_json_with_retry('https://example.com', source_name='OMDB API')
+
+        self.assertEqual(json_data, {'ok': True})
+        self.assertEqual(error, {})
+        sleep_mock.assert_called_once_with(2)
+
+    @override_settings(UPSTREAM_THROTTLE_MAX_WAIT_SECONDS=5)
+    def test_long_pause_fails_without_calling_upstream(self):
+        with mock.patch('review.utils.api_utils.time.sleep'):
+            with mock.patch('review.utils.http_sessions.requests.Session.get', return_value=_ResponseStub(429, headers={'Retry-After': '60'})) as get_mock:
+                request_json_with_retry('https://example.com', source_name='OMDB API', retries=1)
+                json_data, error = request_json_with_retry('https://example.com', source_name='OMDB API')
+
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertEqual(json_data, {})
+        self.assertTrue(error['rate_limited'])
+        self.assertEqual(adaptive_throttle.get_throttle('OMDB API').rate, 2.0)
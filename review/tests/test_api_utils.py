@@ -1,9 +1,19 @@
+import asyncio
+import json
+import threading
 from unittest import mock
 
 from django.test import SimpleTestCase
+import aiohttp
 import requests
 
-from review.utils.api_utils import normalize_imdb_title_url_to_item_id, request_json_with_retry
+from review.utils.api_utils import (
+    normalize_imdb_title_url_to_item_id,
+    request_json_with_retry,
+    request_json_with_retry_async,
+)
+from review.utils import http_sessions
+from review.utils.deadlines import Deadline, current_deadline, deadline_scope
 
 
 class _ResponseStub:
@@ -20,7 +30,7 @@ class _ResponseStub:
 class RequestJsonRetryTest(SimpleTestCase):
     def test_retries_then_succeeds(self):
         with mock.patch('review.utils.api_utils.time.sleep') as sleep_mock:
-            with mock.patch('review.utils.api_utils.requests.get', side_effect=[
+            with mock.patch('review.utils.http_sessions.requests.Session.get', side_effect=[
                 _ResponseStub(429, headers={'Retry-After': '1'}, reason='Too Many Requests'),
                 _ResponseStub(200, json_data={'ok': True}),
             ]):
@@ -31,7 +41,7 @@ class RequestJsonRetryTest(SimpleTestCase):
         sleep_mock.assert_called_once_with(1)
 
     def test_returns_status_reason_on_final_failure(self):
-        with mock.patch('review.utils.api_utils.requests.get', return_value=_ResponseStub(503, reason='Service Unavailable')):
+        with mock.patch('review.utils.http_sessions.requests.Session.get', return_value=_ResponseStub(503, reason='Service Unavailable')):
             json_data, error = request_json_with_retry('https://example.com', source_name='Test API')
 
         self.assertEqual(json_data, {})
@@ -42,7 +52,7 @@ class RequestJsonRetryTest(SimpleTestCase):
 
     def test_request_exception_retries_then_errors(self):
         with mock.patch('review.utils.api_utils.time.sleep') as sleep_mock:
-            with mock.patch('review.utils.api_utils.requests.get', side_effect=requests.ConnectionError('boom')):
+            with mock.patch('review.utils.http_sessions.requests.Session.get', side_effect=requests.ConnectionError('boom')):
                 json_data, error = request_json_with_retry('https://example.com', source_name='Test API')
 
         self.assertEqual(json_data, {})
@@ -52,6 +62,136 @@ class RequestJsonRetryTest(SimpleTestCase):
         self.assertEqual(sleep_mock.call_count, 2)
 
 
+class _AsyncResponseStub(_ResponseStub):
+    """Stands in for the context manager returned by ``aiohttp.ClientSession.get``."""
+
+    @property
+    def status(self):
+        return self.status_code
+
+    async def read(self):
+        return json.dumps(self._json_data).encode('utf-8')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def _run_async_request(url, **kwargs):
+    async def run():
+        try:
+            return await request_json_with_retry_async(url, **kwargs)
+        finally:
+            await http_sessions.close_async_sessions()
+    return asyncio.run(run())
+
+
+class RequestJsonRetryAsyncTest(SimpleTestCase):
+    def test_retries_then_succeeds(self):
+        with mock.patch('review.utils.api_utils.asyncio.sleep', new=mock.AsyncMock()) as sleep_mock:
+            with mock.patch('review.utils.http_sessions.aiohttp.ClientSession.get', side_effect=[
+                _AsyncResponseStub(429, headers={'Retry-After': '1'}, reason='Too Many Requests'),
+                _AsyncResponseStub(200, json_data={'ok': True}),
+            ]):
+                json_data, error = _run_async_request('https://example.com', source_name='Test API')
+
+        self.assertEqual(json_data, {'ok': True})
+        self.assertEqual(error, {})
+        sleep_mock.assert_awaited_once_with(1)
+
+    def test_client_error_retries_then_errors(self):
+        with mock.patch('review.utils.api_utils.asyncio.sleep', new=mock.AsyncMock()):
+            with mock.patch(
+                'review.utils.http_sessions.aiohttp.ClientSession.get',
+                side_effect=aiohttp.ClientConnectionError('boom'),
+            ) as get_mock:
+                json_data, error = _run_async_request('https://example.com', source_name='Test API', retries=2)
+
+        self.assertEqual(json_data, {})
+        self.assertEqual(error['response'], 'False')
+        self.assertEqual(error['exception_type'], 'ClientConnectionError')
+        self.assertEqual(get_mock.call_count, 2)
+
+
+    def test_breaker_and_throttle_run_off_the_event_loop(self):
+        from review.utils.adaptive_throttle import AdaptiveThrottle
+        from review.utils.circuit_breaker import CircuitBreaker
+
+        calls = []
+        loop_threads = []
+
+        def record(name):
+            def call(*args, **kwargs):
+                calls.append((name, threading.get_ident()))
+                return {'allow_request': True, 'try_acquire': 0.0}.get(name)
+            return call
+
+        async def run():
+            loop_threads.append(threading.get_ident())
+            try:
+                return await request_json_with_retry_async('https://example.com', source_name='Test API')
+            finally:
+                await http_sessions.close_async_sessions()
+
+        with mock.patch.object(CircuitBreaker, 'allow_request', record('allow_request')), \
+                mock.patch.object(CircuitBreaker, 'record_success', record('record_success')), \
+                mock.patch.object(AdaptiveThrottle, 'try_acquire', record('try_acquire')), \
+                mock.patch.object(AdaptiveThrottle, 'record_response', record('record_response')), \
+                mock.patch('review.utils.http_sessions.aiohttp.ClientSession.get', return_value=_AsyncResponseStub(200)):
+            asyncio.run(run())
+
+        self.assertEqual([name for name, _ in calls], ['allow_request', 'try_acquire', 'record_success', 'record_response'])
+        self.assertNotIn(loop_threads[0], {thread for _, thread in calls})
+
+
+class RequestJsonDeadlineTest(SimpleTestCase):
+    def test_retry_after_longer_than_budget_fails_fast(self):
+        with mock.patch('review.utils.api_utils.time.sleep') as sleep_mock:
+            with mock.patch('review.utils.http_sessions.requests.Session.get', return_value=_ResponseStub(
+                429, headers={'Retry-After': '120'}, reason='Too Many Requests',
+            )) as get_mock:
+                with deadline_scope(5):
+                    json_data, error = request_json_with_retry('https://example.com', source_name='RAWG API')
+
+        self.assertEqual(json_data, {})
+        self.assertTrue(error['deadline_exceeded'])
+        self.assertEqual(error['status_code'], 429)
+        self.assertEqual(error['retry_after'], 120)
+        self.assertEqual(get_mock.call_count, 1)
+        sleep_mock.assert_not_called()
+
+    def test_request_timeout_is_capped_by_remaining_budget(self):
+        with mock.patch('review.utils.http_sessions.requests.Session.get', return_value=_ResponseStub(200, json_data={'ok': True})) as get_mock:
+            request_json_with_retry('https://example.com', source_name='Test API', deadline=Deadline(2))
+
+        self.assertLessEqual(get_mock.call_args.kwargs['timeout'], 2)
+
+    def test_expired_budget_skips_upstream_call(self):
+        with mock.patch('review.utils.http_sessions.requests.Session.get') as get_mock:
+            json_data, error = request_json_with_retry('https://example.com', source_name='Test API', deadline=Deadline(0))
+
+        self.assertEqual(json_data, {})
+        self.assertTrue(error['deadline_exceeded'])
+        get_mock.assert_not_called()
+
+    def test_exception_backoff_stops_when_budget_runs_out(self):
+        with mock.patch('review.utils.api_utils.time.sleep') as sleep_mock:
+            with mock.patch('review.utils.http_sessions.requests.Session.get', side_effect=requests.ConnectionError('boom')):
+                json_data, error = request_json_with_retry('https://example.com', source_name='Test API', deadline=Deadline(1))
+
+        self.assertEqual(error['exception_type'], 'ConnectionError')
+        sleep_mock.assert_not_called()
+
+    def test_nested_scope_never_extends_outer_deadline(self):
+        with deadline_scope(1) as outer:
+            with deadline_scope(60) as inner:
+                self.assertIs(inner, outer)
+                self.assertIs(current_deadline(), outer)
+        self.assertIsNone(current_deadline())
+
+
 def test_normalize_imdb_title_url_to_item_id_accepts_title_url():
     assert normalize_imdb_title_url_to_item_id('https://www.imdb.com/title/tt0111161/') == 'omdb_tt0111161'
 
@@ -1,6 +1,7 @@
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APITestCase
 
@@ -36,6 +37,37 @@ class _FakeLookupAPI:
         }
 
 
+class _CountingLookupAPI(_FakeLookupAPI):
+    source_name = 'OMDB API'
+
+    def __init__(self, search_response=None):
+        self.search_calls = 0
+        self._search_response = search_response
+
+    def search(self, query):
+        self.search_calls += 1
+        if self._search_response is not None:
+            return dict(self._search_response)
+        return super().search(query)
+
+
+class _AsyncFakeLookupAPI(_FakeLookupAPI):
+    source_name = 'OMDB API'
+
+    def __init__(self, details_response=None):
+        self.details_calls = 0
+        self._details_response = details_response
+
+    async def search_async(self, query):
+        return self.search(query)
+
+    async def get_details_async(self, item_id):
+        self.details_calls += 1
+        if self._details_response is not None:
+            return dict(self._details_response)
+        return self.get_details(item_id)
+
+
 class ReviewV2Phase2Test(APITestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(username='phase2_user', password='pass12345')
@@ -247,6 +279,43 @@ class LookupV2Test(APITestCase):
         self.assertEqual(json_data['data'][0]['item_id'], 'omdb_tt9999999')
         self.assertEqual(json_data['data'][0]['title'], 'Title')
 
+    def test_search_v2_caches_normalized_query(self):
+        self._patch_category_api()
+        from review import views
+        fake_api = _CountingLookupAPI()
+        views.CATEGORY_TO_API['movie'] = fake_api
+
+        first = self.client.get('/api/v2/lookup/search/movie/', {'q': 'The  Matrix'})
+        second = self.client.get('/api/v2/lookup/search/movie/', {'q': ' the matrix '})
+
+        self.assertEqual(first.json()['meta']['cache'], 'miss')
+        self.assertEqual(second.json()['meta']['cache'], 'hit')
+        self.assertEqual(second.json()['data'], first.json()['data'])
+        self.assertEqual(fake_api.search_calls, 1)
+
+    def test_search_v2_cache_is_scoped_by_category(self):
+        self._patch_category_api()
+        from review import views
+        views.CATEGORY_TO_API['movie'] = _CountingLookupAPI()
+        views.CATEGORY_TO_API['game'] = _CountingLookupAPI()
+
+        self.client.get('/api/v2/lookup/search/movie/', {'q': 'portal'})
+        response = self.client.get('/api/v2/lookup/search/game/', {'q': 'portal'})
+
+        self.assertEqual(response.json()['meta']['cache'], 'miss')
+
+    def test_search_v2_does_not_cache_upstream_errors(self):
+        self._patch_category_api()
+        from review import views
+        fake_api = _CountingLookupAPI(search_response={'response': 'False', 'error': 'Upstream down'})
+        views.CATEGORY_TO_API['movie'] = fake_api
+
+        self.client.get('/api/v2/lookup/search/movie/', {'q': 'test'})
+        response = self.client.get('/api/v2/lookup/search/movie/', {'q': 'test'})
+
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(fake_api.search_calls, 2)
+
     def test_search_v2_invalid_category(self):
         response = self.client.get('/api/v2/lookup/search/invalid/', {'q': 'test'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -259,6 +328,57 @@ class LookupV2Test(APITestCase):
         response = self.client.get('/api/v2/lookup/search/movie/', {'q': 'test'})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    # --- FederatedSearchV2 ---
+
+    def test_federated_search_merges_all_categories(self):
+        self._patch_category_api()
+        from review import views
+        views.CATEGORY_TO_API['anime'] = _FakeLookupAPI()
+        views.CATEGORY_TO_API['manga'] = _FakeLookupAPI()
+        response = self.client.get('/api/v2/lookup/search/', {'q': 'test'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        json_data = response.json()
+        self.assertEqual(
+            sorted(item['category'] for item in json_data['data']),
+            sorted(['movie', 'game', 'anime', 'manga']),
+        )
+        self.assertFalse(json_data['meta']['partial'])
+        self.assertEqual(set(json_data['meta']['providers']), {'movie', 'game', 'anime', 'manga'})
+
+    def test_federated_search_returns_partial_results(self):
+        self._patch_category_api()
+        from review import views
+        views.CATEGORY_TO_API['game'] = _CountingLookupAPI(search_response={'response': 'False', 'error': 'Down'})
+
+        response = self.client.get('/api/v2/lookup/search/', {'q': 'test', 'categories': 'movie,game'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        json_data = response.json()
+        self.assertEqual([item['category'] for item in json_data['data']], ['movie'])
+        self.assertTrue(json_data['meta']['partial'])
+        self.assertEqual(json_data['meta']['providers']['game']['status'], 'error')
+        self.assertEqual(json_data['meta']['providers']['movie']['status'], 'ok')
+
+    def test_federated_search_all_providers_failing(self):
+        self._patch_category_api()
+        from review import views
+        views.CATEGORY_TO_API['movie'] = _CountingLookupAPI(search_response={'response': 'False', 'error': 'Down'})
+
+        response = self.client.get('/api/v2/lookup/search/', {'q': 'test', 'categories': 'movie'})
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        json_data = response.json()
+        self.assertEqual(json_data['error']['code'], 'UPSTREAM_ERROR')
+        self.assertEqual(json_data['error']['details']['providers']['movie']['status'], 'error')
+
+    def test_federated_search_invalid_category(self):
+        response = self.client.get('/api/v2/lookup/search/', {'q': 'test', 'categories': 'movie,invalid'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['error']['code'], 'INVALID_CATEGORY')
+
+    def test_federated_search_requires_query_param(self):
+        response = self.client.get('/api/v2/lookup/search/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+
     # --- GetItemInfoV2 ---
 
     def test_get_item_info_v2_returns_envelope(self):
@@ -305,3 +425,120 @@ class LookupV2Test(APITestCase):
         response = self.client.get('/api/v2/lookup/item/movie/omdb_tt1111111/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+
+class _AsyncSessionLookupAPI(_AsyncFakeLookupAPI):
+    """Searches through the pooled aiohttp session, like the real providers."""
+
+    async def search_async(self, query):
+        from review.utils import api_utils
+        await api_utils.request_json_with_retry_async('https://example.com/search', source_name=self.source_name)
+        return self.search(query)
+
+
+class LookupAsyncV2Test(TestCase):
+    """Tests for the async variants of the v2 lookup endpoints."""
+
+    def setUp(self):
+        from review import views
+        self.user = get_user_model().objects.create_user(username='async_lookup_user', password='pass12345')
+        self._original_category_to_api = dict(views.CATEGORY_TO_API)
+        self.fake_api = _AsyncFakeLookupAPI()
+        views.CATEGORY_TO_API['movie'] = self.fake_api
+
+    def tearDown(self):
+        from review import views
+        views.CATEGORY_TO_API.update(self._original_category_to_api)
+
+    async def test_async_search_returns_envelope(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/v2/lookup/async/search/movie/', {'q': 'test'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        json_data = response.json()
+        self.assertEqual(json_data['data'][0]['title'], 'test')
+        self.assertEqual(json_data['meta'], {'version': '2.0', 'cache': 'miss'})
+
+    async def test_async_search_requires_query_param(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/v2/lookup/async/search/movie/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+
+    async def test_async_search_unauthenticated_matches_sync(self):
+        for headers in ({}, {'Authorization': 'Bearer not-a-token'}):
+            sync_response = await self.async_client.get('/api/v2/lookup/search/movie/', {'q': 'test'}, headers=headers)
+            response = await self.async_client.get('/api/v2/lookup/async/search/movie/', {'q': 'test'}, headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(
+                (response.status_code, response.json(), response['WWW-Authenticate']),
+                (sync_response.status_code, sync_response.json(), sync_response['WWW-Authenticate']),
+            )
+
+    def test_wsgi_requests_close_their_upstream_sessions(self):
+        import json
+        from unittest import mock
+
+        from review import views
+        from review.utils import http_sessions
+
+        class _Response:
+            status = 200
+            reason = 'OK'
+            headers = {}
+
+            async def read(self):
+                return json.dumps({'ok': True}).encode('utf-8')
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        views.CATEGORY_TO_API['movie'] = _AsyncSessionLookupAPI()
+        build_session = http_sessions.ProviderAsyncSessionPool._build_session
+        sessions = []
+
+        def tracked_build_session(pool):
+            sessions.append(build_session(pool))
+            return sessions[-1]
+
+        self.client.force_login(self.user)
+        with mock.patch.object(http_sessions.ProviderAsyncSessionPool, '_build_session', tracked_build_session), \
+                mock.patch('review.utils.http_sessions.aiohttp.ClientSession.get', return_value=_Response()):
+            for query in ('first', 'second'):
+                response = self.client.get('/api/v2/lookup/async/search/movie/', {'q': query})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(sessions), 2)
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(len(http_sessions._default_async_pool._sessions), 0)
+
+    async def test_async_search_accepts_jwt(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        token = str(AccessToken.for_user(self.user))
+        response = await self.async_client.get(
+            '/api/v2/lookup/async/search/movie/',
+            {'q': 'test'},
+            headers={'Authorization': 'Bearer {}'.format(token)},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    async def test_async_item_info_persists_new_item(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/v2/lookup/async/item/movie/omdb_tt7777777/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['item_id'], 'omdb_tt7777777')
+        self.assertTrue(await ReviewItem.objects.filter(item_id='omdb_tt7777777').aexists())
+
+        await self.async_client.get('/api/v2/lookup/async/item/movie/omdb_tt7777777/')
+        self.assertEqual(self.fake_api.details_calls, 1)
+
+    async def test_async_item_info_maps_upstream_errors(self):
+        from review import views
+        views.CATEGORY_TO_API['movie'] = _AsyncFakeLookupAPI(
+            details_response={'response': 'False', 'error': 'Slow', 'deadline_exceeded': True, 'source': 'OMDB API'},
+        )
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/v2/lookup/async/item/movie/omdb_tt6666666/')
+        self.assertEqual(response.status_code, status.HTTP_504_GATEWAY_TIMEOUT)
+        self.assertEqual(response.json()['error']['code'], 'UPSTREAM_TIMEOUT')
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from critic.settings import common
+from review.apps import warn_if_shared_cache_is_local
+
+
+class CacheOptionsTest(SimpleTestCase):
+    def test_max_entries_only_for_culling_backends(self):
+        for backend, expected in (
+            ('django.core.cache.backends.locmem.LocMemCache', {'MAX_ENTRIES': 10}),
+            ('django.core.cache.backends.filebased.FileBasedCache', {'MAX_ENTRIES': 10}),
+            ('django.core.cache.backends.db.DatabaseCache', {'MAX_ENTRIES': 10}),
+            ('django.core.cache.backends.redis.RedisCache', {}),
+            ('django.core.cache.backends.memcached.PyMemcacheCache', {}),
+            ('RedisCache', {}),
+            ('', {}),
+        ):
+            with self.subTest(backend=backend), mock.patch.object(common, 'CACHE_BACKEND', backend):
+                self.assertEqual(common._cache_options(10), expected)
+
+
+class SharedCacheWarningTest(SimpleTestCase):
+    def test_warns_when_shared_cache_is_local(self):
+        local = {'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=local), self.assertLogs('review.apps', level='WARNING'):
+            warn_if_shared_cache_is_local()
+
+    def test_quiet_for_shared_backends(self):
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                  'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'critic_shared_cache'}}
+        with override_settings(CACHES=shared), self.assertNoLogs('review.apps', level='WARNING'):
+            warn_if_shared_cache_is_local()
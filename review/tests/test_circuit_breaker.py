@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+import requests
+
+from review.utils import circuit_breaker
+from review.utils.api_utils import request_json_with_retry
+
+
+class _ResponseStub:
+    def __init__(self, status_code, json_data=None, reason=''):
+        self.status_code = status_code
+        self._json_data = json_data or {}
+        self.headers = {}
+        self.reason = reason
+
+    def json(self):
+        return self._json_data
+
+
+BREAKER_SETTINGS = {
+    'UPSTREAM_CIRCUIT_MIN_REQUESTS': 2,
+    'UPSTREAM_CIRCUIT_ERROR_RATE': 0.5,
+    'UPSTREAM_CIRCUIT_OPEN_SECONDS': 30,
+    'UPSTREAM_CIRCUIT_SLOW_CALL_SECONDS': 5,
+}
+
+
+@override_settings(**BREAKER_SETTINGS)
+class CircuitBreakerTest(SimpleTestCase):
+    def test_opens_after_error_rate_threshold(self):
+        breaker = circuit_breaker.get_breaker('OMDB API')
+        breaker.record_failure(0.1)
+        self.assertEqual(breaker.state, circuit_breaker.CLOSED)
+        breaker.record_failure(0.1)
+
+        self.assertEqual(breaker.state, circuit_breaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(REGISTRY.get_sample_value('critic_upstream_circuit_state', {'provider': 'omdb'}), 2)
+
+    def test_opens_on_slow_calls(self):
+        breaker = circuit_breaker.get_breaker('RAWG API')
+        breaker.record_success(6)
+        breaker.record_success(7)
+
+        self.assertEqual(breaker.state, circuit_breaker.OPEN)
+
+    def test_half_open_allows_single_probe_then_closes_on_success(self):
+        breaker = circuit_breaker.get_breaker('Jikan API')
+        with mock.patch('review.utils.circuit_breaker.time.time', return_value=1000.0):
+            breaker.record_failure(0.1)
+            breaker.record_failure(0.1)
+        with mock.patch('review.utils.circuit_breaker.time.time', return_value=1031.0):
+            self.assertTrue(breaker.allow_request())
+            self.assertEqual(breaker.state, circuit_breaker.HALF_OPEN)
+            self.assertFalse(breaker.allow_request())
+            breaker.record_success(0.1)
+
+        self.assertEqual(breaker.state, circuit_breaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+
+    def test_failed_probe_reopens(self):
+        breaker = circuit_breaker.get_breaker('Jikan API')
+        with mock.patch('review.utils.circuit_breaker.time.time', return_value=1000.0):
+            breaker.record_failure(0.1)
+            breaker.record_failure(0.1)
+        with mock.patch('review.utils.circuit_breaker.time.time', return_value=1031.0):
+            self.assertTrue(breaker.allow_request())
+            breaker.record_failure(0.1)
+            self.assertEqual(breaker.state, circuit_breaker.OPEN)
+            self.assertFalse(breaker.allow_request())
+
+    def test_open_circuit_fails_fast_without_calling_upstream(self):
+        with mock.patch('review.utils.api_utils.time.sleep'):
+            with mock.patch('review.utils.http_sessions.requests.Session.get', side_effect=requests.ConnectionError('boom')) as get_mock:
+                request_json_with_retry('https://example.com', source_name='OMDB API')
+                self.assertEqual(get_mock.call_count, 2)
+                json_data, error = request_json_with_retry('https://example.com', source_name='OMDB API')
+
+        self.assertEqual(get_mock.call_count, 2)
+        self.assertEqual(json_data, {})
+        self.assertTrue(error['circuit_open'])
+        self.assertEqual(error['source'], 'OMDB API')
+
+
+class _FailingLookupAPI:
+    source_name = 'OMDB API'
+
+    def search(self, query):
+        raise AssertionError('search should not be called while the circuit is open')
+
+    def get_details(self, item_id):
+        return {
+            'response': 'False',
+            'error': 'Upstream API temporarily unavailable.',
+            'circuit_open': True,
+            'source': self.source_name,
+        }
+
+
+class CircuitOpenLookupViewTest(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='breaker_user', password='pass12345')
+        self.client.force_authenticate(user=user)
+
+        from review import views
+        original = dict(views.CATEGORY_TO_API)
+        self.addCleanup(views.CATEGORY_TO_API.update, original)
+        views.CATEGORY_TO_API['movie'] = _FailingLookupAPI()
+
+    def test_item_info_returns_upstream_unavailable(self):
+        response = self.client.get('/api/v2/lookup/item/movie/omdb_tt0000001/')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()['error']['code'], 'UPSTREAM_UNAVAILABLE')
@@ -0,0 +1,242 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import parse_http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from review.models import Review, ReviewItem
+from review.tests.factories import create_review_item
+from review.utils import review_versions
+
+LIST_URL = '/api/v2/reviews/'
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='etag', password='pass12345')
+        self.other = get_user_model().objects.create_user(username='etag_other', password='pass12345')
+        self.item = create_review_item(item_id='etag_item')
+        self.review = Review.objects.create(user=self.user, review_item=self.item, review_rating=7)
+        Review.objects.create(user=self.other, review_item=create_review_item(item_id='etag_other'), review_rating=4)
+
+    def _revalidate(self, url, params=None, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {}, headers=headers)
+        return response, len(queries.captured_queries)
+
+    def test_list_if_none_match_returns_304_without_queries(self):
+        first = self.client.get(LIST_URL, {'ordering': 'rating'})
+        self.assertTrue(first['ETag'].startswith('W/"'))
+
+        response, query_count = self._revalidate(LIST_URL, {'ordering': 'rating'}, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.content, b'')
+        self.assertEqual(query_count, 0)
+
+    def test_list_if_modified_since(self):
+        first = self.client.get(LIST_URL)
+
+        response, _ = self._revalidate(LIST_URL, if_modified_since=first['Last-Modified'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_second_write_in_the_same_second_changes_last_modified(self):
+        with mock.patch('review.utils.review_versions.time.time', return_value=1_700_000_000):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.review.save()
+            first = self.client.get(LIST_URL)
+            self.review.review_rating = 3
+            with self.captureOnCommitCallbacks(execute=True):
+                self.review.save()
+
+            response, _ = self._revalidate(LIST_URL, if_modified_since=first['Last-Modified'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(parse_http_date(response['Last-Modified']), parse_http_date(first['Last-Modified']))
+
+    def test_etag_depends_on_query_parameters(self):
+        first = self.client.get(LIST_URL, {'ordering': 'rating'})
+
+        response, _ = self._revalidate(LIST_URL, {'ordering': 'alpha'}, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_review_write_changes_list_etag(self):
+        first = self.client.get(LIST_URL)
+        self.review.review_rating = 8
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review.save()
+
+        response, _ = self._revalidate(LIST_URL, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_user_list_only_changes_with_that_users_reviews(self):
+        params = {'username': 'etag'}
+        first = self.client.get(LIST_URL, params)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.other, review_item=create_review_item(item_id='etag_third'), review_rating=5)
+
+        unchanged, _ = self._revalidate(LIST_URL, params, if_none_match=first['ETag'])
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.user, review_item=create_review_item(item_id='etag_fourth'), review_rating=5)
+        changed, _ = self._revalidate(LIST_URL, params, if_none_match=first['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+
+    def test_item_write_changes_list_etag(self):
+        first = self.client.get(LIST_URL, {'username': 'etag'})
+        self.item.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.save()
+
+        response, _ = self._revalidate(LIST_URL, {'username': 'etag'}, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lease_only_item_write_keeps_list_etag(self):
+        first = self.client.get(LIST_URL)
+        self.item.refresh_lease_owner = 'worker'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.save(update_fields=['refresh_lease_owner'])
+
+        response, _ = self._revalidate(LIST_URL, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_unchanged_or_failed_refresh_keeps_list_etag(self):
+        from review.utils import item_refresh
+
+        class _Provider:
+            source_name = 'Test API'
+
+            def __init__(self, details):
+                self.details = details
+
+            def get_details(self, item_id):
+                return self.details
+
+        unchanged = {'response': 'True', **{field: getattr(self.item, field) for field in item_refresh.REFRESHED_FIELDS}}
+        first = self.client.get(LIST_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(item_refresh.refresh_item(self.item.pk, _Provider(unchanged)), 'refreshed')
+            self.assertEqual(item_refresh.refresh_item(self.item.pk, _Provider({'response': 'False', 'status_code': 503})), 'failed')
+
+        response, _ = self._revalidate(LIST_URL, if_none_match=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(item_refresh.refresh_item(self.item.pk, _Provider({**unchanged, 'title': 'Refreshed'})), 'refreshed')
+        response, _ = self._revalidate(LIST_URL, if_none_match=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_versions_are_bumped_only_once_the_write_commits(self):
+        first = self.client.get(LIST_URL)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.review.delete()
+            pending, _ = self._revalidate(LIST_URL, if_none_match=first['ETag'])
+        self.assertEqual(pending.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        for callback in callbacks:
+            callback()
+        response, _ = self._revalidate(LIST_URL, if_none_match=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cursor_pages_carry_validators(self):
+        first = self.client.get(LIST_URL, {'pagination': 'cursor', 'limit': 1})
+
+        response, _ = self._revalidate(LIST_URL, {'pagination': 'cursor', 'limit': 1}, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_conditional_get(self):
+        url = '{}{}/'.format(LIST_URL, self.review.pk)
+        first = self.client.get(url)
+        self.assertIn('Last-Modified', first)
+
+        unchanged, query_count = self._revalidate(url, if_none_match=first['ETag'])
+        self.assertEqual((unchanged.status_code, query_count), (status.HTTP_304_NOT_MODIFIED, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.filter(pk=self.review.pk).first().delete()
+        gone, _ = self._revalidate(url, if_none_match=first['ETag'])
+        self.assertEqual(gone.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', gone)
+
+    def test_detail_etag_ignores_other_reviews(self):
+        url = '{}{}/'.format(LIST_URL, self.review.pk)
+        first = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.other, review_item=create_review_item(item_id='etag_fifth'), review_rating=5)
+
+        response, _ = self._revalidate(url, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_username_change_invalidates(self):
+        url = '{}{}/'.format(LIST_URL, self.review.pk)
+        first = self.client.get(url)
+        self.user.username = 'etag_renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response, _ = self._revalidate(url, if_none_match=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['user'], 'etag_renamed')
+
+
+class VersionStampTest(APITestCase):
+    def test_bulk_update_in_refresh_command_bumps_items(self):
+        from review.management.commands.refresh_review_items import _WriteBuffer
+
+        item = create_review_item(item_id='etag_bulk')
+        before, _ = review_versions.stamps([review_versions.SCOPE_ITEMS])
+        item.title = 'Bulk'
+        buffer = _WriteBuffer(batch_size=10)
+        buffer.add(item, ['title'])
+        buffer.flush()
+
+        after, _ = review_versions.stamps([review_versions.SCOPE_ITEMS])
+        self.assertEqual(ReviewItem.objects.get(pk='etag_bulk').title, 'Bulk')
+        self.assertGreater(after[0], before[0])
+
+    def test_bookkeeping_only_bulk_update_keeps_items_version(self):
+        from review.management.commands.refresh_review_items import _WriteBuffer
+
+        item = create_review_item(item_id='etag_bookkeeping')
+        before, _ = review_versions.stamps([review_versions.SCOPE_ITEMS])
+        item.refresh_error_count = 3
+        buffer = _WriteBuffer(batch_size=10)
+        buffer.add(item, ('last_refresh_attempt_at', 'refresh_error_count'))
+        buffer.flush()
+
+        after, _ = review_versions.stamps([review_versions.SCOPE_ITEMS])
+        self.assertEqual(after, before)
+
+    def test_stamps_live_in_the_shared_cache(self):
+        review_versions.bump(review_versions.SCOPE_ITEMS)
+        before = review_versions.validators([review_versions.SCOPE_ITEMS])
+
+        # Per-process caches going away (another pod, a restart) must not change validators.
+        caches['default'].clear()
+        self.assertEqual(review_versions.validators([review_versions.SCOPE_ITEMS]), before)
+
+        caches['shared'].clear()
+        self.assertNotEqual(review_versions.validators([review_versions.SCOPE_ITEMS]), before)
+
+    def test_last_modified_is_latest_scope_change(self):
+        with mock.patch('review.utils.review_versions.time.time', return_value=1000):
+            review_versions.bump('a')
+        with mock.patch('review.utils.review_versions.time.time', return_value=2000):
+            review_versions.bump('b')
+
+        self.assertEqual(review_versions.stamps(['a', 'b']), ([1, 1], 2000))
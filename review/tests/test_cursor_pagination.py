@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from review.models import Review
+from review.pagination import encode_cursor
+from review.tests.factories import create_review_item
+
+LIST_URL = '/api/v2/reviews/'
+
+
+class CursorPaginationTest(APITestCase):
+    def setUp(self):
+        users = [get_user_model().objects.create_user(username='cursor{}'.format(index), password='pass12345') for index in range(2)]
+        titles = ['banana', 'Apple', 'cherry', 'apple', 'Date', 'elder', 'Fig']
+        ratings = [7, 9, 7, 5, 9, 7, 3]
+        self.reviews = []
+        for index, (title, rating) in enumerate(zip(titles, ratings)):
+            item = create_review_item(item_id='cursor_{}'.format(index), title=title, description='Shared words')
+            self.reviews.append(Review.objects.create(user=users[index % 2], review_item=item, review_rating=rating))
+
+    def _walk(self, params, limit=3):
+        ids, pages = [], []
+        response = self.client.get(LIST_URL, {**params, 'pagination': 'cursor', 'limit': limit})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = response.json()
+            pages.append(body)
+            ids.extend(review['id'] for review in body['data'])
+            next_cursor = body['meta']['pagination']['next_cursor']
+            if not next_cursor:
+                return ids, pages
+            response = self.client.get(LIST_URL, {**params, 'cursor': next_cursor, 'limit': limit})
+
+    def _offset_ids(self, params):
+        response = self.client.get(LIST_URL, {**params, 'limit': 100})
+        return [review['id'] for review in response.json()['data']]
+
+    def test_walk_matches_offset_order_for_every_ordering(self):
+        for ordering in ('', 'alpha', '-alpha', 'rating', '-rating', 'date', '-date'):
+            with self.subTest(ordering=ordering):
+                ids, pages = self._walk({'ordering': ordering})
+                self.assertEqual(len(ids), len(self.reviews))
+                if ordering:
+                    self.assertEqual(ids, self._offset_ids({'ordering': ordering}))
+                self.assertEqual(len(pages), 3)
+
+    def test_first_page_meta(self):
+        response = self.client.get(LIST_URL, {'pagination': 'cursor', 'limit': 3, 'ordering': '-rating'})
+
+        pagination = response.json()['meta']['pagination']
+        self.assertEqual(pagination['limit'], 3)
+        self.assertEqual(pagination['count'], len(self.reviews))
+        self.assertIsNone(pagination['prev_cursor'])
+        self.assertTrue(pagination['next_cursor'])
+
+    def test_prev_cursor_returns_previous_page(self):
+        _, pages = self._walk({'ordering': 'alpha'})
+        prev_cursor = pages[1]['meta']['pagination']['prev_cursor']
+
+        response = self.client.get(LIST_URL, {'ordering': 'alpha', 'cursor': prev_cursor, 'limit': 3})
+
+        self.assertEqual(response.json()['data'], pages[0]['data'])
+        self.assertIsNone(response.json()['meta']['pagination']['prev_cursor'])
+        self.assertEqual(response.json()['meta']['pagination']['next_cursor'], pages[0]['meta']['pagination']['next_cursor'])
+
+    def test_relevance_ordering_with_query(self):
+        ids, _ = self._walk({'ordering': 'relevance', 'query': 'shared'}, limit=2)
+
+        self.assertEqual(ids, self._offset_ids({'ordering': 'relevance', 'query': 'shared'}))
+
+    def test_filters_apply_to_cursor_pages(self):
+        ids, _ = self._walk({'ordering': '-date', 'username': 'cursor0'}, limit=2)
+
+        self.assertEqual(sorted(ids), sorted(review.id for review in self.reviews[::2]))
+
+    def test_rejects_malformed_cursor(self):
+        response = self.client.get(LIST_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+
+    def test_rejects_cursor_from_another_ordering(self):
+        cursor = encode_cursor('rating', 'n', [7, self.reviews[0].id])
+
+        response = self.client.get(LIST_URL, {'cursor': cursor, 'ordering': 'alpha'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_limit_offset_still_works(self):
+        response = self.client.get(LIST_URL, {'limit': 2, 'offset': 2, 'ordering': 'rating'})
+
+        pagination = response.json()['meta']['pagination']
+        self.assertEqual(pagination, {'count': len(self.reviews), 'count_type': 'exact', 'limit': 2, 'offset': 2})
+        self.assertEqual(len(response.json()['data']), 2)
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from review.utils import federated_search
+
+
+class _SearchAPI:
+    def __init__(self, source_name, titles=(), response=None, delay=0.0):
+        self.source_name = source_name
+        self._titles = titles
+        self._response = response
+        self._delay = delay
+
+    def search(self, query):
+        if self._delay:
+            time.sleep(self._delay)
+        if self._response is not None:
+            return dict(self._response)
+        return {
+            'response': 'True',
+            'results': [{'item_id': title.lower(), 'title': title} for title in self._titles],
+        }
+
+
+class RankResultsTest(SimpleTestCase):
+    def test_orders_by_match_then_position_then_category(self):
+        results = federated_search.rank_results({
+            'anime': [{'title': 'Monster Rancher'}, {'title': 'Monster'}],
+            'manga': [{'title': 'Monster'}, {'title': 'The Monster Within'}],
+        }, ' monster ')
+
+        self.assertEqual(
+            [(item['category'], item['title']) for item in results],
+            [
+                ('manga', 'Monster'),
+                ('anime', 'Monster'),
+                ('anime', 'Monster Rancher'),
+                ('manga', 'The Monster Within'),
+            ],
+        )
+
+    def test_does_not_mutate_provider_results(self):
+        provider_results = [{'title': 'Portal'}]
+        federated_search.rank_results({'game': provider_results}, 'portal')
+        self.assertNotIn('category', provider_results[0])
+
+
+class FederatedSearchTest(SimpleTestCase):
+    def test_reports_partial_results_per_provider(self):
+        results, provider_status = federated_search.federated_search('dune', {
+            'movie': _SearchAPI('OMDB API', titles=['Dune']),
+            'game': _SearchAPI('RAWG API', response={'response': 'False', 'error': 'Down'}),
+            'anime': _SearchAPI('Jikan API', response={'response': 'False', 'circuit_open': True}),
+        }, timeout=2)
+
+        self.assertEqual([item['item_id'] for item in results], ['dune'])
+        self.assertEqual(provider_status['movie']['status'], 'ok')
+        self.assertEqual(provider_status['movie']['count'], 1)
+        self.assertEqual(provider_status['game']['status'], 'error')
+        self.assertEqual(provider_status['anime']['status'], 'unavailable')
+
+    def test_slow_provider_times_out_without_blocking_others(self):
+        release = threading.Event()
+
+        class _BlockedAPI(_SearchAPI):
+            def search(self, query):
+                release.wait(5)
+                return super().search(query)
+
+        self.addCleanup(release.set)
+        started = time.monotonic()
+        results, provider_status = federated_search.federated_search('dune', {
+            'movie': _SearchAPI('OMDB API', titles=['Dune']),
+            'game': _BlockedAPI('RAWG API', titles=['Dune']),
+        }, timeout=0.5)
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual([item['category'] for item in results], ['movie'])
+        self.assertEqual(provider_status['game']['status'], 'timeout')
+
+    def test_provider_exception_is_reported_as_error(self):
+        class _BrokenAPI(_SearchAPI):
+            def search(self, query):
+                raise RuntimeError('boom')
+
+        with self.assertLogs('review.utils.federated_search', level='ERROR'):
+            results, provider_status = federated_search.federated_search('dune', {
+                'movie': _BrokenAPI('OMDB API'),
+            }, timeout=1)
+
+        self.assertEqual(results, [])
+        self.assertEqual(provider_status['movie']['status'], 'error')
@@ -0,0 +1,70 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from review.utils import http_sessions
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _sample(name, provider):
+    return REGISTRY.get_sample_value(name, {'provider': provider}) or 0.0
+
+
+class ProviderSessionPoolTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.base_url = 'http://127.0.0.1:{}'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.pool = http_sessions.ProviderSessionPool(pool_maxsize=2)
+        self.addCleanup(self.pool.close)
+
+    def test_reuses_session_per_provider(self):
+        omdb_session = self.pool.get_session('OMDB API')
+        self.assertIs(self.pool.get_session('omdb'), omdb_session)
+        self.assertIsNot(self.pool.get_session('RAWG API'), omdb_session)
+
+    def test_rebuilds_sessions_after_fork(self):
+        session = self.pool.get_session('Jikan API')
+        with mock.patch('review.utils.http_sessions.os.getpid', return_value=-1):
+            self.assertIsNot(self.pool.get_session('Jikan API'), session)
+
+    def test_keep_alive_connection_is_reused(self):
+        provider = 'pooltest'
+        new_before = _sample('critic_upstream_http_new_connections_total', provider)
+        hits_before = _sample('critic_upstream_http_pool_hits_total', provider)
+
+        session = self.pool.get_session(provider)
+        for _ in range(3):
+            response = session.get(self.base_url, timeout=5)
+            self.assertEqual(response.json(), {'ok': True})
+
+        self.assertEqual(_sample('critic_upstream_http_new_connections_total', provider) - new_before, 1)
+        self.assertEqual(_sample('critic_upstream_http_pool_hits_total', provider) - hits_before, 2)
@@ -0,0 +1,184 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from review.models import ReviewItem
+from review.utils import item_refresh
+
+
+class _RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+
+class _DetailsAPI:
+    source_name = 'OMDB API'
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get_details(self, item_id):
+        self.calls += 1
+        return dict(self.response)
+
+
+FRESH_DETAILS = {
+    'response': 'True',
+    'title': 'Fresh Title',
+    'image_url': 'https://example.com/fresh.jpg',
+    'year': '2024',
+    'attr1': 'genre',
+    'attr2': 'crew',
+    'attr3': 'movie',
+    'description': 'fresh description',
+    'rating': 9.1,
+}
+
+
+def _create_item(item_id, **kwargs):
+    defaults = {
+        'category': 'movie',
+        'title': 'Old Title',
+        'image_url': 'https://example.com/old.jpg',
+        'year': '2000',
+        'attr1': 'old1',
+        'attr2': 'old2',
+        'attr3': 'old3',
+        'description': 'old description',
+        'rating': '5',
+    }
+    defaults.update(kwargs)
+    return ReviewItem.objects.create(item_id=item_id, **defaults)
+
+
+@override_settings(LOOKUP_REVALIDATE_ENABLED=True)
+class ItemRefreshTest(TestCase):
+    def setUp(self):
+        self.executor = _RecordingExecutor()
+        for patcher in (
+            mock.patch('review.utils.item_refresh._get_executor', return_value=self.executor),
+            mock.patch.object(item_refresh, '_pending', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @override_settings(LOOKUP_ITEM_STALE_AFTER_SECONDS={'anime': 3600, 'movie': 86400})
+    def test_staleness_threshold_is_per_category(self):
+        refreshed_at = timezone.now() - timedelta(hours=2)
+        anime = _create_item('mal_1', category='anime', last_refreshed_at=refreshed_at)
+        movie = _create_item('omdb_1', category='movie', last_refreshed_at=refreshed_at)
+        never_refreshed = _create_item('omdb_2')
+
+        self.assertTrue(item_refresh.is_stale(anime))
+        self.assertFalse(item_refresh.is_stale(movie))
+        self.assertTrue(item_refresh.is_stale(never_refreshed))
+
+    def test_schedule_refresh_deduplicates_pending_refreshes(self):
+        item = _create_item('omdb_1')
+        api = _DetailsAPI(FRESH_DETAILS)
+
+        self.assertTrue(item_refresh.schedule_refresh(item, api))
+        self.assertFalse(item_refresh.schedule_refresh(item, api))
+        self.assertEqual(len(self.executor.submitted), 1)
+
+    def test_finished_refresh_releases_dedup_key(self):
+        item = _create_item('omdb_1')
+        api = _DetailsAPI(FRESH_DETAILS)
+        item_refresh.schedule_refresh(item, api)
+        fn, args = self.executor.submitted[0]
+
+        with mock.patch('review.utils.item_refresh.close_old_connections'):
+            fn(*args)
+
+        item.refresh_from_db()
+        self.assertEqual(item.title, 'Fresh Title')
+        self.assertIsNone(caches[item_refresh.DEDUP_CACHE_ALIAS].get('revalidate:omdb_1'))
+        self.assertEqual(item_refresh._pending, 0)
+
+    def test_recent_attempt_is_not_rescheduled(self):
+        item = _create_item('omdb_1', last_refresh_attempt_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertFalse(item_refresh.schedule_refresh(item, _DetailsAPI(FRESH_DETAILS)))
+        self.assertEqual(self.executor.submitted, [])
+
+    @override_settings(LOOKUP_REVALIDATE_MAX_PENDING=0)
+    def test_full_queue_drops_refresh(self):
+        item = _create_item('omdb_1')
+
+        self.assertFalse(item_refresh.schedule_refresh(item, _DetailsAPI(FRESH_DETAILS)))
+        self.assertEqual(self.executor.submitted, [])
+
+    def test_refresh_item_updates_fields_and_bookkeeping(self):
+        _create_item('omdb_1', refresh_error_count=2)
+
+        outcome = item_refresh.refresh_item('omdb_1', _DetailsAPI(FRESH_DETAILS))
+
+        item = ReviewItem.objects.get(item_id='omdb_1')
+        self.assertEqual(outcome, 'refreshed')
+        self.assertEqual(item.title, 'Fresh Title')
+        self.assertEqual(item.rating, '9.1')
+        self.assertEqual(item.refresh_error_count, 0)
+        self.assertIsNotNone(item.last_refreshed_at)
+
+    def test_apply_refreshed_details_reports_whether_content_changed(self):
+        item = _create_item('omdb_1', rating='9.1')
+        now = timezone.now()
+        same = {**FRESH_DETAILS, **{field: getattr(item, field) for field in item_refresh.REFRESHED_FIELDS}}
+
+        self.assertFalse(item_refresh.apply_refreshed_details(item, {**same, 'rating': 9.1}, now))
+        self.assertEqual(item.last_refreshed_at, now)
+        self.assertTrue(item_refresh.apply_refreshed_details(item, FRESH_DETAILS, now))
+
+    def test_refresh_item_failure_records_attempt(self):
+        _create_item('omdb_1')
+
+        outcome = item_refresh.refresh_item('omdb_1', _DetailsAPI({'response': 'False', 'error': 'Down'}))
+
+        item = ReviewItem.objects.get(item_id='omdb_1')
+        self.assertEqual(outcome, 'failed')
+        self.assertEqual(item.title, 'Old Title')
+        self.assertEqual(item.refresh_error_count, 1)
+        self.assertIsNotNone(item.last_refresh_attempt_at)
+        self.assertIsNone(item.last_refreshed_at)
+
+
+@override_settings(LOOKUP_REVALIDATE_ENABLED=True)
+class GetItemInfoStaleWhileRevalidateTest(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='swr_user', password='pass12345')
+        self.client.force_authenticate(user)
+        self.executor = _RecordingExecutor()
+        for patcher in (
+            mock.patch('review.utils.item_refresh._get_executor', return_value=self.executor),
+            mock.patch.object(item_refresh, '_pending', 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stale_item_is_served_and_refresh_queued(self):
+        _create_item('omdb_stale', last_refreshed_at=timezone.now() - timedelta(days=60))
+
+        response = self.client.get('/api/v2/lookup/item/movie/omdb_stale/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['title'], 'Old Title')
+        self.assertTrue(response.json()['meta']['stale'])
+        self.assertEqual(len(self.executor.submitted), 1)
+
+    def test_fresh_item_does_not_queue_refresh(self):
+        _create_item('omdb_fresh', last_refreshed_at=timezone.now())
+
+        response = self.client.get('/api/v2/lookup/item/movie/omdb_fresh/')
+
+        self.assertFalse(response.json()['meta']['stale'])
+        self.assertEqual(self.executor.submitted, [])
@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+
+from review.utils.rate_limit import TokenBucket
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTest(SimpleTestCase):
+    def test_spaces_acquisitions_at_configured_rate(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=4, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            bucket.acquire()
+
+        self.assertEqual(clock.sleeps, [0.25, 0.25])
+
+    def test_capacity_allows_burst_after_idle(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=1, capacity=3, clock=clock, sleep=clock.sleep)
+        clock.now += 60
+
+        for _ in range(3):
+            bucket.acquire()
+        bucket.acquire()
+
+        self.assertEqual(clock.sleeps, [1.0])
+
+    def test_no_rate_means_unlimited(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=None, clock=clock, sleep=clock.sleep)
+
+        for _ in range(10):
+            bucket.acquire()
+
+        self.assertEqual(clock.sleeps, [])
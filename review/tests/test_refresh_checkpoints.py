@@ -0,0 +1,18 @@
+from django.test import TestCase
+
+from review.models import RefreshCheckpoint
+from review.utils import refresh_checkpoints
+
+
+class RefreshCheckpointsTest(TestCase):
+    def test_updates_merge_across_workers(self):
+        refresh_checkpoints.update('nightly', done_ids=[], remaining_ids=['a', 'b'])
+        refresh_checkpoints.update('nightly', done_ids=['a'], remaining_ids=['c', 'b'])
+
+        self.assertEqual(refresh_checkpoints.pending_item_ids('nightly'), ['b', 'c'])
+
+    def test_nothing_remaining_does_not_create_checkpoint(self):
+        refresh_checkpoints.update('nightly', done_ids=['a'], remaining_ids=[])
+
+        self.assertFalse(RefreshCheckpoint.objects.exists())
+        self.assertEqual(refresh_checkpoints.pending_item_ids('nightly'), [])
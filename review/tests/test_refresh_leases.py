@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from review.models import ReviewItem
+from review.utils import refresh_leases
+
+
+class RefreshLeasesTest(TestCase):
+    def setUp(self):
+        for index in range(5):
+            ReviewItem.objects.create(item_id=f'omdb_{index}', category='movie', title=f'Item {index}')
+        self.queryset = ReviewItem.objects.order_by('item_id')
+
+    def test_concurrent_claims_are_disjoint(self):
+        first = refresh_leases.claim_items(self.queryset, 3, 'worker-a', 60)
+        second = refresh_leases.claim_items(self.queryset, 3, 'worker-b', 60)
+
+        self.assertEqual([item.item_id for item in first], ['omdb_0', 'omdb_1', 'omdb_2'])
+        self.assertEqual([item.item_id for item in second], ['omdb_3', 'omdb_4'])
+
+    def test_expired_lease_is_reclaimed(self):
+        now = timezone.now()
+        refresh_leases.claim_items(self.queryset, 5, 'crashed-worker', 60, now=now - timedelta(minutes=5))
+
+        reclaimed = refresh_leases.claim_items(self.queryset, 5, 'worker-b', 60, now=now)
+
+        self.assertEqual(len(reclaimed), 5)
+        self.assertTrue(all(item.refresh_lease_owner == 'worker-b' for item in reclaimed))
+
+    def test_release_only_clears_own_leases(self):
+        refresh_leases.claim_items(self.queryset, 2, 'worker-a', 60)
+        refresh_leases.claim_items(self.queryset, 2, 'worker-b', 60)
+
+        self.assertEqual(refresh_leases.release_items('worker-a'), 2)
+        self.assertEqual(ReviewItem.objects.filter(refresh_lease_owner='worker-b').count(), 2)
+        self.assertEqual(ReviewItem.objects.filter(refresh_lease_owner='', refresh_lease_expires_at__isnull=True).count(), 3)
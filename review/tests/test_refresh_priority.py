@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from review.models import Review, ReviewItem
+from review.serializers import ReviewItemSerializer
+from review.utils import item_refresh, refresh_priority
+
+
+def _create_item(item_id, **kwargs):
+    defaults = {
+        'category': 'movie',
+        'title': 'Title',
+        'image_url': 'https://example.com/poster.jpg',
+        'year': '2000',
+        'attr1': 'a1',
+        'attr2': 'a2',
+        'attr3': 'a3',
+        'description': 'description',
+        'rating': '5',
+    }
+    defaults.update(kwargs)
+    return ReviewItem.objects.create(item_id=item_id, **defaults)
+
+
+class RefreshPriorityTest(TestCase):
+    def test_rank_items_prefers_reviews_and_recent_hits_over_staleness(self):
+        now = timezone.now()
+        _create_item('omdb_oldest', last_refreshed_at=now - timedelta(days=30))
+        reviewed = _create_item('omdb_reviewed', last_refreshed_at=now - timedelta(days=20))
+        for username in ('rank_a', 'rank_b'):
+            user = get_user_model().objects.create_user(username=username, password='pass12345')
+            Review.objects.create(user=user, review_item=reviewed, review_rating='7.0')
+        _create_item('omdb_hit', last_refreshed_at=now - timedelta(days=20), lookup_hit_count=50, last_lookup_hit_at=now)
+        _create_item(
+            'omdb_old_hits', last_refreshed_at=now - timedelta(days=20),
+            lookup_hit_count=500, last_lookup_hit_at=now - timedelta(days=30),
+        )
+
+        ranked = refresh_priority.rank_items(ReviewItem.objects.all(), 10, timedelta(days=14), now=now)
+
+        self.assertEqual(ranked, ['omdb_hit', 'omdb_reviewed', 'omdb_oldest', 'omdb_old_hits'])
+
+    def test_in_rank_order_keeps_given_order(self):
+        for item_id in ('omdb_a', 'omdb_b', 'omdb_c'):
+            _create_item(item_id)
+
+        ordered = refresh_priority.in_rank_order(ReviewItem.objects.all(), ['omdb_c', 'omdb_a', 'omdb_b'])
+
+        self.assertEqual(list(ordered.values_list('item_id', flat=True)), ['omdb_c', 'omdb_a', 'omdb_b'])
+        self.assertEqual(list(refresh_priority.in_rank_order(ReviewItem.objects.all(), [])), [])
+
+    def test_in_rank_order_keeps_the_querysets_filters(self):
+        for item_id in ('omdb_a', 'omdb_b'):
+            _create_item(item_id)
+
+        ordered = refresh_priority.in_rank_order(ReviewItem.objects.exclude(item_id='omdb_a'), ['omdb_a', 'omdb_b'])
+
+        self.assertEqual(list(ordered.values_list('item_id', flat=True)), ['omdb_b'])
+
+    @override_settings(REFRESH_PRIORITY_HIT_FLUSH_SECONDS=300)
+    def test_lookup_hits_are_flushed_at_most_once_per_interval(self):
+        _create_item('omdb_hits')
+
+        for _ in range(3):
+            refresh_priority.record_lookup_hit('omdb_hits')
+
+        item = ReviewItem.objects.get(item_id='omdb_hits')
+        self.assertEqual(item.lookup_hit_count, 1)
+        self.assertIsNotNone(item.last_lookup_hit_at)
+
+    @override_settings(REFRESH_PRIORITY_HIT_FLUSH_SECONDS=0)
+    def test_lookup_hits_restart_after_an_idle_window(self):
+        _create_item('omdb_idle', lookup_hit_count=40, last_lookup_hit_at=timezone.now() - timedelta(days=30))
+
+        refresh_priority.record_lookup_hit('omdb_idle')
+
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_idle').lookup_hit_count, 1)
+
+
+class RefreshBackoffTest(TestCase):
+    def test_retry_backoff_doubles_and_is_capped(self):
+        min_retry = timedelta(hours=6)
+        cap = timedelta(days=7)
+
+        self.assertEqual(item_refresh.retry_backoff(1, min_retry, cap), timedelta(hours=6))
+        self.assertEqual(item_refresh.retry_backoff(3, min_retry, cap), timedelta(hours=24))
+        self.assertEqual(item_refresh.retry_backoff(50, min_retry, cap), cap)
+
+    def test_not_found_streak_resets_on_other_errors(self):
+        now = timezone.now()
+        item = _create_item('omdb_streak', refresh_not_found_count=2)
+
+        tombstoned = item_refresh.record_refresh_failure(
+            item, {'response': 'False', 'status_code': 503}, now, timedelta(hours=6), tombstone_after=3,
+        )
+
+        self.assertFalse(tombstoned)
+        self.assertEqual(item.refresh_not_found_count, 0)
+        self.assertIsNone(item.refresh_tombstoned_at)
+
+    def test_omdb_incorrect_id_counts_as_not_found(self):
+        now = timezone.now()
+        item = _create_item('omdb_bad', refresh_not_found_count=2)
+
+        tombstoned = item_refresh.record_refresh_failure(
+            item, {'response': 'False', 'not_found': True}, now, timedelta(hours=6), tombstone_after=3,
+        )
+
+        self.assertTrue(tombstoned)
+        self.assertEqual(item.refresh_tombstoned_at, now)
+
+    def test_backoff_fields_are_not_part_of_the_api(self):
+        item = _create_item('omdb_hidden', refresh_not_found_count=2, refresh_tombstoned_at=timezone.now())
+        hidden = {'refresh_next_attempt_at', 'refresh_not_found_count', 'refresh_tombstoned_at'}
+
+        self.assertFalse(hidden & set(ReviewItemSerializer(item).data))
+        serializer = ReviewItemSerializer(data={
+            **ReviewItemSerializer(item).data, 'item_id': 'omdb_input', 'refresh_not_found_count': 9,
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().refresh_not_found_count, 0)
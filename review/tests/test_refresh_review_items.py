@@ -1,11 +1,17 @@
 from datetime import timedelta
+import os
+import signal
+import time
+from io import StringIO
 from unittest import mock
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
+from prometheus_client import REGISTRY
 
-from review.models import ReviewItem
+from review.models import RefreshCheckpoint, Review, ReviewItem
 
 
 class _ProviderStub:
@@ -165,3 +171,303 @@ class RefreshReviewItemsCommandTest(TestCase):
         self.assertEqual(kwargs['skipped'], 0)
         self.assertIn('omdb', kwargs['provider_totals'])
         self.assertEqual(kwargs['provider_totals']['omdb']['processed'], 1)
+
+    def test_concurrent_mode_refreshes_all_providers_and_aggregates_totals(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        responses = {}
+        for item_id, category in (('omdb_c1', 'movie'), ('omdb_c2', 'movie'), ('rawg_c1', 'game'), ('mal_c1', 'anime')):
+            self._create_item(item_id, category=category, last_refreshed_at=stale_at)
+            responses[item_id] = {'response': 'True', 'title': f'Fresh {item_id}', 'rating': '8'}
+        responses['rawg_c1'] = {'response': 'False', 'error': 'Upstream unavailable'}
+        provider = _ProviderStub(responses)
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            with mock.patch('review.management.commands.refresh_review_items.push_refresh_run_metrics') as push_mock:
+                call_command(
+                    'refresh_review_items',
+                    max_items=10, stale_days=14, min_retry_hours=0,
+                    concurrency=4, request_delay_ms=0, provider_rate=['jikan=50'],
+                )
+
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_c2').title, 'Fresh omdb_c2')
+        self.assertEqual(ReviewItem.objects.get(item_id='mal_c1').title, 'Fresh mal_c1')
+        self.assertEqual(ReviewItem.objects.get(item_id='rawg_c1').refresh_error_count, 1)
+        kwargs = push_mock.call_args.kwargs
+        self.assertTrue(kwargs['success'])
+        self.assertEqual((kwargs['processed'], kwargs['refreshed'], kwargs['failed']), (4, 3, 1))
+        self.assertEqual(kwargs['provider_totals']['omdb']['refreshed'], 2)
+        self.assertEqual(kwargs['provider_totals']['rawg']['failed'], 1)
+        self.assertEqual(kwargs['provider_totals']['jikan']['refreshed'], 1)
+
+    def test_concurrent_mode_propagates_provider_crash(self):
+        self._create_item('omdb_exception', last_refreshed_at=timezone.now() - timedelta(days=30))
+
+        with mock.patch(
+            'review.management.commands.refresh_review_items.Command._build_provider',
+            return_value=_ProviderExceptionStub(),
+        ):
+            with mock.patch('review.management.commands.refresh_review_items.push_refresh_run_metrics') as push_mock:
+                with self.assertRaises(RuntimeError):
+                    call_command('refresh_review_items', max_items=10, stale_days=14, concurrency=2, request_delay_ms=0)
+
+        self.assertFalse(push_mock.call_args.kwargs['success'])
+
+    def test_rejects_invalid_provider_rate(self):
+        err = StringIO()
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider') as build_mock:
+            call_command('refresh_review_items', concurrency=2, provider_rate=['jikan'], stderr=err)
+
+        self.assertIn('--provider-rate', err.getvalue())
+        build_mock.assert_not_called()
+
+    def test_skips_items_leased_by_another_worker_and_releases_own_leases(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        self._create_item(
+            'omdb_leased', last_refreshed_at=stale_at,
+            refresh_lease_owner='other-pod', refresh_lease_expires_at=timezone.now() + timedelta(minutes=10),
+        )
+        self._create_item(
+            'omdb_expired', last_refreshed_at=stale_at,
+            refresh_lease_owner='crashed-pod', refresh_lease_expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        provider = _ProviderStub({
+            'omdb_expired': {'response': 'True', 'title': 'Reclaimed', 'rating': '7'},
+        })
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            call_command('refresh_review_items', max_items=10, stale_days=14, request_delay_ms=0, worker_id='pod-a')
+
+        leased = ReviewItem.objects.get(item_id='omdb_leased')
+        reclaimed = ReviewItem.objects.get(item_id='omdb_expired')
+        self.assertEqual(leased.title, 'Old Title')
+        self.assertEqual(leased.refresh_lease_owner, 'other-pod')
+        self.assertEqual(reclaimed.title, 'Reclaimed')
+        self.assertEqual(reclaimed.refresh_lease_owner, '')
+        self.assertIsNone(reclaimed.refresh_lease_expires_at)
+
+    def test_priority_order_refreshes_reviewed_items_first(self):
+        user = get_user_model().objects.create_user(username='priority_user', password='pass12345')
+        stale_at = timezone.now() - timedelta(days=30)
+        self._create_item('omdb_oldest', last_refreshed_at=stale_at - timedelta(days=1))
+        popular = self._create_item('omdb_popular', last_refreshed_at=stale_at)
+        Review.objects.create(user=user, review_item=popular, review_rating='8.0')
+        provider = _ProviderStub({
+            'omdb_popular': {'response': 'True', 'title': 'Popular', 'rating': '8'},
+        })
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            call_command('refresh_review_items', max_items=1, stale_days=14, request_delay_ms=0)
+
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_popular').title, 'Popular')
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_oldest').title, 'Old Title')
+
+    def test_items_refreshed_or_tombstoned_after_ranking_are_not_claimed(self):
+        from review.utils import refresh_priority
+
+        stale_at = timezone.now() - timedelta(days=30)
+        for item_id in ('omdb_due', 'omdb_done_elsewhere', 'omdb_tombstoned'):
+            self._create_item(item_id, last_refreshed_at=stale_at)
+        rank_items = refresh_priority.rank_items
+
+        def rank_then_change(*args, **kwargs):
+            ranked = rank_items(*args, **kwargs)
+            # Another worker finishes with these between ranking and claiming.
+            ReviewItem.objects.filter(item_id='omdb_done_elsewhere').update(last_refreshed_at=timezone.now())
+            ReviewItem.objects.filter(item_id='omdb_tombstoned').update(refresh_tombstoned_at=timezone.now())
+            return ranked
+
+        provider = mock.Mock(wraps=_ProviderStub({'omdb_due': {'response': 'True', 'title': 'Due', 'rating': '7'}}))
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider), \
+                mock.patch.object(refresh_priority, 'rank_items', side_effect=rank_then_change):
+            call_command('refresh_review_items', max_items=10, stale_days=14, request_delay_ms=0, stdout=StringIO())
+
+        self.assertEqual([call.args[0] for call in provider.get_details.call_args_list], ['omdb_due'])
+
+    def test_failures_back_off_exponentially(self):
+        self._create_item('omdb_flaky', last_refreshed_at=timezone.now() - timedelta(days=30), refresh_error_count=2)
+        provider = _ProviderStub({'omdb_flaky': {'response': 'False', 'error': 'Down', 'status_code': 500}})
+
+        started = timezone.now()
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            call_command('refresh_review_items', stale_days=14, min_retry_hours=6, request_delay_ms=0)
+            call_command('refresh_review_items', stale_days=14, min_retry_hours=0, request_delay_ms=0)
+
+        item = ReviewItem.objects.get(item_id='omdb_flaky')
+        # Third consecutive failure: 6h * 2**2. The second run is still inside that backoff.
+        self.assertEqual(item.refresh_error_count, 3)
+        self.assertGreaterEqual(item.refresh_next_attempt_at, started + timedelta(hours=24))
+        self.assertLess(item.refresh_next_attempt_at, timezone.now() + timedelta(hours=25))
+
+    def test_repeated_not_found_tombstones_item(self):
+        self._create_item(
+            'omdb_gone', last_refreshed_at=timezone.now() - timedelta(days=30),
+            refresh_error_count=1, refresh_not_found_count=1,
+        )
+        provider = _ProviderStub({'omdb_gone': {'response': 'False', 'error': 'Not found', 'status_code': 404}})
+        err = StringIO()
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            call_command('refresh_review_items', stale_days=14, tombstone_after=2, request_delay_ms=0, stderr=err)
+
+        item = ReviewItem.objects.get(item_id='omdb_gone')
+        self.assertIsNotNone(item.refresh_tombstoned_at)
+        self.assertIn('Tombstoned omdb_gone', err.getvalue())
+
+        item.refresh_next_attempt_at = None
+        item.save(update_fields=['refresh_next_attempt_at'])
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider') as build_mock:
+            call_command('refresh_review_items', stale_days=14, min_retry_hours=0, request_delay_ms=0)
+        build_mock.assert_not_called()
+
+    def test_reports_changed_and_unchanged_rows(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        self._create_item('omdb_same', last_refreshed_at=stale_at)
+        self._create_item('omdb_new', last_refreshed_at=stale_at)
+        unchanged_details = {
+            'response': 'True', 'title': 'Old Title', 'image_url': 'https://example.com/old.jpg', 'year': '2000',
+            'attr1': 'old1', 'attr2': 'old2', 'attr3': 'old3', 'description': 'old description', 'rating': 5,
+        }
+        provider = _ProviderStub({
+            'omdb_same': unchanged_details,
+            'omdb_new': {**unchanged_details, 'title': 'New Title'},
+        })
+        out = StringIO()
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            with mock.patch('review.management.commands.refresh_review_items.push_refresh_run_metrics') as push_mock:
+                call_command('refresh_review_items', stale_days=14, request_delay_ms=0, stdout=out)
+
+        self.assertIn('changed=1 unchanged=1', out.getvalue())
+        kwargs = push_mock.call_args.kwargs
+        self.assertEqual((kwargs['changed'], kwargs['unchanged']), (1, 1))
+        self.assertEqual(kwargs['provider_totals']['omdb']['unchanged'], 1)
+        same = ReviewItem.objects.get(item_id='omdb_same')
+        self.assertEqual(same.title, 'Old Title')
+        self.assertGreater(same.last_refreshed_at, stale_at)
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_new').title, 'New Title')
+
+    def test_writes_are_batched_with_bulk_update(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        responses = {}
+        for index in range(3):
+            self._create_item(f'omdb_{index}', last_refreshed_at=stale_at)
+            responses[f'omdb_{index}'] = {'response': 'True', 'title': f'Fresh {index}', 'rating': '7'}
+        provider = _ProviderStub(responses)
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            with mock.patch.object(
+                ReviewItem.objects, 'bulk_update', wraps=ReviewItem.objects.bulk_update,
+            ) as bulk_update_mock:
+                call_command('refresh_review_items', stale_days=14, request_delay_ms=0, write_batch_size=2)
+
+        self.assertEqual(bulk_update_mock.call_count, 2)
+        self.assertEqual(
+            sorted(ReviewItem.objects.values_list('title', flat=True)),
+            ['Fresh 0', 'Fresh 1', 'Fresh 2'],
+        )
+
+    def test_max_duration_stops_cleanly_and_next_run_resumes_from_checkpoint(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        for offset, item_id in enumerate(('omdb_a', 'omdb_b', 'omdb_c')):
+            self._create_item(item_id, last_refreshed_at=stale_at + timedelta(minutes=offset))
+        responses = {
+            item_id: {'response': 'True', 'title': f'Fresh {item_id}', 'rating': '7'}
+            for item_id in ('omdb_a', 'omdb_b', 'omdb_c', 'omdb_new')
+        }
+
+        class _SlowProvider(_ProviderStub):
+            def get_details(self, item_id):
+                time.sleep(0.6)
+                return super().get_details(item_id)
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=_SlowProvider(responses)):
+            with mock.patch('review.management.commands.refresh_review_items.push_refresh_run_metrics') as push_mock:
+                call_command('refresh_review_items', stale_days=14, request_delay_ms=0, max_duration=0.5, stdout=StringIO())
+
+        kwargs = push_mock.call_args.kwargs
+        self.assertTrue(kwargs['success'])
+        self.assertEqual((kwargs['processed'], kwargs['remaining']), (1, 2))
+        self.assertEqual(RefreshCheckpoint.objects.get(name='refresh_review_items').item_ids, ['omdb_b', 'omdb_c'])
+        self.assertFalse(ReviewItem.objects.filter(refresh_lease_owner__gt='').exists())
+
+        # A never-refreshed item outranks the checkpointed ones, but they resume first.
+        self._create_item('omdb_new')
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=_ProviderStub(responses)):
+            call_command('refresh_review_items', stale_days=14, request_delay_ms=0, max_items=1)
+
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_b').title, 'Fresh omdb_b')
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_new').title, 'Old Title')
+        self.assertEqual(RefreshCheckpoint.objects.get(name='refresh_review_items').item_ids, ['omdb_c'])
+
+    def test_lookups_cut_off_by_max_duration_are_checkpointed_not_failed(self):
+        class _DeadlineProvider:
+            def get_details(self, item_id):
+                return {'response': 'False', 'error': 'Upstream API call exceeded its time budget.', 'deadline_exceeded': True}
+
+        for concurrency in (1, 2):
+            with self.subTest(concurrency=concurrency):
+                ReviewItem.objects.all().delete()
+                RefreshCheckpoint.objects.all().delete()
+                self._create_item('omdb_cut', last_refreshed_at=timezone.now() - timedelta(days=30))
+                with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=_DeadlineProvider()):
+                    call_command(
+                        'refresh_review_items', stale_days=14, request_delay_ms=0, request_budget_seconds=30,
+                        max_duration=5, concurrency=concurrency, stdout=StringIO(), stderr=StringIO(),
+                    )
+
+                item = ReviewItem.objects.get(item_id='omdb_cut')
+                self.assertEqual((item.refresh_error_count, item.refresh_next_attempt_at), (0, None))
+                self.assertEqual(RefreshCheckpoint.objects.get(name='refresh_review_items').item_ids, ['omdb_cut'])
+
+        # Without the run's cut-off, the item's own budget ran out: a failure.
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=_DeadlineProvider()):
+            call_command('refresh_review_items', stale_days=14, request_delay_ms=0, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_cut').refresh_error_count, 1)
+
+    def test_daemon_refreshes_batch_after_batch_and_reuses_providers(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        for item_id in ('omdb_a', 'omdb_b'):
+            self._create_item(item_id, last_refreshed_at=stale_at)
+        provider = _ProviderStub({
+            'omdb_a': {'response': 'True', 'title': 'Fresh A', 'rating': '7'},
+            'omdb_b': {'response': 'True', 'title': 'Fresh B', 'rating': '7'},
+        })
+        before = REGISTRY.get_sample_value('critic_refresh_items_total', {'provider': 'omdb', 'result': 'refreshed'}) or 0
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider) as build_mock:
+            with mock.patch('review.management.commands.refresh_review_items.push_refresh_run_metrics') as push_mock:
+                call_command(
+                    'refresh_review_items', daemon=True, max_items=1, stale_days=14, request_delay_ms=0,
+                    max_duration=0.5, daemon_min_sleep=0.01, daemon_max_sleep=0.05, metrics_port=0, stdout=StringIO(),
+                )
+
+        self.assertEqual(sorted(ReviewItem.objects.values_list('title', flat=True)), ['Fresh A', 'Fresh B'])
+        build_mock.assert_called_once_with('movie')
+        push_mock.assert_not_called()
+        after = REGISTRY.get_sample_value('critic_refresh_items_total', {'provider': 'omdb', 'result': 'refreshed'})
+        self.assertEqual(after - before, 2)
+        self.assertEqual(REGISTRY.get_sample_value('critic_refresh_queue_depth'), 0)
+
+    def test_daemon_stops_on_sigterm_and_checkpoints_the_rest(self):
+        stale_at = timezone.now() - timedelta(days=30)
+        for offset, item_id in enumerate(('omdb_a', 'omdb_b')):
+            self._create_item(item_id, last_refreshed_at=stale_at + timedelta(minutes=offset))
+
+        class _TerminatingProvider(_ProviderStub):
+            def get_details(self, item_id):
+                os.kill(os.getpid(), signal.SIGTERM)
+                return super().get_details(item_id)
+
+        provider = _TerminatingProvider({'omdb_a': {'response': 'True', 'title': 'Fresh A', 'rating': '7'}})
+        previous_handler = signal.getsignal(signal.SIGTERM)
+        out = StringIO()
+
+        with mock.patch('review.management.commands.refresh_review_items.Command._build_provider', return_value=provider):
+            call_command(
+                'refresh_review_items', daemon=True, stale_days=14, request_delay_ms=0, metrics_port=0, stdout=out,
+            )
+
+        self.assertIn('Refresh daemon stopped.', out.getvalue())
+        self.assertEqual(ReviewItem.objects.get(item_id='omdb_a').title, 'Fresh A')
+        self.assertEqual(RefreshCheckpoint.objects.get(name='refresh_review_items').item_ids, ['omdb_b'])
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous_handler)
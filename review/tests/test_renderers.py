@@ -0,0 +1,84 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from review.renderers import FastJSONParser, FastJSONRenderer
+
+PAYLOAD = {
+    'data': [{
+        'id': 1,
+        'review_rating': '9.50',
+        'raw_rating': Decimal('9.50'),
+        'modified_date': date(2024, 3, 1),
+        'last_refreshed_at': datetime(2024, 3, 1, 12, 30, 15, 250123, tzinfo=dt_timezone.utc),
+        'local_time': datetime(2024, 3, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=5, minutes=30))),
+        'naive': datetime(2024, 3, 1, 12, 30),
+        'at': time(8, 15),
+        'ttl': timedelta(minutes=5),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Reviews'),
+        'error': ErrorDetail('This field is required.', code='required'),
+        'text': 'Ünïcode — line\u2028separator\u2029end',
+        'tags': ('a', 'b'),
+        'score': 0.1,
+        'missing': None,
+    }],
+    'meta': {'version': '2.0', 1: 'int key'},
+}
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        payload = {'big': 2 ** 70}
+
+        self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+        with self.assertRaises(TypeError):
+            FastJSONRenderer().render({'unknown': object()})
+
+    def test_indented_and_empty_output_match(self):
+        context = {'indent': 4}
+
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD, renderer_context=context), JSONRenderer().render(PAYLOAD, renderer_context=context))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    @override_settings(API_FAST_JSON=False)
+    def test_setting_disables_orjson(self):
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+
+class FastJSONParserTest(SimpleTestCase):
+    def _parse(self, parser, body: bytes):
+        return parser.parse(io.BytesIO(body), parser_context={'encoding': 'utf-8'})
+
+    def test_matches_drf_parser(self):
+        for body in (b'{"review_rating": 9.5, "tags": ["a"], "x": null}', '{"t": "Ünï"}'.encode(), b'[' + str(2 ** 70).encode() + b']'):
+            with self.subTest(body=body):
+                self.assertEqual(self._parse(FastJSONParser(), body), self._parse(JSONParser(), body))
+
+    def test_errors_match_drf_parser(self):
+        for body in (b'{"a": NaN}', b'{"a": '):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as expected:
+                    self._parse(JSONParser(), body)
+                with self.assertRaises(ParseError) as actual:
+                    self._parse(FastJSONParser(), body)
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+
+class RenderedResponseTest(APITestCase):
+    def test_api_responses_use_fast_renderer(self):
+        response = self.client.get('/api/v2/reviews/')
+
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from review.models import Review
+from review.utils import review_counts
+from review.tests.factories import create_review_item
+
+LIST_URL = '/api/v2/reviews/'
+
+
+def _count_queries(queries) -> int:
+    return sum('COUNT(' in query['sql'].upper() for query in queries)
+
+
+class CountModeTest(SimpleTestCase):
+    def test_parse_count_mode(self):
+        self.assertEqual(review_counts.parse_count_mode(None), review_counts.COUNT_EXACT)
+        self.assertEqual(review_counts.parse_count_mode('true'), review_counts.COUNT_EXACT)
+        self.assertEqual(review_counts.parse_count_mode('False'), review_counts.COUNT_OMITTED)
+        self.assertEqual(review_counts.parse_count_mode('estimate'), review_counts.COUNT_ESTIMATED)
+
+
+class ReviewListCountTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='counter', password='pass12345')
+        for index in range(3):
+            Review.objects.create(
+                user=self.user, review_item=create_review_item(item_id='count_{}'.format(index)), review_rating=5,
+            )
+
+    def _pagination(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(LIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['meta']['pagination'], _count_queries(queries.captured_queries)
+
+    def test_include_count_false_skips_count_query(self):
+        pagination, count_queries = self._pagination(include_count='false', limit=2)
+
+        self.assertIsNone(pagination['count'])
+        self.assertEqual(pagination['count_type'], 'omitted')
+        self.assertEqual(count_queries, 0)
+
+    def test_exact_count_is_cached_until_a_review_write(self):
+        first, first_queries = self._pagination(username='counter')
+        second, second_queries = self._pagination(username='counter')
+
+        self.assertEqual((first['count'], first['count_type']), (3, 'exact'))
+        self.assertEqual(second['count'], 3)
+        self.assertEqual((first_queries, second_queries), (1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.user, review_item=create_review_item(item_id='count_new'), review_rating=6)
+        third, third_queries = self._pagination(username='counter')
+
+        self.assertEqual(third['count'], 4)
+        self.assertEqual(third_queries, 1)
+
+    def test_different_filters_are_counted_separately(self):
+        self._pagination(username='counter')
+        other, _ = self._pagination(username='nobody')
+
+        self.assertEqual(other['count'], 0)
+
+    def test_estimate_uses_last_known_count_on_sqlite(self):
+        first, _ = self._pagination(include_count='estimate')
+        self.assertEqual((first['count'], first['count_type']), (3, 'exact'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.filter(user=self.user).first().delete()
+        estimated, count_queries = self._pagination(include_count='estimate')
+
+        self.assertEqual((estimated['count'], estimated['count_type']), (3, 'estimated'))
+        self.assertEqual(count_queries, 0)
+
+    def test_cursor_pages_report_count_type(self):
+        pagination, count_queries = self._pagination(pagination='cursor', include_count='false')
+
+        self.assertEqual(pagination['count_type'], 'omitted')
+        self.assertEqual(count_queries, 0)
@@ -0,0 +1,111 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from review.models import Review
+from review.tests.factories import create_review_item
+from review.utils import review_versions
+
+LIST_URL = '/api/v2/reviews/'
+
+
+def _cache_requests(result):
+    return REGISTRY.get_sample_value('critic_review_list_cache_requests_total', {'result': result}) or 0.0
+
+
+class ReviewListCacheTest(APITestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='cached', password='pass12345')
+        self.other = get_user_model().objects.create_user(username='cached_other', password='pass12345')
+        self.review = Review.objects.create(user=self.user, review_item=create_review_item(item_id='cache_1'), review_rating=6)
+        Review.objects.create(user=self.other, review_item=create_review_item(item_id='cache_2'), review_rating=8)
+
+    def _get(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(LIST_URL, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries.captured_queries)
+
+    def test_anonymous_repeat_is_served_from_cache(self):
+        hits, misses = _cache_requests('hit'), _cache_requests('miss')
+        first, _ = self._get({'ordering': 'rating', 'limit': 5})
+        second, query_count = self._get({'limit': 5, 'ordering': 'rating'})
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(query_count, 0)
+        self.assertEqual((_cache_requests('hit') - hits, _cache_requests('miss') - misses), (1, 1))
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.login(username='cached', password='pass12345')
+        misses = _cache_requests('miss')
+        self._get()
+        _, query_count = self._get()
+
+        self.assertGreater(query_count, 0)
+        self.assertEqual(_cache_requests('miss'), misses)
+
+    def test_review_writes_are_never_served_stale(self):
+        self._get()
+        self.review.review_rating = 2
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review.save()
+        updated, _ = self._get({'ordering': 'rating'})
+        self.assertEqual(updated.json()['data'][0]['review_rating'], '2.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review.delete()
+        deleted, _ = self._get()
+        self.assertEqual([row['user'] for row in deleted.json()['data']], ['cached_other'])
+
+    def test_user_list_survives_other_users_writes(self):
+        params = {'username': 'cached'}
+        self._get(params)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.other, review_item=create_review_item(item_id='cache_3'), review_rating=5)
+
+        _, query_count = self._get(params)
+        self.assertEqual(query_count, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.user, review_item=create_review_item(item_id='cache_4'), review_rating=5)
+        fresh, _ = self._get(params)
+        self.assertEqual(len(fresh.json()['data']), 2)
+
+    def test_write_from_another_process_refreshes_list_and_count(self):
+        item = create_review_item(item_id='cache_5')
+        first, _ = self._get()
+        self.assertEqual(first.json()['meta']['pagination']['count'], 2)
+
+        # Another process commits a review and bumps the shared stamps; no
+        # signal runs here and nothing in this process's caches changes.
+        Review.objects.bulk_create([Review(user=self.user, review_item=item, review_rating=4)])
+        review_versions.bump(review_versions.SCOPE_REVIEWS, review_versions.user_scope('cached'))
+
+        fresh, _ = self._get()
+        self.assertNotEqual(fresh['ETag'], first['ETag'])
+        self.assertEqual(len(fresh.json()['data']), 3)
+        self.assertEqual(fresh.json()['meta']['pagination']['count'], 3)
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            caches = {'default': backend, 'shared': {**backend, 'KEY_PREFIX': 'shared'}, 'review_list': {**backend, 'KEY_PREFIX': 'review_list'}}
+            with override_settings(CACHES=caches):
+                first, _ = self._get()
+                second, query_count = self._get()
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(query_count, 0)
+
+    @override_settings(REVIEW_LIST_CACHE_TTL_SECONDS=0)
+    def test_zero_ttl_disables_cache(self):
+        self._get()
+        _, query_count = self._get()
+
+        self.assertGreater(query_count, 0)
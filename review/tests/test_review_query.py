@@ -55,8 +55,11 @@ class ReviewQueryTest(TestCase):
 
     def test_ordering_filter(self):
         reviews = review_utils.get_filtered_review_objects(ordering='alpha')
-        reviews = list(reviews)
-        self.assertTrue(all(val[0].review_item.title <= val[1].review_item.title for val in zip(reviews[:-1], reviews[1:])))
+        titles = [review.review_item.title.lower() for review in reviews]
+        self.assertEqual(titles, sorted(titles))
+        reviews = review_utils.get_filtered_review_objects(ordering='-alpha')
+        titles = [review.review_item.title.lower() for review in reviews]
+        self.assertEqual(titles, sorted(titles, reverse=True))
 
     def test_multi_filter(self):
         reviews = review_utils.get_filtered_review_objects(query='Cool', username='testuser', filter_categories=['random'])
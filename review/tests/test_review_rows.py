@@ -0,0 +1,188 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+
+from review.models import Review, ReviewItem
+from review.tests.factories import create_review_item
+from review.utils import review_rows
+from review.views import ReviewListCreateV2
+
+LIST_URL = '/api/v2/reviews/'
+
+
+def _create_reviews():
+    user = get_user_model().objects.create_user(username='rows', password='pass12345')
+    other = get_user_model().objects.create_user(username='rows_other', password='pass12345')
+    refreshed = create_review_item(item_id='rows_refreshed', title='Refreshed')
+    ReviewItem.objects.filter(pk=refreshed.pk).update(
+        last_refreshed_at=datetime(2024, 3, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc),
+        refresh_error_count=2,
+    )
+    Review.objects.create(user=user, review_item=refreshed, review_rating=Decimal('9.5'), review_data='Great', review_tags='a,b')
+    Review.objects.create(user=other, review_item=create_review_item(item_id='rows_plain', title='Plain'), review_rating=3)
+    Review.objects.create(user=other, review_item=create_review_item(item_id='rows_zero', title='Zero'), review_rating=0)
+
+
+class RowMapperTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_reviews()
+
+    def test_matches_output_serializer(self):
+        serializer_class = ReviewListCreateV2.OutputSerializer
+        mapper = review_rows.mapper_for(serializer_class)
+        reviews = Review.objects.order_by('id')
+
+        expected = serializer_class(reviews, many=True).data
+        actual = mapper.to_representation(mapper.project(reviews))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual([list(row) for row in actual], [list(row) for row in expected])
+        self.assertEqual([list(row['review_item']) for row in actual], [list(row['review_item']) for row in expected])
+        self.assertEqual(actual[0]['review_rating'], '9.50')
+        self.assertEqual(actual[0]['review_item']['last_refreshed_at'], '2024-03-01T12:30:15.250000Z')
+
+    def test_page_is_one_query(self):
+        mapper = review_rows.mapper_for(ReviewListCreateV2.OutputSerializer)
+
+        with CaptureQueriesContext(connection) as queries:
+            mapper.to_representation(mapper.project(Review.objects.all()))
+
+        self.assertEqual(len(queries.captured_queries), 1)
+
+    def test_unsupported_serializer_is_not_compiled(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Review
+                fields = ['id', 'label']
+
+            def get_label(self, review):
+                return str(review)
+
+        self.assertIsNone(review_rows.mapper_for(MethodSerializer))
+
+    @override_settings(REVIEW_LIST_FAST_SERIALIZATION=False)
+    def test_setting_disables_mapper(self):
+        self.assertIsNone(review_rows.mapper_for(ReviewListCreateV2.OutputSerializer))
+
+
+class FastListResponseTest(APITestCase):
+    def setUp(self):
+        _create_reviews()
+
+    def _data(self, params):
+        response = self.client.get(LIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_list_responses_match_serializer_path(self):
+        for params in ({'ordering': 'rating'}, {'ordering': 'alpha', 'query': 'refreshed'}, {'pagination': 'cursor', 'limit': 2}):
+            with self.subTest(params=params):
+                fast = self._data(params)
+                with override_settings(REVIEW_LIST_FAST_SERIALIZATION=False):
+                    slow = self._data(params)
+                self.assertEqual(fast, slow)
+
+
+class SelectFieldsTest(SimpleTestCase):
+    def _select(self, fields, expand=''):
+        return review_rows.select_fields(
+            ReviewListCreateV2.OutputSerializer, fields, expand, summaries={'review_item': ('item_id', 'title')},
+        )
+
+    def test_no_fields_selects_everything(self):
+        self.assertIsNone(self._select(''))
+        self.assertIsNone(self._select('', 'review_item'))
+
+    def test_selection_follows_serializer_order(self):
+        self.assertEqual(
+            self._select('review_rating, review_item.image_url,id'),
+            (('id', None), ('review_item', ('image_url',)), ('review_rating', None)),
+        )
+
+    def test_bare_nested_field_uses_summary_unless_expanded(self):
+        self.assertEqual(self._select('review_item'), (('review_item', ('item_id', 'title')),))
+        self.assertEqual(self._select('review_item', 'review_item'), (('review_item', None),))
+        self.assertEqual(self._select('review_item,review_item.year'), (('review_item', ('item_id', 'title', 'year')),))
+
+    def test_rejects_unknown_names(self):
+        for fields, expand in (('nope', ''), ('review_item.nope', ''), ('id.title', ''), ('id', 'user')):
+            with self.subTest(fields=fields, expand=expand):
+                with self.assertRaises(review_rows.InvalidFields):
+                    self._select(fields, expand)
+
+    def test_excerpt_cuts_at_a_word_break(self):
+        self.assertEqual(review_rows.excerpt('short', 10), 'short')
+        self.assertEqual(review_rows.excerpt('one two three four', 10), 'one two…')
+        self.assertEqual(review_rows.excerpt('abcdefghijklmnop', 10), 'abcdefghij…')
+
+
+class SparseListResponseTest(APITestCase):
+    def setUp(self):
+        _create_reviews()
+        Review.objects.filter(review_data='Great').update(review_data='Great ' * 100)
+
+    def _data(self, params):
+        response = self.client.get(LIST_URL, {'ordering': 'rating', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_fields_limit_output_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self._data({'fields': 'id,review_rating,review_item'})
+
+        self.assertEqual(list(data[0]), ['id', 'review_item', 'review_rating'])
+        self.assertEqual(list(data[0]['review_item']), list(ReviewListCreateV2.ITEM_CARD_FIELDS))
+        page_sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('description', page_sql)
+        self.assertNotIn('review_data', page_sql)
+
+    def test_expand_returns_every_item_field(self):
+        data = self._data({'fields': 'id,review_item', 'expand': 'review_item'})
+
+        self.assertIn('description', data[0]['review_item'])
+        self.assertIn('last_refreshed_at', data[0]['review_item'])
+
+    def test_review_data_excerpt(self):
+        length = 40
+        with override_settings(REVIEW_EXCERPT_LENGTH=length):
+            data = self._data({'review_data': 'excerpt', 'fields': 'id,review_data'})
+
+        excerpt = data[-1]['review_data']
+        self.assertTrue(excerpt.endswith('…'))
+        self.assertLessEqual(len(excerpt), length + 1)
+
+    def test_serializer_path_matches(self):
+        for params in (
+            {'fields': 'user,review_item.title,review_data', 'review_data': 'excerpt'},
+            {'fields': 'review_item', 'pagination': 'cursor', 'limit': 2},
+            {'review_data': 'excerpt'},
+        ):
+            with self.subTest(params=params):
+                fast = self._data(params)
+                with override_settings(REVIEW_LIST_FAST_SERIALIZATION=False):
+                    slow = self._data(params)
+                self.assertEqual(fast, slow)
+
+    def test_invalid_parameters(self):
+        for params in ({'fields': 'secret'}, {'expand': 'user'}, {'review_data': 'summary'}):
+            with self.subTest(params=params):
+                response = self.client.get(LIST_URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()['error']['code'], 'VALIDATION_ERROR')
+
+    @override_settings(REVIEW_LIST_FAST_SERIALIZATION=False)
+    def test_serializer_path_loads_only_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._data({'fields': 'user,review_item.title', 'include_count': 'false'})
+
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertNotIn('description', queries.captured_queries[0]['sql'])
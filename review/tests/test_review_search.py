@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from review.models import Review, ReviewItem
+from review.utils import review_search, review_utils
+from review.tests.factories import create_review_item
+
+
+def _item(item_id, **overrides):
+    return create_review_item(item_id=item_id, **overrides)
+
+
+class ReviewSearchTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='searcher', password='pass12345')
+        self.title_match = Review.objects.create(
+            user=self.user, review_item=_item('s_title', title='Solaris', description='Space station'),
+            review_rating=8,
+        )
+        self.description_match = Review.objects.create(
+            user=self.user,
+            review_item=_item('s_desc', title='Stalker', description='A guide leads travellers to Solaris'),
+            review_rating=9,
+        )
+        self.tag_match = Review.objects.create(
+            user=self.user, review_item=_item('s_tag', title='Mirror', description='Memories'),
+            review_rating=7, review_tags='tarkovsky,classic',
+        )
+
+    def _ids(self, query, ordering=''):
+        return [review.id for review in review_utils.get_filtered_review_objects(query=query, ordering=ordering)]
+
+    def test_uses_fts5_on_sqlite(self):
+        self.assertEqual(review_search.backend_for(), review_search.BACKEND_FTS5)
+
+    def test_words_match_as_prefixes_and_all_must_match(self):
+        self.assertCountEqual(self._ids('solar'), [self.title_match.id, self.description_match.id])
+        self.assertEqual(self._ids('solaris station'), [self.title_match.id])
+        self.assertEqual(self._ids('tarkov'), [self.tag_match.id])
+        self.assertEqual(self._ids('solaris mirror'), [])
+
+    def test_relevance_ranks_title_above_description(self):
+        self.assertEqual(self._ids('solaris', ordering='relevance'), [self.title_match.id, self.description_match.id])
+
+    def test_relevance_without_query_falls_back_to_newest(self):
+        self.assertEqual(self._ids('', ordering='relevance')[0], self.tag_match.id)
+
+    def test_document_follows_item_and_tag_updates(self):
+        ReviewItem.objects.filter(item_id='s_tag').update(description='Dreams of Solaris')
+        self.assertIn(self.tag_match.id, self._ids('solaris'))
+
+        self.tag_match.review_tags = 'dreamlike'
+        self.tag_match.save()
+        self.assertEqual(self._ids('tarkovsky'), [])
+        self.assertEqual(self._ids('dreamlike'), [self.tag_match.id])
+
+        self.tag_match.delete()
+        self.assertNotIn(self.tag_match.id, self._ids('solaris'))
+
+    def test_punctuation_only_query_matches_nothing(self):
+        self.assertEqual(self._ids('!!'), [])
+
+    @override_settings(REVIEW_SEARCH_BACKEND='like')
+    def test_like_backend_matches_substrings(self):
+        self.assertCountEqual(self._ids('olari'), [self.title_match.id, self.description_match.id])
+        self.assertEqual(len(self._ids('', ordering='relevance')), 3)
+
+
+class ReviewSearchApiTest(APITestCase):
+    def test_list_orders_by_relevance(self):
+        user = get_user_model().objects.create_user(username='api_searcher', password='pass12345')
+        weaker = Review.objects.create(
+            user=user, review_item=_item('a_desc', title='Heat', description='A thief and a detective'),
+            review_rating=8,
+        )
+        stronger = Review.objects.create(
+            user=user, review_item=_item('a_title', title='Thief', description='A safecracker'),
+            review_rating=7,
+        )
+
+        response = self.client.get('/api/v2/reviews/', {'query': 'thief', 'ordering': 'relevance'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([review['id'] for review in response.json()['data']], [stronger.id, weaker.id])
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from review.utils.single_flight import FILE_LOCK_STRIPES, SingleFlight
+
+
+def _coalesced_waits(scope):
+    return REGISTRY.get_sample_value(
+        'critic_upstream_coalesced_waits_total',
+        {'provider': 'omdb', 'scope': scope},
+    ) or 0.0
+
+
+def _wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        lock_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(lock_dir.cleanup)
+        self.lock_dir = lock_dir.name
+
+    def test_concurrent_callers_share_one_upstream_call(self):
+        flight = SingleFlight(wait_timeout=5, lock_dir=self.lock_dir)
+        release = threading.Event()
+        calls = []
+        results = []
+        waits_before = _coalesced_waits('process')
+
+        def upstream():
+            calls.append(1)
+            release.wait(5)
+            return {'response': 'True', 'title': 'Shared'}
+
+        def caller():
+            results.append(flight.do('details:omdb_tt1', upstream, source_name='OMDB API'))
+
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        _wait_until(lambda: _coalesced_waits('process') - waits_before >= 4)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result == {'response': 'True', 'title': 'Shared'} for result, _ in results))
+        self.assertEqual(sum(1 for _, coalesced in results if coalesced), 4)
+
+    def test_leader_exception_propagates_to_waiters(self):
+        flight = SingleFlight(wait_timeout=5, cross_process=False)
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def upstream():
+            started.set()
+            release.wait(5)
+            raise RuntimeError('boom')
+
+        def caller():
+            try:
+                flight.do('details:omdb_tt2', upstream, source_name='OMDB API')
+            except RuntimeError as ex:
+                errors.append(ex)
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait(5)
+        waiters_before = _coalesced_waits('process')
+        follower = threading.Thread(target=caller)
+        follower.start()
+        _wait_until(lambda: _coalesced_waits('process') > waiters_before)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(len(errors), 2)
+
+    def test_other_process_reuses_leader_result_after_lock(self):
+        # Separate instances stand in for separate workers sharing the lock dir and cache.
+        worker_a = SingleFlight(wait_timeout=5, lock_dir=self.lock_dir)
+        worker_b = SingleFlight(wait_timeout=5, lock_dir=self.lock_dir)
+        started = threading.Event()
+        release = threading.Event()
+        worker_b_calls = []
+        results = {}
+
+        def slow_upstream():
+            started.set()
+            release.wait(5)
+            return {'response': 'True', 'title': 'From A'}
+
+        def fast_upstream():
+            worker_b_calls.append(1)
+            return {'response': 'True', 'title': 'From B'}
+
+        thread_a = threading.Thread(
+            target=lambda: results.setdefault('a', worker_a.do('details:omdb_tt3', slow_upstream, source_name='OMDB API')),
+        )
+        thread_a.start()
+        started.wait(5)
+        waits_before = _coalesced_waits('cross_process')
+        thread_b = threading.Thread(
+            target=lambda: results.setdefault('b', worker_b.do('details:omdb_tt3', fast_upstream, source_name='OMDB API')),
+        )
+        thread_b.start()
+        # Give worker B time to start polling the held lock.
+        time.sleep(0.3)
+        release.set()
+        thread_a.join(5)
+        thread_b.join(5)
+
+        self.assertEqual(results['a'], ({'response': 'True', 'title': 'From A'}, False))
+        self.assertEqual(results['b'], ({'response': 'True', 'title': 'From A'}, True))
+        self.assertEqual(worker_b_calls, [])
+        self.assertEqual(_coalesced_waits('cross_process') - waits_before, 1)
+
+
+class FileLockStripeTest(SimpleTestCase):
+    def test_lock_files_are_bounded(self):
+        with tempfile.TemporaryDirectory() as lock_dir:
+            flight = SingleFlight(wait_timeout=1, lock_dir=lock_dir)
+            for index in range(FILE_LOCK_STRIPES * 2):
+                with flight._file_lock('search:movie:query {}'.format(index)):
+                    pass
+
+            self.assertLessEqual(len(os.listdir(lock_dir)), FILE_LOCK_STRIPES)
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from review.models import Review
+from review.utils import review_utils, trigram_search
+from review.tests.factories import create_review_item
+
+
+class TrigramIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = trigram_search.TrigramIndex([(1, 'Interstellar'), (2, 'Inception'), (3, 'The Prestige')])
+
+    def test_typos_and_partial_words_match(self):
+        self.assertEqual(list(self.index.search('intersteller', 0.6)), [1])
+        self.assertEqual(list(self.index.search('inter', 0.6)), [1])
+        self.assertEqual(list(self.index.search('prestge', 0.6)), [3])
+
+    def test_exact_word_scores_highest(self):
+        scores = self.index.search('inception', 0.3)
+
+        self.assertEqual(scores[2], 1.0)
+        self.assertTrue(all(score < 1.0 for key, score in scores.items() if key != 2))
+
+    def test_unrelated_words_do_not_match(self):
+        self.assertEqual(self.index.search('zebra', 0.6), {})
+
+    def test_returns_every_match(self):
+        index = trigram_search.TrigramIndex([(key, 'Interstellar {}'.format(key)) for key in range(2000)])
+
+        self.assertEqual(len(index.search('intersteller', 0.6)), 2000)
+
+
+class FuzzyReviewQueryTest(TestCase):
+    def setUp(self):
+        trigram_search.invalidate()
+        self.user = get_user_model().objects.create_user(username='fuzzy_user', password='pass12345')
+        self.interstellar = Review.objects.create(
+            user=self.user, review_item=create_review_item(item_id='f_inter', title='Interstellar'), review_rating=9,
+        )
+        self.interview = Review.objects.create(
+            user=self.user, review_item=create_review_item(item_id='f_view', title='Interview'), review_rating=6,
+        )
+        self.tagged = Review.objects.create(
+            user=self.user, review_item=create_review_item(item_id='f_tag', title='Contact'),
+            review_rating=7, review_tags='space,astronomy',
+        )
+
+    def _ids(self, query, ordering=''):
+        reviews = review_utils.get_filtered_review_objects(query=query, ordering=ordering, match='fuzzy')
+        return [review.id for review in reviews]
+
+    def test_typo_matches_title(self):
+        self.assertEqual(self._ids('intersteller'), [self.interstellar.id])
+
+    def test_matches_tags(self):
+        self.assertEqual(self._ids('astronmy'), [self.tagged.id])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self._ids('intersteller astronmy'), [])
+
+    def test_relevance_puts_closest_title_first(self):
+        self.assertEqual(self._ids('interv', ordering='relevance'), [self.interview.id, self.interstellar.id])
+        self.assertEqual(self._ids('interstellar', ordering='relevance')[0], self.interstellar.id)
+
+    def test_saved_reviews_are_indexed(self):
+        self.assertEqual(self._ids('gravty'), [])
+
+        review = Review.objects.create(
+            user=self.user, review_item=create_review_item(item_id='f_grav', title='Gravity'), review_rating=8,
+        )
+
+        self.assertEqual(self._ids('gravty'), [review.id])
+
+    def test_without_pg_trgm_or_sqlite_runs_a_regular_search(self):
+        with mock.patch.object(trigram_search, 'uses_in_process_index', return_value=False), \
+                mock.patch.object(trigram_search, '_warned_unavailable', set()), \
+                self.assertLogs('review.utils.trigram_search', 'WARNING'):
+            self.assertEqual(self._ids('interstellar'), [self.interstellar.id])
+            self.assertEqual(self._ids('intersteller'), [])
+
+    def test_exact_match_mode_is_unchanged(self):
+        self.assertEqual(review_utils.get_filtered_review_objects(query='intersteller').count(), 0)
+
+
+class FuzzyReviewListApiTest(APITestCase):
+    def test_list_accepts_match_fuzzy(self):
+        trigram_search.invalidate()
+        user = get_user_model().objects.create_user(username='fuzzy_api', password='pass12345')
+        review = Review.objects.create(
+            user=user, review_item=create_review_item(item_id='f_api', title='Interstellar'), review_rating=9,
+        )
+
+        response = self.client.get('/api/v2/reviews/', {'query': 'intersteller', 'match': 'fuzzy'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()['data']], [review.id])
@@ -12,8 +12,12 @@ review_patterns_v2 = [
 
 # v2 external lookup endpoints
 lookup_patterns_v2 = [
+    path('search/', views.FederatedSearchV2.as_view(), name='federated_search'),
     path('search/<str:category>/', views.SearchItemV2.as_view(), name='search_item'),
     path('item/<str:category>/<str:item_id>/', views.GetItemInfoV2.as_view(), name='get_item_info'),
+    # async variants for ASGI deployments
+    path('async/search/<str:category>/', views.SearchItemAsyncV2.as_view(), name='search_item_async'),
+    path('async/item/<str:category>/<str:item_id>/', views.GetItemInfoAsyncV2.as_view(), name='get_item_info_async'),
 ]
 
 urlpatterns = [
@@ -0,0 +1,163 @@
+"""
+Adaptive per-provider request rate for upstream API calls (AIMD).
+
+Every upstream request first takes a slot from its provider's throttle. The
+allowed rate grows additively with each successful response and is cut
+multiplicatively on 429s. ``Retry-After`` pauses the provider outright, and
+``X-RateLimit-Remaining``/``-Reset`` (or the unprefixed ``RateLimit-*``
+headers) pause it when the quota is spent and otherwise cap the rate at what
+the quota allows.
+
+Like the circuit breaker, state lives in the ``shared`` cache alias
+(``SHARED_CACHE_BACKEND``), so web workers, background revalidation and
+``refresh_review_items`` share one rate and one pause per provider as long as
+that alias points at a cross-process backend.
+"""
+
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+THROTTLE_CACHE_ALIAS = 'shared'
+DEFAULT_MAX_RPS = 10.0
+DEFAULT_MIN_RPS = 0.2
+DEFAULT_INCREASE_RPS = 0.1
+DEFAULT_DECREASE_FACTOR = 0.5
+# Longer waits fail the call instead of holding the caller.
+DEFAULT_MAX_WAIT_SECONDS = 30.0
+# Reset values above this are Unix timestamps rather than seconds from now.
+_EPOCH_THRESHOLD = 10 ** 9
+_STATE_TTL_SECONDS = 24 * 60 * 60
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float]=None) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` value (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - (time.time() if now is None else now), 0.0)
+
+
+def _header_number(headers, *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(str(value).split(',')[0].strip())
+        except ValueError:
+            continue
+    return None
+
+
+def parse_rate_limit(headers, now: Optional[float]=None) -> tuple[Optional[float], Optional[float]]:
+    """Return ``(remaining, reset_seconds)`` from X-RateLimit-* / RateLimit-* headers."""
+    remaining = _header_number(headers, 'X-RateLimit-Remaining', 'RateLimit-Remaining')
+    reset = _header_number(headers, 'X-RateLimit-Reset', 'RateLimit-Reset')
+    if reset is not None and reset > _EPOCH_THRESHOLD:
+        reset -= time.time() if now is None else now
+    if reset is not None:
+        reset = max(reset, 0.0)
+    return remaining, reset
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+class AdaptiveThrottle:
+    def __init__(self, source_name: str, clock: Optional[Callable[[], float]]=None):
+        self.provider = metrics.normalize_provider(source_name)
+        self._cache = caches[THROTTLE_CACHE_ALIAS]
+        self._clock = clock or time.time
+        max_rates = _setting('UPSTREAM_THROTTLE_MAX_RPS', {})
+        self.max_rate = float(max_rates.get(self.provider, DEFAULT_MAX_RPS))
+        self.min_rate = min(float(_setting('UPSTREAM_THROTTLE_MIN_RPS', DEFAULT_MIN_RPS)), self.max_rate)
+        self.max_wait = float(_setting('UPSTREAM_THROTTLE_MAX_WAIT_SECONDS', DEFAULT_MAX_WAIT_SECONDS))
+        self._prefix = 'throttle:{}'.format(self.provider)
+
+    @property
+    def rate(self) -> float:
+        return self._cache.get(self._prefix + ':rate', self.max_rate)
+
+    def try_acquire(self) -> float:
+        """Take a request slot and return 0, or return how many seconds to wait before trying again."""
+        if not _setting('UPSTREAM_THROTTLE_ENABLED', True):
+            return 0.0
+        now = self._clock()
+        paused_until = self._cache.get(self._prefix + ':paused_until', 0.0)
+        if paused_until > now:
+            return paused_until - now
+
+        # Fixed windows of at least one second, so slow rates still get one slot per window.
+        rate = self.rate
+        window = max(1.0, 1.0 / rate)
+        slots = max(int(rate * window), 1)
+        index = int(now // window)
+        key = '{}:window:{:g}:{}'.format(self._prefix, window, index)
+        ttl = int(window * 2) + 1
+        self._cache.add(key, 0, ttl)
+        try:
+            used = self._cache.incr(key)
+        except ValueError:
+            # The key expired between add() and incr().
+            self._cache.set(key, 1, ttl)
+            used = 1
+        if used <= slots:
+            return 0.0
+        return (index + 1) * window - now
+
+    def record_response(self, status_code: int, headers):
+        if not _setting('UPSTREAM_THROTTLE_ENABLED', True):
+            return
+        now = self._clock()
+        retry_after = parse_retry_after(headers.get('Retry-After'), now=now)
+        remaining, reset = parse_rate_limit(headers, now=now)
+        rate = self.rate
+
+        if status_code == 429:
+            rate *= _setting('UPSTREAM_THROTTLE_DECREASE_FACTOR', DEFAULT_DECREASE_FACTOR)
+            self._pause(now, retry_after if retry_after is not None else reset)
+        elif retry_after is not None:
+            # 503 and friends: back off for as long as asked without lowering the rate.
+            self._pause(now, retry_after)
+        elif remaining is not None and reset is not None:
+            if remaining < 1:
+                self._pause(now, reset)
+            else:
+                quota_rate = remaining / reset if reset else rate
+                rate = min(rate + _setting('UPSTREAM_THROTTLE_INCREASE_RPS', DEFAULT_INCREASE_RPS), quota_rate)
+        elif 200 <= status_code < 300:
+            rate += _setting('UPSTREAM_THROTTLE_INCREASE_RPS', DEFAULT_INCREASE_RPS)
+        else:
+            return
+        self._set_rate(rate)
+
+    def _pause(self, now: float, seconds: Optional[float]):
+        if not seconds:
+            return
+        key = self._prefix + ':paused_until'
+        paused_until = max(self._cache.get(key, 0.0), now + seconds)
+        self._cache.set(key, paused_until, int(seconds) + 1)
+
+    def _set_rate(self, rate: float):
+        rate = min(max(rate, self.min_rate), self.max_rate)
+        self._cache.set(self._prefix + ':rate', rate, _STATE_TTL_SECONDS)
+        metrics.record_upstream_allowed_rate(self.provider, rate)
+
+
+def get_throttle(source_name: str) -> AdaptiveThrottle:
+    return AdaptiveThrottle(source_name)
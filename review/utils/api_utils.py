@@ -1,17 +1,23 @@
+import asyncio
+import json
 import os
 import time
 import re
+import aiohttp
 import requests
 from abc import ABC, abstractmethod
+from asgiref.sync import sync_to_async
 from dotenv import load_dotenv, find_dotenv
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 
-from . import metrics
+from . import adaptive_throttle, circuit_breaker, deadlines, http_sessions, metrics
 
 load_dotenv(find_dotenv())
 MISSING_PREFIX_RESPONSE = {"response": "False", "error": "Missing prefix in item id."}
 NOT_OK_RESPONSE = {"response": "False", "error": "Bad reponse from API."}
+# OMDB answers 200 with one of these errors for an unknown IMDb ID.
+OMDB_NOT_FOUND_ERRORS = ("Incorrect IMDb ID.",)
 REQUEST_TIMEOUT_SECONDS = 10
 DEFAULT_MAX_RETRIES = 3
 RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
@@ -31,65 +37,272 @@ def normalize_imdb_title_url_to_item_id(value: str) -> Optional[str]:
         return None
     return f"omdb_{match.group('imdb_id').lower()}"
 
-def request_json_with_retry(url: str, source_name: str='Upstream API', retries: int=DEFAULT_MAX_RETRIES) -> tuple[dict, dict]:
+def _deadline_exceeded_response(source_name: str, **details) -> dict:
+    response = NOT_OK_RESPONSE.copy()
+    response["error"] = "Upstream API call exceeded its time budget."
+    response["deadline_exceeded"] = True
+    response["source"] = source_name
+    response.update(details)
+    metrics.record_upstream_api_call(source_name, 'deadline_exceeded')
+    return response
+
+def _check_before_attempt(breaker, deadline: Optional[deadlines.Deadline], source_name: str) -> dict:
+    if deadline is not None and deadline.expired():
+        return _deadline_exceeded_response(source_name)
+    if not breaker.allow_request():
+        response = NOT_OK_RESPONSE.copy()
+        response["error"] = "Upstream API temporarily unavailable."
+        response["circuit_open"] = True
+        response["source"] = source_name
+        metrics.record_upstream_api_call(source_name, 'circuit_open')
+        return response
+    return {}
+
+def _throttle_wait(throttle, deadline: Optional[deadlines.Deadline], source_name: str) -> tuple[Optional[float], dict]:
+    """Return ``(0, {})`` once a request slot is taken, ``(seconds, {})`` to wait first, or ``(None, error)``."""
+    wait_seconds = throttle.try_acquire()
+    if not wait_seconds:
+        return 0.0, {}
+    if deadline is not None and not deadline.allows(wait_seconds):
+        return None, _deadline_exceeded_response(source_name, throttled=True)
+    if wait_seconds > throttle.max_wait:
+        response = NOT_OK_RESPONSE.copy()
+        response["error"] = "Upstream API rate limit reached."
+        response["rate_limited"] = True
+        response["retry_after"] = wait_seconds
+        response["source"] = source_name
+        metrics.record_upstream_api_call(source_name, 'throttled')
+        return None, response
+    return wait_seconds, {}
+
+def _attempt_timeout(deadline: Optional[deadlines.Deadline]) -> float:
+    if deadline is None:
+        return REQUEST_TIMEOUT_SECONDS
+    return deadline.cap(REQUEST_TIMEOUT_SECONDS)
+
+def _handle_request_exception(
+    ex: Exception,
+    attempt: int,
+    retries: int,
+    deadline: Optional[deadlines.Deadline],
+    source_name: str,
+) -> tuple[Optional[float], dict]:
+    """Return ``(sleep_seconds, {})`` to retry, or ``(None, error)`` to give up."""
+    backoff = attempt + 1
+    if attempt < retries - 1 and (deadline is None or deadline.allows(backoff)):
+        return backoff, {}
+    response = NOT_OK_RESPONSE.copy()
+    response["error"] = "Request failure to upstream API."
+    response["exception_type"] = ex.__class__.__name__
+    response["source"] = source_name
+    metrics.record_upstream_api_call(source_name, 'exception')
+    return None, response
+
+def _handle_response(
+    status_code: int,
+    headers,
+    reason: str,
+    load_json: Callable[[], dict],
+    attempt: int,
+    retries: int,
+    deadline: Optional[deadlines.Deadline],
+    source_name: str,
+) -> tuple[Optional[float], dict, dict]:
+    """Return ``(sleep_seconds, {}, {})`` to retry, or ``(None, data, error)`` to finish."""
+    if status_code == 200:
+        try:
+            data = load_json()
+            metrics.record_upstream_api_call(source_name, 'success')
+            return None, data, {}
+        except ValueError:
+            response = NOT_OK_RESPONSE.copy()
+            response["error"] = "Invalid JSON from upstream API."
+            response["source"] = source_name
+            metrics.record_upstream_api_call(source_name, 'invalid_json')
+            return None, {}, response
+
+    if status_code in RETRY_STATUS_CODES and attempt < retries - 1:
+        retry_after = adaptive_throttle.parse_retry_after(headers.get('Retry-After'))
+        sleep_time = max(retry_after if retry_after is not None else (attempt + 1) * 2, 1)
+        if deadline is not None and not deadline.allows(sleep_time):
+            # Waiting out Retry-After would blow the caller's budget; fail now.
+            return None, {}, _deadline_exceeded_response(
+                source_name,
+                status_code=status_code,
+                upstream_reason=reason,
+                retry_after=sleep_time,
+            )
+        return sleep_time, {}, {}
+
+    response = NOT_OK_RESPONSE.copy()
+    response["status_code"] = status_code
+    response["upstream_reason"] = reason
+    response["source"] = source_name
+    metrics.record_upstream_api_call(source_name, 'http_error')
+    return None, {}, response
+
+def _exhausted_retries_response(source_name: str) -> dict:
+    response = NOT_OK_RESPONSE.copy()
+    response["error"] = "Exhausted retries calling upstream API."
+    response["source"] = source_name
+    metrics.record_upstream_api_call(source_name, 'exhausted_retries')
+    return response
+
+def _record_breaker_outcome(breaker, status_code: int, started: float):
+    if status_code >= 500:
+        breaker.record_failure(time.monotonic() - started)
+    else:
+        breaker.record_success(time.monotonic() - started)
+
+def _record_attempt(breaker, throttle, status_code: int, headers, started: float):
+    _record_breaker_outcome(breaker, status_code, started)
+    throttle.record_response(status_code, headers)
+
+# The breaker and throttle make blocking cache round trips. The async path runs
+# them off the event loop, the way Django's own async cache API (aget, aincr) does.
+_acheck_before_attempt = sync_to_async(_check_before_attempt)
+_athrottle_wait = sync_to_async(_throttle_wait)
+_arecord_attempt = sync_to_async(_record_attempt)
+
+def request_json_with_retry(
+    url: str,
+    source_name: str='Upstream API',
+    retries: int=DEFAULT_MAX_RETRIES,
+    deadline: Optional[deadlines.Deadline]=None,
+) -> tuple[dict, dict]:
+    if deadline is None:
+        deadline = deadlines.current_deadline()
+    breaker = circuit_breaker.get_breaker(source_name)
+    throttle = adaptive_throttle.get_throttle(source_name)
     for attempt in range(retries):
+        response = _check_before_attempt(breaker, deadline, source_name)
+        if response:
+            return {}, response
+        wait_seconds, response = _throttle_wait(throttle, deadline, source_name)
+        while wait_seconds:
+            time.sleep(wait_seconds)
+            wait_seconds, response = _throttle_wait(throttle, deadline, source_name)
+        if response:
+            return {}, response
+
+        started = time.monotonic()
         try:
-            response_obj = requests.get(
+            response_obj = http_sessions.get_session(source_name).get(
                 url,
-                timeout=REQUEST_TIMEOUT_SECONDS,
+                timeout=_attempt_timeout(deadline),
                 headers=DEFAULT_REQUEST_HEADERS,
             )
         except requests.RequestException as ex:
-            if attempt < retries - 1:
-                time.sleep(attempt + 1)
-                continue
-            response = NOT_OK_RESPONSE.copy()
-            response["error"] = "Request failure to upstream API."
-            response["exception_type"] = ex.__class__.__name__
-            response["source"] = source_name
-            metrics.record_upstream_api_call(source_name, 'exception')
+            breaker.record_failure(time.monotonic() - started)
+            sleep_time, response = _handle_request_exception(ex, attempt, retries, deadline, source_name)
+            if sleep_time is None:
+                return {}, response
+            time.sleep(sleep_time)
+            continue
+
+        _record_attempt(breaker, throttle, response_obj.status_code, response_obj.headers, started)
+        sleep_time, data, response = _handle_response(
+            response_obj.status_code, response_obj.headers, response_obj.reason, response_obj.json,
+            attempt, retries, deadline, source_name,
+        )
+        if sleep_time is None:
+            return data, response
+        time.sleep(sleep_time)
+
+    return {}, _exhausted_retries_response(source_name)
+
+async def request_json_with_retry_async(
+    url: str,
+    source_name: str='Upstream API',
+    retries: int=DEFAULT_MAX_RETRIES,
+    deadline: Optional[deadlines.Deadline]=None,
+) -> tuple[dict, dict]:
+    """asyncio counterpart of ``request_json_with_retry`` built on aiohttp."""
+    if deadline is None:
+        deadline = deadlines.current_deadline()
+    breaker = circuit_breaker.get_breaker(source_name)
+    throttle = adaptive_throttle.get_throttle(source_name)
+    for attempt in range(retries):
+        response = await _acheck_before_attempt(breaker, deadline, source_name)
+        if response:
+            return {}, response
+        wait_seconds, response = await _athrottle_wait(throttle, deadline, source_name)
+        while wait_seconds:
+            await asyncio.sleep(wait_seconds)
+            wait_seconds, response = await _athrottle_wait(throttle, deadline, source_name)
+        if response:
             return {}, response
 
-        if response_obj.status_code == 200:
-            try:
-                data = response_obj.json()
-                metrics.record_upstream_api_call(source_name, 'success')
-                return data, {}
-            except ValueError:
-                response = NOT_OK_RESPONSE.copy()
-                response["error"] = "Invalid JSON from upstream API."
-                response["source"] = source_name
-                metrics.record_upstream_api_call(source_name, 'invalid_json')
+        started = time.monotonic()
+        try:
+            async with http_sessions.get_async_session(source_name).get(
+                url,
+                timeout=aiohttp.ClientTimeout(total=_attempt_timeout(deadline)),
+                headers=DEFAULT_REQUEST_HEADERS,
+            ) as response_obj:
+                body = await response_obj.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            await sync_to_async(breaker.record_failure)(time.monotonic() - started)
+            sleep_time, response = _handle_request_exception(ex, attempt, retries, deadline, source_name)
+            if sleep_time is None:
                 return {}, response
-
-        if response_obj.status_code in RETRY_STATUS_CODES and attempt < retries - 1:
-            retry_after = response_obj.headers.get('Retry-After')
-            try:
-                sleep_time = int(retry_after) if retry_after else (attempt + 1) * 2
-            except ValueError:
-                sleep_time = (attempt + 1) * 2
-            time.sleep(max(sleep_time, 1))
+            await asyncio.sleep(sleep_time)
             continue
 
-        response = NOT_OK_RESPONSE.copy()
-        response["status_code"] = response_obj.status_code
-        response["upstream_reason"] = response_obj.reason
-        response["source"] = source_name
-        metrics.record_upstream_api_call(source_name, 'http_error')
-        return {}, response
+        await _arecord_attempt(breaker, throttle, response_obj.status, response_obj.headers, started)
+        sleep_time, data, response = _handle_response(
+            response_obj.status, response_obj.headers, response_obj.reason or '', lambda: json.loads(body),
+            attempt, retries, deadline, source_name,
+        )
+        if sleep_time is None:
+            return data, response
+        await asyncio.sleep(sleep_time)
+
+    return {}, _exhausted_retries_response(source_name)
 
-    response = NOT_OK_RESPONSE.copy()
-    response["error"] = "Exhausted retries calling upstream API."
-    response["source"] = source_name
-    metrics.record_upstream_api_call(source_name, 'exhausted_retries')
-    return {}, response
 
 class ReviewItemAPIBase(ABC):
-    @abstractmethod
+    """
+    Base class for external item providers.
+
+    Subclasses build provider URLs and convert provider JSON; the base class
+    runs the request through the sync or async HTTP path.
+    """
+    source_name = 'Upstream API'
+
     def search(self, query: str) -> dict:
+        json_data, response = request_json_with_retry(self._search_url(query), source_name=self.source_name)
+        return self._search_result(json_data, response, query)
+
+    def get_details(self, item_id: str) -> dict:
+        if not item_id.startswith(self.prefix):
+            return MISSING_PREFIX_RESPONSE.copy()
+        item_id = item_id[len(self.prefix):]
+        json_data, response = request_json_with_retry(self._details_url(item_id), source_name=self.source_name)
+        return self._details_result(json_data, response, item_id)
+
+    async def search_async(self, query: str) -> dict:
+        json_data, response = await request_json_with_retry_async(self._search_url(query), source_name=self.source_name)
+        return self._search_result(json_data, response, query)
+
+    async def get_details_async(self, item_id: str) -> dict:
+        if not item_id.startswith(self.prefix):
+            return MISSING_PREFIX_RESPONSE.copy()
+        item_id = item_id[len(self.prefix):]
+        json_data, response = await request_json_with_retry_async(self._details_url(item_id), source_name=self.source_name)
+        return self._details_result(json_data, response, item_id)
+
+    @abstractmethod
+    def _search_url(self, query: str) -> str:
         raise NotImplementedError('Should be implemented by subclass')
     @abstractmethod
-    def get_details(self, item_id: str) -> dict:
+    def _details_url(self, item_id: str) -> str:
+        raise NotImplementedError('Should be implemented by subclass')
+    @abstractmethod
+    def _search_result(self, json_data: dict, response: dict, query: str) -> dict:
+        raise NotImplementedError('Should be implemented by subclass')
+    @abstractmethod
+    def _details_result(self, json_data: dict, response: dict, item_id: str) -> dict:
         raise NotImplementedError('Should be implemented by subclass')
 
     @property
@@ -102,6 +315,8 @@ class ReviewItemAPIBase(ABC):
 
 
 class OMDBItemAPI(ReviewItemAPIBase):
+    source_name = 'OMDB API'
+
     def __init__(self):
         self.prefix = 'omdb_'
         self._api_key = os.environ.get('OMDB_API_KEY', None)
@@ -109,20 +324,19 @@ class OMDBItemAPI(ReviewItemAPIBase):
             raise RuntimeError('OMDB_API_KEY required for accessing OMDB data.')
         self._base_url = 'http://www.omdbapi.com/?apikey={}'.format(self._api_key)
 
-    def search(self, query) -> dict:
-        search_url = '{base_url}&s={movie_name}'.format(base_url=self._base_url, movie_name=query)
-        omdb_json, response = request_json_with_retry(search_url, source_name='OMDB API')
+    def _search_url(self, query: str) -> str:
+        return '{base_url}&s={movie_name}'.format(base_url=self._base_url, movie_name=query)
+
+    def _details_url(self, item_id: str) -> str:
+        return '{base_url}&i={imdb_id}'.format(base_url=self._base_url, imdb_id=item_id)
+
+    def _search_result(self, omdb_json: dict, response: dict, query: str) -> dict:
         if response:
             response["query"] = query
             return response
         return self._convert_to_review(omdb_json)
 
-    def get_details(self, item_id: str) -> dict:
-        if not item_id.startswith(self.prefix):
-            return MISSING_PREFIX_RESPONSE.copy()
-        item_id = item_id[len(self.prefix):]
-        info_url = '{base_url}&i={imdb_id}'.format(base_url=self._base_url, imdb_id=item_id)
-        omdb_json, response = request_json_with_retry(info_url, source_name='OMDB API')
+    def _details_result(self, omdb_json: dict, response: dict, item_id: str) -> dict:
         if response:
             response["item_id"] = item_id
             return response
@@ -133,6 +347,8 @@ class OMDBItemAPI(ReviewItemAPIBase):
         if omdb_json["Response"] == "False":
             response = NOT_OK_RESPONSE.copy()
             response["error"] = omdb_json["Error"]
+            if omdb_json["Error"] in OMDB_NOT_FOUND_ERRORS:
+                response["not_found"] = True
             return response
         if "Search" in omdb_json:
             json_data["results"] = []
@@ -164,6 +380,8 @@ class OMDBItemAPI(ReviewItemAPIBase):
 
 
 class RAWGItemAPI(ReviewItemAPIBase):
+    source_name = 'RAWG API'
+
     def __init__(self):
         self.prefix = 'rawg_'
         self._api_key = os.environ.get('RAWG_API_KEY', None)
@@ -171,10 +389,15 @@ class RAWGItemAPI(ReviewItemAPIBase):
             raise RuntimeError('RAWG_API_KEY required for accessing RAWG data.')
         self._base_url =  'https://api.rawg.io/api'
 
-    def search(self, query: str) -> dict:
-        search_url = '{base_url}/games?key={api_key}&search={game_name}'.format(
+    def _search_url(self, query: str) -> str:
+        return '{base_url}/games?key={api_key}&search={game_name}'.format(
             base_url=self._base_url, api_key=self._api_key, game_name=query)
-        rawg_json, response = request_json_with_retry(search_url, source_name='RAWG API')
+
+    def _details_url(self, item_id: str) -> str:
+        return '{base_url}/games/{game_id}?key={api_key}'.format(
+            base_url=self._base_url, api_key=self._api_key, game_id=item_id)
+
+    def _search_result(self, rawg_json: dict, response: dict, query: str) -> dict:
         if response:
             response["query"] = query
             rawg_json = response
@@ -187,13 +410,7 @@ class RAWGItemAPI(ReviewItemAPIBase):
                 }
         return self._convert_rawg_to_review(rawg_json)
 
-    def get_details(self, item_id: str) -> dict:
-        if not item_id.startswith(self.prefix):
-            return MISSING_PREFIX_RESPONSE.copy()
-        item_id = item_id[len(self.prefix):]
-        info_url = '{base_url}/games/{game_id}?key={api_key}'.format(
-            base_url=self._base_url, api_key=self._api_key, game_id=item_id)
-        rawg_json, response = request_json_with_retry(info_url, source_name='RAWG API')
+    def _details_result(self, rawg_json: dict, response: dict, item_id: str) -> dict:
         if response:
             rawg_json = response
             rawg_json["item_id"] = item_id
@@ -201,7 +418,6 @@ class RAWGItemAPI(ReviewItemAPIBase):
             rawg_json["response"] = "True"
         return self._convert_rawg_to_review(rawg_json)
 
-
     def _convert_rawg_to_review(self, rawg_json: dict) -> dict:
         json_data = dict()
         if rawg_json["response"] == "False":
@@ -241,6 +457,8 @@ class RAWGItemAPI(ReviewItemAPIBase):
 
 
 class JikanItemAPI(ReviewItemAPIBase):
+    source_name = 'Jikan API'
+
     def __init__(self, type: str):
         self.type_ = type
         if type not in ['anime', 'manga']:
@@ -248,20 +466,19 @@ class JikanItemAPI(ReviewItemAPIBase):
         self.prefix = 'jikan_{}_'.format(self.type_)
         self._base_url = 'https://api.jikan.moe/v4/{type}'.format(type=type)
 
-    def search(self, query) -> dict:
-        search_url = '{base_url}?q={search_term}'.format(base_url=self._base_url, search_term=query)
-        jikan_json, response = request_json_with_retry(search_url, source_name='Jikan API')
+    def _search_url(self, query: str) -> str:
+        return '{base_url}?q={search_term}'.format(base_url=self._base_url, search_term=query)
+
+    def _details_url(self, item_id: str) -> str:
+        return '{base_url}/{item_id}'.format(base_url=self._base_url, item_id=item_id)
+
+    def _search_result(self, jikan_json: dict, response: dict, query: str) -> dict:
         if response:
             response["query"] = query
             return response
         return self._convert_to_review(jikan_json)
 
-    def get_details(self, item_id: str) -> dict:
-        if not item_id.startswith(self.prefix):
-            return MISSING_PREFIX_RESPONSE.copy()
-        item_id = item_id[len(self.prefix):]
-        info_url = '{base_url}/{item_id}'.format(base_url=self._base_url, item_id=item_id)
-        jikan_json, response = request_json_with_retry(info_url, source_name='Jikan API')
+    def _details_result(self, jikan_json: dict, response: dict, item_id: str) -> dict:
         if response:
             response["item_id"] = item_id
             return response
@@ -0,0 +1,141 @@
+"""
+Per-provider circuit breaker for upstream API calls.
+
+State lives in the ``shared`` cache alias (``SHARED_CACHE_BACKEND``), so
+every gunicorn worker and the refresh command see the same breaker as long as
+that alias points at a cross-process backend; startup warns when it does not.
+
+closed    -> calls flow; failures and slow calls are counted per time window.
+open      -> calls fail fast until ``UPSTREAM_CIRCUIT_OPEN_SECONDS`` elapse.
+half_open -> a single probe call is let through; success closes the circuit,
+             failure re-opens it.
+"""
+
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+BREAKER_CACHE_ALIAS = 'shared'
+DEFAULT_WINDOW_SECONDS = 60
+DEFAULT_MIN_REQUESTS = 5
+DEFAULT_ERROR_RATE = 0.5
+DEFAULT_SLOW_CALL_SECONDS = 5.0
+DEFAULT_SLOW_CALL_RATE = 0.5
+DEFAULT_OPEN_SECONDS = 30
+
+
+class CircuitBreaker:
+    def __init__(self, source_name: str):
+        self.provider = metrics.normalize_provider(source_name)
+        self._cache = caches[BREAKER_CACHE_ALIAS]
+        self._state_key = 'breaker:{}:state'.format(self.provider)
+        self._probe_key = 'breaker:{}:probe'.format(self.provider)
+
+    @property
+    def state(self) -> str:
+        return self._get_state()['state']
+
+    def allow_request(self) -> bool:
+        if not _setting('UPSTREAM_CIRCUIT_BREAKER_ENABLED', True):
+            return True
+
+        state = self._get_state()
+        if state['state'] == CLOSED:
+            return True
+
+        open_seconds = _setting('UPSTREAM_CIRCUIT_OPEN_SECONDS', DEFAULT_OPEN_SECONDS)
+        if state['state'] == OPEN and time.time() - state['opened_at'] < open_seconds:
+            return False
+
+        # Cool-down elapsed (or a half-open probe timed out): let exactly one caller probe.
+        if self._cache.add(self._probe_key, True, open_seconds):
+            self._set_state(HALF_OPEN, opened_at=state['opened_at'])
+            return True
+        return False
+
+    def record_success(self, latency_seconds: float):
+        slow_seconds = _setting('UPSTREAM_CIRCUIT_SLOW_CALL_SECONDS', DEFAULT_SLOW_CALL_SECONDS)
+        self._record(failed=False, slow=latency_seconds >= slow_seconds)
+
+    def record_failure(self, latency_seconds: float):
+        slow_seconds = _setting('UPSTREAM_CIRCUIT_SLOW_CALL_SECONDS', DEFAULT_SLOW_CALL_SECONDS)
+        self._record(failed=True, slow=latency_seconds >= slow_seconds)
+
+    def reset(self):
+        self._cache.delete_many([self._state_key, self._probe_key, *self._window_keys()])
+        metrics.record_circuit_state(self.provider, CLOSED)
+
+    def _record(self, failed: bool, slow: bool):
+        if not _setting('UPSTREAM_CIRCUIT_BREAKER_ENABLED', True):
+            return
+
+        state = self._get_state()
+        if state['state'] == HALF_OPEN:
+            if failed or slow:
+                self._trip()
+            else:
+                self.reset()
+            return
+        if state['state'] == OPEN:
+            return
+
+        window_seconds = _setting('UPSTREAM_CIRCUIT_WINDOW_SECONDS', DEFAULT_WINDOW_SECONDS)
+        total_key, failure_key, slow_key = self._window_keys()
+        total = self._incr(total_key, window_seconds)
+        failures = self._incr(failure_key, window_seconds) if failed else self._cache.get(failure_key, 0)
+        slow_calls = self._incr(slow_key, window_seconds) if slow else self._cache.get(slow_key, 0)
+
+        if total < _setting('UPSTREAM_CIRCUIT_MIN_REQUESTS', DEFAULT_MIN_REQUESTS):
+            return
+        error_rate = _setting('UPSTREAM_CIRCUIT_ERROR_RATE', DEFAULT_ERROR_RATE)
+        slow_rate = _setting('UPSTREAM_CIRCUIT_SLOW_CALL_RATE', DEFAULT_SLOW_CALL_RATE)
+        if failures / total >= error_rate or slow_calls / total >= slow_rate:
+            self._trip()
+
+    def _trip(self):
+        self._cache.delete(self._probe_key)
+        self._set_state(OPEN, opened_at=time.time())
+
+    def _get_state(self) -> dict:
+        state = self._cache.get(self._state_key)
+        if state is None:
+            state = {'state': CLOSED, 'opened_at': None}
+        metrics.record_circuit_state(self.provider, state['state'])
+        return state
+
+    def _set_state(self, state: str, opened_at: Optional[float]):
+        # Keep the record around long enough to outlive any probe.
+        timeout = _setting('UPSTREAM_CIRCUIT_OPEN_SECONDS', DEFAULT_OPEN_SECONDS) * 10
+        self._cache.set(self._state_key, {'state': state, 'opened_at': opened_at}, timeout)
+        metrics.record_circuit_state(self.provider, state)
+
+    def _window_keys(self) -> list[str]:
+        window_seconds = _setting('UPSTREAM_CIRCUIT_WINDOW_SECONDS', DEFAULT_WINDOW_SECONDS)
+        bucket = int(time.time() // max(window_seconds, 1))
+        prefix = 'breaker:{}:{}'.format(self.provider, bucket)
+        return [prefix + ':total', prefix + ':failures', prefix + ':slow']
+
+    def _incr(self, key: str, window_seconds: int) -> int:
+        self._cache.add(key, 0, window_seconds * 2)
+        try:
+            return self._cache.incr(key)
+        except ValueError:
+            # The key expired between add() and incr().
+            self._cache.set(key, 1, window_seconds * 2)
+            return 1
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def get_breaker(source_name: str) -> CircuitBreaker:
+    return CircuitBreaker(source_name)
@@ -0,0 +1,61 @@
+"""
+End-to-end time budgets for upstream calls.
+
+Callers open a ``deadline_scope`` around provider calls; everything below it
+(timeouts, retry backoff, ``Retry-After`` waits, single-flight waits) reads
+the active deadline from a context variable and fits inside what is left.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+# Attempts with less budget than this are not worth starting.
+MIN_ATTEMPT_SECONDS = 0.25
+
+_current_deadline: contextvars.ContextVar[Optional['Deadline']] = contextvars.ContextVar(
+    'upstream_deadline',
+    default=None,
+)
+
+
+class Deadline:
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = max(budget_seconds, 0.0)
+        self.expires_at = time.monotonic() + self.budget_seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() < MIN_ATTEMPT_SECONDS
+
+    def allows(self, seconds: float) -> bool:
+        """True if waiting ``seconds`` still leaves room for another attempt."""
+        return seconds + MIN_ATTEMPT_SECONDS <= self.remaining()
+
+    def cap(self, seconds: float) -> float:
+        return min(seconds, self.remaining())
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget_seconds: float):
+    """
+    Run the enclosed upstream calls within ``budget_seconds``.
+
+    A nested scope never extends an enclosing, tighter deadline.
+    """
+    deadline = Deadline(budget_seconds)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
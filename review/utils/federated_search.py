@@ -0,0 +1,154 @@
+"""
+Concurrent search across every external provider.
+
+Each category is searched on a shared thread pool with its own time budget.
+Providers that fail or run out of time are reported per category instead of
+failing the whole request, so callers always get whatever finished in time.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import deadlines, metrics, search_cache
+
+DEFAULT_PROVIDER_TIMEOUT_SECONDS = 4.0
+DEFAULT_MAX_WORKERS = 16
+
+_logger = logging.getLogger(__name__)
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+STATUS_TIMEOUT = 'timeout'
+STATUS_UNAVAILABLE = 'unavailable'
+
+# Title match ranks, best first.
+MATCH_EXACT = 0
+MATCH_PREFIX = 1
+MATCH_CONTAINS = 2
+MATCH_NONE = 3
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(getattr(settings, 'LOOKUP_FEDERATED_MAX_WORKERS', DEFAULT_MAX_WORKERS), 1),
+                thread_name_prefix='federated-search',
+            )
+    return _executor
+
+
+def get_provider_timeout() -> float:
+    return getattr(settings, 'LOOKUP_FEDERATED_PROVIDER_TIMEOUT_SECONDS', DEFAULT_PROVIDER_TIMEOUT_SECONDS)
+
+
+def _search_category(category: str, api_obj, query: str) -> tuple[dict, str, float]:
+    started = time.monotonic()
+    try:
+        result, cache_status = search_cache.cached_search(
+            category,
+            getattr(api_obj, 'source_name', category),
+            query,
+            api_obj.search,
+        )
+    finally:
+        # Pool threads live outside the request cycle, so recycle their DB
+        # connections (used by cross-process single-flight) here.
+        close_old_connections()
+    return result, cache_status, time.monotonic() - started
+
+
+def _error_status(result: dict) -> str:
+    if result.get('circuit_open') or result.get('rate_limited'):
+        return STATUS_UNAVAILABLE
+    if result.get('deadline_exceeded'):
+        return STATUS_TIMEOUT
+    return STATUS_ERROR
+
+
+def _match_rank(title: str, normalized_query: str) -> int:
+    normalized_title = search_cache.normalize_search_query(title)
+    if normalized_title == normalized_query:
+        return MATCH_EXACT
+    if normalized_title.startswith(normalized_query):
+        return MATCH_PREFIX
+    if normalized_query in normalized_title:
+        return MATCH_CONTAINS
+    return MATCH_NONE
+
+
+def rank_results(results_by_category: Dict[str, list], query: str) -> list:
+    """
+    Merge per-category results into one list.
+
+    Results are ordered by how closely the title matches the query, then by
+    the provider's own position, then by category order, so equally good
+    matches from different providers are interleaved.
+    """
+    normalized_query = search_cache.normalize_search_query(query)
+    ranked = []
+    for category_index, (category, results) in enumerate(results_by_category.items()):
+        for position, result in enumerate(results):
+            item = dict(result)
+            item['category'] = category
+            sort_key = (_match_rank(item.get('title') or '', normalized_query), position, category_index)
+            ranked.append((sort_key, item))
+    ranked.sort(key=lambda entry: entry[0])
+    return [item for _, item in ranked]
+
+
+def federated_search(query: str, providers: dict, timeout: Optional[float]=None) -> tuple[list, dict]:
+    """
+    Search every ``{category: api_obj}`` provider concurrently.
+
+    Returns ``(results, provider_status)`` where ``provider_status`` maps each
+    category to its status, cache result, result count and duration.
+    """
+    if timeout is None:
+        timeout = get_provider_timeout()
+    executor = _get_executor()
+    futures = {}
+    started = time.monotonic()
+    with deadlines.deadline_scope(timeout):
+        for category, api_obj in providers.items():
+            # Each task gets its own copy of the context so it sees the deadline.
+            context = contextvars.copy_context()
+            futures[category] = executor.submit(context.run, _search_category, category, api_obj, query)
+        wait(futures.values(), timeout=deadlines.current_deadline().remaining())
+
+    results_by_category = {}
+    provider_status = {}
+    for category, future in futures.items():
+        source_name = getattr(providers[category], 'source_name', category)
+        if not future.done():
+            # Still queued or in flight; a running search finishes in the
+            # background and still warms the search cache.
+            future.cancel()
+            status = {'status': STATUS_TIMEOUT, 'duration_ms': int((time.monotonic() - started) * 1000)}
+        else:
+            try:
+                result, cache_status, duration = future.result()
+            except Exception:
+                _logger.exception('Federated search failed for category %s', category)
+                result, cache_status, duration = {'response': 'False'}, search_cache.CACHE_MISS, time.monotonic() - started
+            if result.get('response') == 'False':
+                status = {'status': _error_status(result), 'cache': cache_status}
+            else:
+                results_by_category[category] = result.get('results', [])
+                status = {'status': STATUS_OK, 'cache': cache_status, 'count': len(results_by_category[category])}
+            status['duration_ms'] = int(duration * 1000)
+        metrics.record_federated_search_provider(source_name, status['status'])
+        provider_status[category] = status
+
+    return rank_results(results_by_category, query), provider_status
@@ -0,0 +1,214 @@
+"""
+Pooled keep-alive HTTP sessions for upstream review item providers.
+
+Each provider (OMDB, RAWG, Jikan) gets its own ``requests.Session`` backed by a
+bounded urllib3 connection pool, so repeated lookups reuse open TCP/TLS
+connections instead of handshaking on every call. Async lookups get the
+equivalent ``aiohttp.ClientSession`` per provider and event loop. Only a
+long-lived loop (an ASGI server's) keeps them between requests; under WSGI
+each async view call runs on a fresh loop, and the view closes that loop's
+sessions before returning (see ``close_async_sessions``).
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from functools import partial
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+from . import metrics
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_POOL_BLOCK = False
+DEFAULT_POOL_TIMEOUT_SECONDS = 5
+DEFAULT_ASYNC_MAX_CONNECTIONS = 100
+
+
+class _InstrumentedPoolMixin:
+    """Counts whether each checked-out connection was reused or newly opened."""
+
+    def __init__(self, *args, provider: str='unknown', pool_timeout: Optional[float]=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.provider = provider
+        self.pool_timeout = pool_timeout
+
+    def _get_conn(self, timeout=None):
+        # urllib3 waits forever on a blocking pool unless a timeout is given.
+        if timeout is None:
+            timeout = self.pool_timeout
+        conn = super()._get_conn(timeout=timeout)
+        if getattr(conn, 'sock', None) is not None:
+            metrics.record_upstream_connection(self.provider, reused=True)
+        else:
+            metrics.record_upstream_connection(self.provider, reused=False)
+        return conn
+
+
+class _InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class ProviderHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools are labelled with the provider name."""
+
+    def __init__(self, provider: str, pool_timeout: Optional[float]=None, **kwargs):
+        self.provider = provider
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': partial(_InstrumentedHTTPConnectionPool, provider=self.provider, pool_timeout=self.pool_timeout),
+            'https': partial(_InstrumentedHTTPSConnectionPool, provider=self.provider, pool_timeout=self.pool_timeout),
+        }
+
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as ex:
+            # requests re-raises this urllib3 error as-is; keep callers on RequestException.
+            raise requests.ConnectionError(ex, request=request)
+
+
+class ProviderSessionPool:
+    """
+    Lazily builds one pooled session per provider.
+
+    Sessions are shared by all threads of a worker process (urllib3 pools are
+    thread-safe) and rebuilt after a fork so gunicorn workers never share
+    sockets inherited from the master process.
+    """
+
+    def __init__(
+        self,
+        pool_connections: Optional[int]=None,
+        pool_maxsize: Optional[int]=None,
+        pool_block: Optional[bool]=None,
+        pool_timeout: Optional[float]=None,
+    ):
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._pool_timeout = pool_timeout
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pid = os.getpid()
+
+    def get_session(self, source_name: str) -> requests.Session:
+        provider = metrics.normalize_provider(source_name)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._sessions = {}
+                self._pid = os.getpid()
+            session = self._sessions.get(provider)
+            if session is None:
+                session = self._build_session(provider)
+                self._sessions[provider] = session
+        return session
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+    def _build_session(self, provider: str) -> requests.Session:
+        adapter = ProviderHTTPAdapter(
+            provider=provider,
+            pool_timeout=self._setting(self._pool_timeout, 'UPSTREAM_HTTP_POOL_TIMEOUT_SECONDS', DEFAULT_POOL_TIMEOUT_SECONDS),
+            pool_connections=max(self._setting(self._pool_connections, 'UPSTREAM_HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS), 1),
+            pool_maxsize=max(self._setting(self._pool_maxsize, 'UPSTREAM_HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE), 1),
+            pool_block=self._setting(self._pool_block, 'UPSTREAM_HTTP_POOL_BLOCK', DEFAULT_POOL_BLOCK),
+            max_retries=0,
+        )
+        session = requests.Session()
+        # Upstream cookies must not leak between users sharing a worker.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def _setting(override, name: str, default):
+        if override is not None:
+            return override
+        return getattr(settings, name, default)
+
+
+class ProviderAsyncSessionPool:
+    """
+    Lazily builds one ``aiohttp.ClientSession`` per provider and event loop.
+
+    Sessions cannot be shared across event loops, so they are keyed by the
+    running loop and dropped together with it.
+    """
+
+    def __init__(self, max_connections: Optional[int]=None):
+        self._max_connections = max_connections
+        self._lock = threading.Lock()
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def get_session(self, source_name: str) -> aiohttp.ClientSession:
+        provider = metrics.normalize_provider(source_name)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sessions = self._sessions.setdefault(loop, {})
+            session = sessions.get(provider)
+            if session is None or session.closed:
+                session = self._build_session()
+                sessions[provider] = session
+        return session
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sessions = self._sessions.pop(loop, {})
+        for session in sessions.values():
+            await session.close()
+
+    def _build_session(self) -> aiohttp.ClientSession:
+        max_connections = self._max_connections
+        if max_connections is None:
+            max_connections = getattr(settings, 'UPSTREAM_ASYNC_HTTP_MAX_CONNECTIONS', DEFAULT_ASYNC_MAX_CONNECTIONS)
+        max_connections = max(max_connections, 1)
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_connections),
+            # Upstream cookies must not leak between users sharing a worker.
+            cookie_jar=aiohttp.DummyCookieJar(),
+            timeout=aiohttp.ClientTimeout(total=None),
+        )
+
+
+_default_pool = ProviderSessionPool()
+_default_async_pool = ProviderAsyncSessionPool()
+
+
+def get_session(source_name: str) -> requests.Session:
+    return _default_pool.get_session(source_name)
+
+
+def close_sessions():
+    _default_pool.close()
+
+
+def get_async_session(source_name: str) -> aiohttp.ClientSession:
+    return _default_async_pool.get_session(source_name)
+
+
+async def close_async_sessions():
+    await _default_async_pool.close()
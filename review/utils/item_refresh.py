@@ -0,0 +1,235 @@
+"""
+Stale-while-revalidate for stored ReviewItem rows.
+
+Lookup views serve a stale row immediately and queue a background refresh of
+that one item. Refreshes are deduplicated across workers through the
+``shared`` cache alias and run on a small per-process thread pool, so popular items stay fresh
+between ``refresh_review_items`` runs without requests waiting on upstream.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+from django.utils import timezone
+
+from review.models import ReviewItem
+
+from . import deadlines, metrics, single_flight
+
+DEDUP_CACHE_ALIAS = 'shared'
+DEFAULT_STALE_AFTER_SECONDS = 14 * 24 * 60 * 60
+DEFAULT_MIN_RETRY_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 100
+DEFAULT_DEDUP_TTL_SECONDS = 300
+DEFAULT_DEADLINE_SECONDS = 12
+DEFAULT_MAX_BACKOFF_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_TOMBSTONE_AFTER_NOT_FOUND = 3
+
+REFRESHED_FIELDS = ('title', 'image_url', 'year', 'attr1', 'attr2', 'attr3', 'description', 'rating')
+REFRESH_BOOKKEEPING_FIELDS = (
+    'last_refreshed_at', 'last_refresh_attempt_at', 'refresh_error_count',
+    'refresh_next_attempt_at', 'refresh_not_found_count',
+)
+FAILURE_BOOKKEEPING_FIELDS = (
+    'last_refresh_attempt_at', 'refresh_error_count',
+    'refresh_next_attempt_at', 'refresh_not_found_count', 'refresh_tombstoned_at',
+)
+
+_logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(getattr(settings, 'LOOKUP_REVALIDATE_MAX_WORKERS', DEFAULT_MAX_WORKERS), 1),
+                thread_name_prefix='item-revalidate',
+            )
+    return _executor
+
+
+def get_stale_after(category: str) -> timedelta:
+    seconds_by_category = getattr(settings, 'LOOKUP_ITEM_STALE_AFTER_SECONDS', {})
+    return timedelta(seconds=int(seconds_by_category.get(category, DEFAULT_STALE_AFTER_SECONDS)))
+
+
+def is_stale(item: ReviewItem, now: Optional[datetime]=None) -> bool:
+    if item.last_refreshed_at is None:
+        return True
+    now = now or timezone.now()
+    return item.last_refreshed_at <= now - get_stale_after(item.category)
+
+
+def apply_refreshed_details(item: ReviewItem, details: dict, now: datetime) -> bool:
+    """
+    Copy refreshed provider fields onto ``item`` and reset its refresh bookkeeping.
+
+    Returns True if any of REFRESHED_FIELDS changed; otherwise only the
+    bookkeeping fields need to be written.
+    """
+    previous = _refreshed_values(item)
+    for field in REFRESHED_FIELDS:
+        setattr(item, field, details.get(field, getattr(item, field)))
+    item.rating = str(item.rating)
+    item.last_refreshed_at = now
+    item.last_refresh_attempt_at = now
+    item.refresh_error_count = 0
+    item.refresh_next_attempt_at = None
+    item.refresh_not_found_count = 0
+    return previous != _refreshed_values(item)
+
+
+def _refreshed_values(item: ReviewItem) -> list:
+    # Every refreshed column is text; compare as stored so 2024 == '2024'.
+    return [str(getattr(item, field)) for field in REFRESHED_FIELDS]
+
+
+def retry_backoff(error_count: int, min_retry: timedelta, max_backoff: timedelta) -> timedelta:
+    """Delay before the next attempt after ``error_count`` consecutive failures, doubling per failure."""
+    exponent = min(max(error_count - 1, 0), 32)
+    seconds = min(min_retry.total_seconds() * (2 ** exponent), max(max_backoff, min_retry).total_seconds())
+    return timedelta(seconds=seconds)
+
+
+def is_not_found(details: dict) -> bool:
+    return details.get('status_code') == 404 or bool(details.get('not_found'))
+
+
+def record_refresh_failure(
+    item: ReviewItem,
+    details: dict,
+    now: datetime,
+    min_retry: timedelta,
+    max_backoff: Optional[timedelta]=None,
+    tombstone_after: Optional[int]=None,
+) -> bool:
+    """
+    Update ``item``'s failure bookkeeping (see FAILURE_BOOKKEEPING_FIELDS).
+
+    Returns True if the item was tombstoned by this failure.
+    """
+    if max_backoff is None:
+        max_backoff = timedelta(seconds=getattr(settings, 'REFRESH_MAX_BACKOFF_SECONDS', DEFAULT_MAX_BACKOFF_SECONDS))
+    if tombstone_after is None:
+        tombstone_after = getattr(settings, 'REFRESH_TOMBSTONE_AFTER_NOT_FOUND', DEFAULT_TOMBSTONE_AFTER_NOT_FOUND)
+    item.last_refresh_attempt_at = now
+    item.refresh_error_count += 1
+    item.refresh_next_attempt_at = now + retry_backoff(item.refresh_error_count, min_retry, max_backoff)
+    item.refresh_not_found_count = item.refresh_not_found_count + 1 if is_not_found(details) else 0
+    if tombstone_after > 0 and item.refresh_not_found_count >= tombstone_after and item.refresh_tombstoned_at is None:
+        item.refresh_tombstoned_at = now
+        return True
+    return False
+
+
+def _min_retry() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'LOOKUP_REVALIDATE_MIN_RETRY_SECONDS', DEFAULT_MIN_RETRY_SECONDS))
+
+
+def _dedup_key(item_id: str) -> str:
+    return 'revalidate:{}'.format(item_id)
+
+
+def schedule_refresh(item: ReviewItem, api_obj, now: Optional[datetime]=None) -> bool:
+    """
+    Queue a background refresh of ``item`` unless one is already pending.
+
+    Returns True if a refresh was queued by this call.
+    """
+    global _pending
+    if not getattr(settings, 'LOOKUP_REVALIDATE_ENABLED', True):
+        return False
+    if item.refresh_tombstoned_at is not None:
+        return False
+    source_name = getattr(api_obj, 'source_name', item.category)
+    now = now or timezone.now()
+    if (
+        (item.last_refresh_attempt_at is not None and item.last_refresh_attempt_at > now - _min_retry())
+        or (item.refresh_next_attempt_at is not None and item.refresh_next_attempt_at > now)
+    ):
+        # Attempted recently (and evidently failed); wait out the retry backoff.
+        metrics.record_item_revalidation(source_name, 'backoff')
+        return False
+
+    cache = caches[DEDUP_CACHE_ALIAS]
+    dedup_ttl = getattr(settings, 'LOOKUP_REVALIDATE_DEDUP_TTL_SECONDS', DEFAULT_DEDUP_TTL_SECONDS)
+    if not cache.add(_dedup_key(item.item_id), 1, dedup_ttl):
+        metrics.record_item_revalidation(source_name, 'deduplicated')
+        return False
+
+    with _executor_lock:
+        if _pending >= getattr(settings, 'LOOKUP_REVALIDATE_MAX_PENDING', DEFAULT_MAX_PENDING):
+            full = True
+        else:
+            full = False
+            _pending += 1
+    if full:
+        cache.delete(_dedup_key(item.item_id))
+        metrics.record_item_revalidation(source_name, 'dropped')
+        return False
+
+    try:
+        _get_executor().submit(_run_refresh, item.item_id, api_obj)
+    except RuntimeError:
+        # The pool is shutting down with the process.
+        with _executor_lock:
+            _pending -= 1
+        cache.delete(_dedup_key(item.item_id))
+        return False
+    metrics.record_item_revalidation(source_name, 'queued')
+    return True
+
+
+def _run_refresh(item_id: str, api_obj):
+    global _pending
+    try:
+        refresh_item(item_id, api_obj)
+    except Exception:
+        _logger.exception('Background refresh failed for %s', item_id)
+    finally:
+        with _executor_lock:
+            _pending -= 1
+        caches[DEDUP_CACHE_ALIAS].delete(_dedup_key(item_id))
+        close_old_connections()
+
+
+def refresh_item(item_id: str, api_obj) -> str:
+    """Refresh one stored item from its provider and return the outcome."""
+    source_name = getattr(api_obj, 'source_name', 'Upstream API')
+    deadline_seconds = getattr(settings, 'LOOKUP_DETAILS_DEADLINE_SECONDS', DEFAULT_DEADLINE_SECONDS)
+    with deadlines.deadline_scope(deadline_seconds):
+        details, _ = single_flight.coalesce(
+            single_flight.details_key(item_id),
+            lambda: api_obj.get_details(item_id),
+            source_name=source_name,
+        )
+
+    now = timezone.now()
+    if details.get('circuit_open') or details.get('rate_limited'):
+        outcome = 'skipped'
+    else:
+        item = ReviewItem.objects.filter(item_id=item_id).first()
+        if item is None:
+            outcome = 'skipped'
+        elif details.get('response') != 'True':
+            record_refresh_failure(item, details, now, _min_retry())
+            item.save(update_fields=FAILURE_BOOKKEEPING_FIELDS)
+            outcome = 'failed'
+        else:
+            changed = apply_refreshed_details(item, details, now)
+            item.save(update_fields=(REFRESHED_FIELDS if changed else ()) + REFRESH_BOOKKEEPING_FIELDS)
+            outcome = 'refreshed'
+    metrics.record_item_revalidation(source_name, outcome)
+    return outcome
@@ -1,6 +1,6 @@
 import time
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 from django.conf import settings
 from django.http import HttpResponse
@@ -13,6 +13,7 @@ from prometheus_client import (
     Histogram,
     generate_latest,
     push_to_gateway,
+    start_http_server,
 )
 
 REQUEST_TOTAL = Counter(
@@ -39,6 +40,88 @@ UPSTREAM_API_CALLS_TOTAL = Counter(
     ['provider', 'outcome'],
 )
 
+UPSTREAM_HTTP_POOL_HITS_TOTAL = Counter(
+    'critic_upstream_http_pool_hits_total',
+    'Total number of upstream API requests served over a reused keep-alive connection.',
+    ['provider'],
+)
+
+UPSTREAM_HTTP_NEW_CONNECTIONS_TOTAL = Counter(
+    'critic_upstream_http_new_connections_total',
+    'Total number of new TCP/TLS connections opened to external APIs.',
+    ['provider'],
+)
+
+LOOKUP_SEARCH_CACHE_TOTAL = Counter(
+    'critic_lookup_search_cache_requests_total',
+    'Total number of external search cache lookups by result (hit or miss).',
+    ['provider', 'result'],
+)
+
+REVIEW_LIST_CACHE_TOTAL = Counter(
+    'critic_review_list_cache_requests_total',
+    'Total number of anonymous review list response cache lookups by result (hit or miss).',
+    ['result'],
+)
+
+UPSTREAM_COALESCED_WAITS_TOTAL = Counter(
+    'critic_upstream_coalesced_waits_total',
+    'Total number of upstream lookups that waited on an identical in-flight call instead of calling the provider.',
+    ['provider', 'scope'],
+)
+
+UPSTREAM_CIRCUIT_STATE = Gauge(
+    'critic_upstream_circuit_state',
+    'Upstream circuit breaker state per provider (0 closed, 1 half-open, 2 open).',
+    ['provider'],
+)
+
+UPSTREAM_ALLOWED_RATE = Gauge(
+    'critic_upstream_allowed_rate_rps',
+    'Requests per second currently allowed to each external API by the adaptive throttle.',
+    ['provider'],
+)
+
+LOOKUP_FEDERATED_PROVIDER_TOTAL = Counter(
+    'critic_lookup_federated_provider_results_total',
+    'Total number of per-provider outcomes in federated searches (ok, error, timeout, unavailable).',
+    ['provider', 'status'],
+)
+
+LOOKUP_ITEM_REVALIDATIONS_TOTAL = Counter(
+    'critic_lookup_item_revalidations_total',
+    'Total number of stale-while-revalidate refreshes of stored items by result.',
+    ['provider', 'result'],
+)
+
+REFRESH_ITEMS_TOTAL = Counter(
+    'critic_refresh_items_total',
+    'Total number of items handled by the refresh daemon by provider and result.',
+    ['provider', 'result'],
+)
+
+REFRESH_ITEMS_PER_SECOND = Gauge(
+    'critic_refresh_items_per_second',
+    'Items processed per second in the latest refresh daemon batch.',
+)
+
+REFRESH_QUEUE_DEPTH = Gauge(
+    'critic_refresh_queue_depth',
+    'Stale items due for refresh and not leased, measured after the latest refresh daemon batch.',
+)
+
+REFRESH_PROVIDER_LATENCY_SECONDS = Histogram(
+    'critic_refresh_provider_latency_seconds',
+    'Latency of refresh lookups per provider in seconds, including retries.',
+    ['provider'],
+)
+
+CIRCUIT_STATE_VALUES = {
+    'closed': 0,
+    'half_open': 1,
+    'open': 2,
+}
+
 _logger = logging.getLogger(__name__)
 
 
@@ -52,6 +135,9 @@ def push_refresh_run_metrics(
     dry_run: bool,
     success: bool,
     provider_totals: Dict[str, Dict[str, int]],
+    changed: int=0,
+    unchanged: int=0,
+    remaining: int=0,
 ):
     pushgateway_url = getattr(settings, 'PUSHGATEWAY_URL', '').rstrip('/')
     if not pushgateway_url:
@@ -103,13 +189,16 @@ def push_refresh_run_metrics(
         'refreshed': refreshed,
         'failed': failed,
         'skipped': skipped,
+        'changed': changed,
+        'unchanged': unchanged,
+        'remaining': remaining,
     }
     for result, count in totals_by_result.items():
         run_item_totals.labels(result=result, dry_run=dry_run_label).set(max(count, 0))
 
     for provider, totals in sorted(provider_totals.items()):
         safe_provider = normalize_provider(provider)
-        for result in ('processed', 'refreshed', 'failed', 'skipped'):
+        for result in ('processed', 'refreshed', 'failed', 'skipped', 'changed', 'unchanged'):
             provider_item_totals.labels(
                 provider=safe_provider,
                 result=result,
@@ -163,6 +252,76 @@ def record_upstream_api_call(source_name: str, outcome: str):
     UPSTREAM_API_CALLS_TOTAL.labels(provider=provider, outcome=safe_outcome).inc()
 
 
+def record_upstream_connection(source_name: str, reused: bool):
+    provider = normalize_provider(source_name)
+    if reused:
+        UPSTREAM_HTTP_POOL_HITS_TOTAL.labels(provider=provider).inc()
+    else:
+        UPSTREAM_HTTP_NEW_CONNECTIONS_TOTAL.labels(provider=provider).inc()
+
+
+def record_search_cache(source_name: str, result: str):
+    provider = normalize_provider(source_name)
+    LOOKUP_SEARCH_CACHE_TOTAL.labels(provider=provider, result=result).inc()
+
+
+def record_review_list_cache(result: str):
+    REVIEW_LIST_CACHE_TOTAL.labels(result=result).inc()
+
+
+def record_coalesced_wait(source_name: str, scope: str):
+    provider = normalize_provider(source_name)
+    UPSTREAM_COALESCED_WAITS_TOTAL.labels(provider=provider, scope=scope).inc()
+
+
+def record_circuit_state(source_name: str, state: str):
+    provider = normalize_provider(source_name)
+    UPSTREAM_CIRCUIT_STATE.labels(provider=provider).set(CIRCUIT_STATE_VALUES.get(state, 0))
+
+
+def record_upstream_allowed_rate(source_name: str, rate: float):
+    provider = normalize_provider(source_name)
+    UPSTREAM_ALLOWED_RATE.labels(provider=provider).set(max(rate, 0.0))
+
+
+def record_federated_search_provider(source_name: str, status: str):
+    provider = normalize_provider(source_name)
+    LOOKUP_FEDERATED_PROVIDER_TOTAL.labels(provider=provider, status=status).inc()
+
+
+def record_item_revalidation(source_name: str, result: str):
+    provider = normalize_provider(source_name)
+    LOOKUP_ITEM_REVALIDATIONS_TOTAL.labels(provider=provider, result=result).inc()
+
+
+def record_refresh_provider_latency(source_name: str, latency_seconds: float):
+    provider = normalize_provider(source_name)
+    REFRESH_PROVIDER_LATENCY_SECONDS.labels(provider=provider).observe(max(latency_seconds, 0))
+
+
+def record_refresh_daemon_iteration(
+    *,
+    provider_totals: Dict[str, Dict[str, int]],
+    processed: int,
+    duration_seconds: float,
+    queue_depth: Optional[int],
+):
+    for provider, totals in provider_totals.items():
+        safe_provider = normalize_provider(provider)
+        for result, count in totals.items():
+            if count:
+                REFRESH_ITEMS_TOTAL.labels(provider=safe_provider, result=result).inc(count)
+    REFRESH_ITEMS_PER_SECOND.set(processed / duration_seconds if duration_seconds > 0 else 0.0)
+    if queue_depth is not None:
+        REFRESH_QUEUE_DEPTH.set(queue_depth)
+
+
+def start_metrics_server(port: int):
+    """Serve the default registry over HTTP on ``port`` from a daemon thread; returns the server."""
+    server, _ = start_http_server(port)
+    return server
+
+
 def metrics_http_response() -> HttpResponse:
     payload = generate_latest(REGISTRY)
     return HttpResponse(payload, content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,51 @@
+"""
+Client-side rate limiting for upstream providers.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing ``rate`` acquisitions per second.
+
+    ``capacity`` bounds the burst after an idle period. A rate of ``None`` or
+    ``<= 0`` disables limiting.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        capacity: float=1.0,
+        clock: Callable[[], float]=time.monotonic,
+        sleep: Callable[[float], None]=time.sleep,
+    ):
+        self.rate = rate if rate and rate > 0 else None
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        """Take a token and return 0, or return how long to wait for one."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        if self.rate is None:
+            return
+        while True:
+            wait_seconds = self._take()
+            if not wait_seconds:
+                return
+            self._sleep(wait_seconds)
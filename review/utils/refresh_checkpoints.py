@@ -0,0 +1,35 @@
+"""
+Checkpoints for time-limited ``refresh_review_items`` runs.
+
+A run stopped by ``--max-duration`` records the items it claimed but did not
+reach; the next run with the same checkpoint name resumes those first.
+Parallel workers share a checkpoint, so updates merge rather than overwrite.
+"""
+
+from typing import Iterable
+
+from django.db import transaction
+
+from review.models import RefreshCheckpoint
+
+
+def pending_item_ids(name: str) -> list[str]:
+    checkpoint = RefreshCheckpoint.objects.filter(name=name).first()
+    return list(checkpoint.item_ids) if checkpoint else []
+
+
+def update(name: str, done_ids: Iterable[str], remaining_ids: Iterable[str]):
+    """Drop ``done_ids`` from checkpoint ``name`` and append ``remaining_ids``."""
+    done_ids = set(done_ids)
+    remaining_ids = [item_id for item_id in remaining_ids if item_id not in done_ids]
+    with transaction.atomic():
+        checkpoint = RefreshCheckpoint.objects.select_for_update().filter(name=name).first()
+        if checkpoint is None:
+            if not remaining_ids:
+                return
+            checkpoint = RefreshCheckpoint(name=name)
+        item_ids = [item_id for item_id in checkpoint.item_ids if item_id not in done_ids]
+        item_ids += [item_id for item_id in remaining_ids if item_id not in item_ids]
+        if checkpoint._state.adding or item_ids != checkpoint.item_ids:
+            checkpoint.item_ids = item_ids
+            checkpoint.save()
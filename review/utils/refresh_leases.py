@@ -0,0 +1,61 @@
+"""
+Lease-based claiming of ReviewItem rows for parallel refresh workers.
+
+A worker claims a batch by stamping ``refresh_lease_owner`` and
+``refresh_lease_expires_at`` on rows whose lease is free or expired. On
+Postgres the candidate rows are locked with ``FOR UPDATE SKIP LOCKED`` so
+concurrent workers skip each other's batch instead of queueing behind it; on
+databases without row locks (SQLite) the conditional UPDATE alone keeps
+claims disjoint. A crashed worker's leases simply expire and are reclaimed.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from review.models import ReviewItem
+
+
+def make_owner_id() -> str:
+    return '{}:{}:{}'.format(socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])[-64:]
+
+
+def lease_is_free(now: datetime) -> Q:
+    return Q(refresh_lease_expires_at__isnull=True) | Q(refresh_lease_expires_at__lte=now)
+
+
+def claim_items(
+    queryset: QuerySet,
+    limit: int,
+    owner: str,
+    lease_seconds: float,
+    now: Optional[datetime]=None,
+) -> list[ReviewItem]:
+    """Lease up to ``limit`` rows of ``queryset`` (in its ordering) to ``owner`` and return them."""
+    now = now or timezone.now()
+    candidates = queryset.filter(lease_is_free(now))
+    with transaction.atomic(using=queryset.db):
+        if connections[queryset.db].features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        item_ids = list(candidates.values_list('pk', flat=True)[:limit])
+        if item_ids:
+            ReviewItem.objects.using(queryset.db).filter(lease_is_free(now), pk__in=item_ids).update(
+                refresh_lease_owner=owner,
+                refresh_lease_expires_at=now + timedelta(seconds=lease_seconds),
+            )
+    claimed = ReviewItem.objects.using(queryset.db).filter(pk__in=item_ids, refresh_lease_owner=owner)
+    return list(claimed.order_by(*queryset.query.order_by))
+
+
+def release_items(owner: str, using: str='default') -> int:
+    """Release every lease still held by ``owner``."""
+    return ReviewItem.objects.using(using).filter(refresh_lease_owner=owner).update(
+        refresh_lease_owner='',
+        refresh_lease_expires_at=None,
+    )
@@ -0,0 +1,147 @@
+"""
+Priority scheduling for ``refresh_review_items``.
+
+Stale items are ranked by how much users see them: review count, recent
+item lookups and how far past the staleness threshold they are. Only a
+bounded candidate pool (the top of each signal) is scored, so ranking stays
+cheap on large tables.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, Count, F, IntegerField, QuerySet, Value, When
+from django.utils import timezone
+
+from review.models import ReviewItem
+
+HIT_CACHE_ALIAS = 'default'
+DEFAULT_WEIGHTS = {'reviews': 1.0, 'hits': 1.0, 'staleness': 1.0}
+DEFAULT_HIT_WINDOW_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_HIT_FLUSH_SECONDS = 300
+# Candidates taken from the top of each signal, per item to refresh.
+POOL_FACTOR = 4
+# Staleness stops adding priority past this multiple of the threshold.
+MAX_STALENESS_RATIO = 4.0
+
+
+def _hit_window() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'REFRESH_PRIORITY_HIT_WINDOW_SECONDS', DEFAULT_HIT_WINDOW_SECONDS))
+
+
+def record_lookup_hit(item_id: str, now: Optional[datetime]=None):
+    """
+    Count one lookup of a stored item.
+
+    Hits accumulate in the cache and are written to the row at most once per
+    ``REFRESH_PRIORITY_HIT_FLUSH_SECONDS`` per item. The stored count starts
+    over once an item goes a full hit window without lookups.
+    """
+    cache = caches[HIT_CACHE_ALIAS]
+    flush_seconds = getattr(settings, 'REFRESH_PRIORITY_HIT_FLUSH_SECONDS', DEFAULT_HIT_FLUSH_SECONDS)
+    pending_key = 'item_hits:{}'.format(item_id)
+    pending_ttl = max(flush_seconds * 4, 60)
+    cache.add(pending_key, 0, pending_ttl)
+    try:
+        cache.incr(pending_key)
+    except ValueError:
+        # The key expired between add() and incr().
+        cache.set(pending_key, 1, pending_ttl)
+    if flush_seconds > 0 and not cache.add('item_hits_flush:{}'.format(item_id), 1, flush_seconds):
+        return
+
+    hits = cache.get(pending_key, 0)
+    if not hits:
+        return
+    try:
+        cache.decr(pending_key, hits)
+    except ValueError:
+        pass
+    now = now or timezone.now()
+    ReviewItem.objects.filter(item_id=item_id).update(
+        lookup_hit_count=Case(
+            When(last_lookup_hit_at__gte=now - _hit_window(), then=F('lookup_hit_count') + hits),
+            default=Value(hits),
+            output_field=IntegerField(),
+        ),
+        last_lookup_hit_at=now,
+    )
+
+
+def priority_score(
+    review_count: int,
+    recent_hits: int,
+    last_refreshed_at: Optional[datetime],
+    stale_after: timedelta,
+    now: datetime,
+    weights: Optional[dict]=None,
+) -> float:
+    """Higher scores are refreshed first; review and hit counts are log-scaled."""
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    if last_refreshed_at is None or stale_after <= timedelta(0):
+        staleness = MAX_STALENESS_RATIO
+    else:
+        staleness = min((now - last_refreshed_at) / stale_after, MAX_STALENESS_RATIO)
+    return (
+        weights['reviews'] * math.log1p(review_count)
+        + weights['hits'] * math.log1p(recent_hits)
+        + weights['staleness'] * staleness
+    )
+
+
+def rank_items(queryset: QuerySet, limit: int, stale_after: timedelta, now: Optional[datetime]=None) -> list[str]:
+    """Return the primary keys of ``queryset`` candidates, highest priority first."""
+    now = now or timezone.now()
+    pool = limit * POOL_FACTOR
+    hit_window_start = now - _hit_window()
+    candidate_ids = set()
+    candidate_ids.update(
+        queryset.order_by(F('last_refreshed_at').asc(nulls_first=True), 'item_id').values_list('pk', flat=True)[:pool]
+    )
+    candidate_ids.update(
+        queryset.annotate(review_count=Count('review'))
+        .filter(review_count__gt=0)
+        .order_by('-review_count', 'item_id')
+        .values_list('pk', flat=True)[:pool]
+    )
+    candidate_ids.update(
+        queryset.filter(lookup_hit_count__gt=0, last_lookup_hit_at__gte=hit_window_start)
+        .order_by('-lookup_hit_count', 'item_id')
+        .values_list('pk', flat=True)[:pool]
+    )
+
+    weights = getattr(settings, 'REFRESH_PRIORITY_WEIGHTS', DEFAULT_WEIGHTS)
+    rows = (
+        ReviewItem.objects.filter(pk__in=candidate_ids)
+        .annotate(review_count=Count('review'))
+        .values('item_id', 'last_refreshed_at', 'lookup_hit_count', 'last_lookup_hit_at', 'review_count')
+    )
+    scored = []
+    for row in rows:
+        recent_hits = row['lookup_hit_count'] if (
+            row['last_lookup_hit_at'] is not None and row['last_lookup_hit_at'] >= hit_window_start
+        ) else 0
+        score = priority_score(row['review_count'], recent_hits, row['last_refreshed_at'], stale_after, now, weights)
+        oldest_first = row['last_refreshed_at'].timestamp() if row['last_refreshed_at'] else float('-inf')
+        scored.append((-score, oldest_first, row['item_id']))
+    return [item_id for _, _, item_id in sorted(scored)]
+
+
+def in_rank_order(queryset: QuerySet, item_ids: Iterable[str]) -> QuerySet:
+    """
+    ``queryset`` narrowed to ``item_ids`` and ordered as given.
+
+    Keeps ``queryset``'s filters, so rows that stopped matching them after
+    ranking (refreshed, backed off or tombstoned meanwhile) drop out.
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return queryset.none()
+    rank = Case(
+        *[When(pk=item_id, then=Value(position)) for position, item_id in enumerate(item_ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=item_ids).order_by(rank, 'pk')
@@ -0,0 +1,109 @@
+"""
+Total counts for the v2 review list.
+
+``include_count`` picks how ``meta.pagination.count`` is produced:
+
+- ``true`` (default): exact. Cached per filter combination and per version
+  stamps of the list's scopes (see review_versions), so the review write or
+  item text/category change that changes a list's ETag also retires its count,
+  whichever process made it.
+- ``estimate``: PostgreSQL planner estimate for broad filters; elsewhere the
+  last exact count seen for the filters, even if writes happened since.
+  Falls back to an exact count when there is nothing to estimate from.
+- ``false``: no count query at all.
+
+Writes that bypass the signals without calling ``review_versions.bump()``
+are picked up once cached counts expire after ``REVIEW_COUNT_CACHE_TTL_SECONDS``.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import QuerySet
+
+from . import review_versions
+
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATED = 'estimated'
+COUNT_OMITTED = 'omitted'
+
+COUNT_CACHE_ALIAS = 'default'
+DEFAULT_CACHE_TTL_SECONDS = 300
+# Last-known counts back estimates on databases without planner statistics.
+LAST_KNOWN_TTL_SECONDS = 24 * 60 * 60
+# Planner estimates below this are replaced by an exact count.
+DEFAULT_ESTIMATE_MIN_ROWS = 1000
+
+_OMIT_VALUES = ('false', '0', 'no', 'off')
+_ESTIMATE_VALUES = ('estimate', 'estimated')
+
+
+def parse_count_mode(value: Optional[str]) -> str:
+    value = (value or '').strip().lower()
+    if value in _OMIT_VALUES:
+        return COUNT_OMITTED
+    if value in _ESTIMATE_VALUES:
+        return COUNT_ESTIMATED
+    return COUNT_EXACT
+
+
+def _cache():
+    return caches[COUNT_CACHE_ALIAS]
+
+
+def _digest(filters: dict) -> str:
+    payload = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _planner_estimate(queryset: QuerySet) -> Optional[int]:
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_reviews(
+    queryset: QuerySet, filters: dict, scopes, mode: str=COUNT_EXACT,
+) -> tuple[Optional[int], str]:
+    """
+    Return ``(count, count_type)`` for ``queryset``, the list filtered by ``filters``.
+
+    ``filters`` must identify the queryset's rows (not its ordering) and
+    ``scopes`` the version scopes they depend on; together they are the cache key.
+    """
+    if mode == COUNT_OMITTED:
+        return None, COUNT_OMITTED
+
+    cache = _cache()
+    digest = _digest(filters)
+    versions, _ = review_versions.stamps(scopes)
+    exact_key = 'review_count:{}:{}'.format(_digest(dict(zip(scopes, versions))), digest)
+    last_known_key = 'review_count_last:{}'.format(digest)
+    count = cache.get(exact_key)
+    if count is not None:
+        return count, COUNT_EXACT
+
+    if mode == COUNT_ESTIMATED:
+        estimate = _planner_estimate(queryset)
+        if estimate is not None and estimate >= getattr(settings, 'REVIEW_COUNT_ESTIMATE_MIN_ROWS', DEFAULT_ESTIMATE_MIN_ROWS):
+            return estimate, COUNT_ESTIMATED
+        if estimate is None:
+            last_known = cache.get(last_known_key)
+            if last_known is not None:
+                return last_known, COUNT_ESTIMATED
+
+    count = queryset.count()
+    cache.set(exact_key, count, getattr(settings, 'REVIEW_COUNT_CACHE_TTL_SECONDS', DEFAULT_CACHE_TTL_SECONDS))
+    cache.set(last_known_key, count, LAST_KNOWN_TTL_SECONDS)
+    return count, COUNT_EXACT
@@ -0,0 +1,49 @@
+"""
+Response cache for anonymous v2 review list requests.
+
+Entries are keyed by the response's ETag, which is derived from the version
+stamps of the scopes the list depends on (all reviews or one user's reviews,
+items, usernames; see review_versions) and the normalized query string. Once
+a review create, update or delete commits, it bumps its global and per-user
+stamps, so the next request for an affected list computes a new key and
+misses; a request under the new key can only read the committed rows. Nothing is
+ever served stale; superseded entries simply expire after
+``REVIEW_LIST_CACHE_TTL_SECONDS``.
+
+Entries live in the ``review_list`` cache alias: LocMemCache or FileBasedCache
+in dev/test, a shared backend in production.
+"""
+
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+LIST_CACHE_ALIAS = 'review_list'
+DEFAULT_TTL_SECONDS = 60
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+
+
+def _ttl() -> int:
+    return getattr(settings, 'REVIEW_LIST_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+
+
+def cacheable(request) -> bool:
+    return _ttl() > 0 and not request.user.is_authenticated
+
+
+def _key(etag: str) -> str:
+    return 'response:{}'.format(etag.removeprefix('W/').strip('"'))
+
+
+def get(etag: str) -> Optional[dict]:
+    data = caches[LIST_CACHE_ALIAS].get(_key(etag))
+    metrics.record_review_list_cache(CACHE_MISS if data is None else CACHE_HIT)
+    return data
+
+
+def store(etag: str, data: dict):
+    caches[LIST_CACHE_ALIAS].set(_key(etag), data, _ttl())
@@ -0,0 +1,219 @@
+"""
+Fast serialization for list responses.
+
+A ``RowMapper`` compiles a ModelSerializer once into a ``values()`` projection
+(joined relations included) plus one converter per column. A page is then read
+with a single query and turned into plain dicts without building model
+instances or dispatching through DRF fields per row. The output is the same
+JSON shape the serializer produces: same keys, order, nesting and value
+formats (decimals, dates and datetimes go through the serializer's own fields).
+
+Serializers with fields that cannot be read from a column (method fields,
+related-field serializers, ``source='*'``) are not compiled; ``mapper_for``
+returns None for them and callers keep using the serializer.
+
+Sparse fieldsets: a *selection* (see ``select_fields``) limits the output to
+some fields, and the projection to their columns. *Excerpts* cut long text
+fields in the database so only the first characters are transferred.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.db.models.functions import Substr
+from rest_framework import serializers
+
+# Fields whose to_representation() is the identity for values read from the database.
+_PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.URLField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+_UNSUPPORTED_FIELDS = (
+    serializers.SerializerMethodField,
+    serializers.RelatedField,
+    serializers.ManyRelatedField,
+    serializers.HiddenField,
+)
+_EXCERPT_SUFFIX = '_excerpt'
+_ELLIPSIS = '…'
+
+
+class UnsupportedSerializer(TypeError):
+    pass
+
+
+class InvalidFields(ValueError):
+    def __init__(self, param: str, message: str):
+        super().__init__(message)
+        self.param = param
+
+
+def excerpt(text: str, length: int) -> str:
+    """``text`` cut to at most ``length`` characters, preferably at a word break, with an ellipsis."""
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    space = cut.rfind(' ')
+    if space > length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + _ELLIPSIS
+
+
+def _is_nested(field) -> bool:
+    return isinstance(field, serializers.BaseSerializer)
+
+
+def select_fields(serializer_class, fields: str, expand: str='', summaries: Optional[dict]=None) -> Optional[tuple]:
+    """
+    Parse ``fields``/``expand`` query values into a selection of ``serializer_class`` output.
+
+    ``fields`` lists output names, with ``parent.child`` for fields of a nested
+    serializer. A nested serializer listed by name alone renders its
+    ``summaries`` fields unless it is also in ``expand``. Returns None (every
+    field) when ``fields`` is empty, otherwise ``((name, nested), ...)`` in
+    serializer order, ``nested`` being None for all of a nested serializer's
+    fields. Raises InvalidFields for unknown names.
+    """
+    summaries = summaries or {}
+    available = {field.field_name: field for field in serializer_class()._readable_fields}
+    expanded = set()
+    for name in _split(expand):
+        if not _is_nested(available.get(name)):
+            raise InvalidFields('expand', 'Cannot expand {!r}.'.format(name))
+        expanded.add(name)
+    requested = _split(fields)
+    if not requested:
+        return None
+
+    chosen = {}
+    for token in requested:
+        name, _, child = token.partition('.')
+        field = available.get(name)
+        if field is None or (child and (not _is_nested(field) or child not in _readable_names(field))):
+            raise InvalidFields('fields', 'Unknown field {!r}.'.format(token))
+        nested = chosen.setdefault(name, set())
+        if _is_nested(field):
+            if child:
+                nested.add(child)
+            elif name in expanded or name not in summaries:
+                nested.add(None)
+            else:
+                nested.update(summaries[name])
+
+    selection = []
+    for name, field in available.items():
+        if name not in chosen:
+            continue
+        nested = None
+        if _is_nested(field) and None not in chosen[name]:
+            nested = tuple(child for child in _readable_names(field) if child in chosen[name])
+        selection.append((name, nested))
+    return tuple(selection)
+
+
+def _split(value: str) -> list:
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _readable_names(serializer) -> list:
+    return [field.field_name for field in serializer._readable_fields]
+
+
+def prune_serializer(serializer, selection: Optional[tuple]):
+    """Drop fields outside ``selection`` from ``serializer`` (or its child, for many=True)."""
+    if selection is None:
+        return serializer
+    target = getattr(serializer, 'child', serializer)
+    wanted = dict(selection)
+    for name in list(target.fields):
+        if name not in wanted:
+            target.fields.pop(name)
+        elif wanted[name] is not None:
+            nested = target.fields[name]
+            for child in list(nested.fields):
+                if child not in wanted[name]:
+                    nested.fields.pop(child)
+    return serializer
+
+
+class RowMapper:
+    def __init__(self, serializer_class, selection: Optional[tuple]=None, excerpts: tuple=()):
+        self.paths = []
+        self.expressions = {}
+        self._excerpts = dict(excerpts)
+        self._plan = self._compile(serializer_class(), '', None if selection is None else dict(selection))
+
+    def _add_path(self, path: str) -> str:
+        if path not in self.paths:
+            self.paths.append(path)
+        return path
+
+    def _compile(self, serializer, prefix: str, selection: Optional[dict]) -> list:
+        plan = []
+        for field in serializer._readable_fields:
+            if selection is not None and field.field_name not in selection:
+                continue
+            if field.source == '*' or isinstance(field, _UNSUPPORTED_FIELDS):
+                raise UnsupportedSerializer('Cannot read {!r} from a column.'.format(field.field_name))
+            path = prefix + '__'.join(field.source_attrs)
+            if _is_nested(field):
+                if not isinstance(field, serializers.ModelSerializer):
+                    raise UnsupportedSerializer('Cannot read {!r} from a column.'.format(field.field_name))
+                nested_fields = None if selection is None else selection[field.field_name]
+                nested_selection = None if nested_fields is None else dict.fromkeys(nested_fields)
+                # The foreign key column tells a missing relation (null) from an empty one.
+                plan.append((field.field_name, self._add_path(path), None, self._compile(field, path + '__', nested_selection)))
+                continue
+            convert = None if type(field) in _PASSTHROUGH_FIELDS else field.to_representation
+            if not prefix and field.field_name in self._excerpts:
+                length = self._excerpts[field.field_name]
+                alias = path + _EXCERPT_SUFFIX
+                # One character past the limit tells whether the text was cut.
+                self.expressions[alias] = Substr(path, 1, length + 1)
+                plan.append((field.field_name, alias, lambda text, length=length: excerpt(text, length), None))
+                continue
+            plan.append((field.field_name, self._add_path(path), convert, None))
+        return plan
+
+    def project(self, queryset):
+        """``queryset`` as the rows this mapper reads (dicts from values())."""
+        return queryset.values(*self.paths, **self.expressions)
+
+    def _to_dict(self, plan: list, row: dict) -> dict:
+        data = {}
+        for key, path, convert, nested in plan:
+            value = row[path]
+            if value is None:
+                data[key] = None
+            elif nested is not None:
+                data[key] = self._to_dict(nested, row)
+            else:
+                data[key] = value if convert is None else convert(value)
+        return data
+
+    def to_representation(self, rows) -> list[dict]:
+        plan = self._plan
+        return [self._to_dict(plan, row) for row in rows]
+
+
+@lru_cache(maxsize=256)
+def compiled(serializer_class, selection: Optional[tuple]=None, excerpts: tuple=()) -> Optional[RowMapper]:
+    """The compiled mapper, or None when the serializer cannot be read from columns."""
+    try:
+        return RowMapper(serializer_class, selection, excerpts)
+    except UnsupportedSerializer:
+        return None
+
+
+def mapper_for(serializer_class, selection: Optional[tuple]=None, excerpts: tuple=()) -> Optional[RowMapper]:
+    """
+    The mapper for ``serializer_class`` restricted to ``selection``, or None to fall back to the serializer.
+
+    ``excerpts`` is ``((field name, length), ...)`` for top-level text fields to cut with ``excerpt()``.
+    """
+    if not getattr(settings, 'REVIEW_LIST_FAST_SERIALIZATION', True):
+        return None
+    return compiled(serializer_class, selection, excerpts)
@@ -0,0 +1,127 @@
+"""
+Full-text search for the review list query.
+
+Each review has a search document built from its item's title, its tags,
+the item's attributes and year, and the item's description, weighted in that
+order. Database triggers keep the document current on every write, including
+bulk item updates (see migration 0011_review_search):
+
+- PostgreSQL: a ``tsvector`` column on ``review_review`` behind a GIN index.
+- SQLite: an FTS5 table keyed by review id, for dev and tests.
+
+Query words match as prefixes of document words and must all be present.
+Other databases, SQLite builds without FTS5 and ``REVIEW_SEARCH_BACKEND =
+'like'`` use the original ``icontains`` scan.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+BACKEND_POSTGRES = 'postgres'
+BACKEND_FTS5 = 'fts5'
+BACKEND_LIKE = 'like'
+
+FTS5_TABLE = 'review_review_fts'
+# Relevance weight of a query word found in each FTS5 column.
+FTS5_WEIGHTS = (('title', 8.0), ('tags', 4.0), ('attrs', 2.0), ('description', 1.0))
+# Must match the configuration the migration's trigger builds documents with.
+POSTGRES_CONFIG = 'simple'
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_fts5_tables = {}
+
+
+def search_terms(query: str) -> list[str]:
+    """Lower-cased word tokens of ``query``; punctuation splits words like the indexers do."""
+    return [term.lower() for term in _WORD_RE.findall(query or '')]
+
+
+def _fts5_available(connection) -> bool:
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _fts5_tables:
+        with connection.cursor() as cursor:
+            _fts5_tables[key] = FTS5_TABLE in connection.introspection.table_names(cursor)
+    return _fts5_tables[key]
+
+
+def backend_for(using: str='default') -> str:
+    if getattr(settings, 'REVIEW_SEARCH_BACKEND', 'auto') == BACKEND_LIKE:
+        return BACKEND_LIKE
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return BACKEND_POSTGRES
+    if connection.vendor == 'sqlite' and _fts5_available(connection):
+        return BACKEND_FTS5
+    return BACKEND_LIKE
+
+
+def _like_filter(query: str) -> Q:
+    query_obj = Q()
+    for word in query.split():
+        word_query_obj = Q(review_item__title__icontains=word)
+        word_query_obj |= Q(review_tags__icontains=word)
+        word_query_obj |= Q(review_item__description__icontains=word)
+        word_query_obj |= Q(review_item__attr1__icontains=word)
+        word_query_obj |= Q(review_item__attr2__icontains=word)
+        word_query_obj |= Q(review_item__year__icontains=word)
+        word_query_obj |= Q(review_item__attr3__icontains=word)
+        query_obj &= word_query_obj
+    return query_obj
+
+
+def _postgres_tsquery(terms: list[str]) -> str:
+    return ' & '.join("'{}':*".format(term) for term in terms)
+
+
+def _fts5_match(terms: list[str]) -> str:
+    return ' AND '.join('"{}"*'.format(term) for term in terms)
+
+
+def apply_search(reviews: QuerySet, query: str, rank: bool=False) -> QuerySet:
+    """
+    Filter ``reviews`` to those matching every word of ``query``.
+
+    With ``rank``, matches are annotated with ``search_rank`` (higher is more
+    relevant). The LIKE backend has no ranking and annotates nothing.
+    """
+    backend = backend_for(reviews.db)
+    if backend == BACKEND_LIKE:
+        return reviews.filter(_like_filter(query)) if query.split() else reviews
+    terms = search_terms(query)
+    if not terms:
+        return reviews.none() if query.strip() else reviews
+
+    table = reviews.model._meta.db_table
+    if backend == BACKEND_POSTGRES:
+        tsquery = _postgres_tsquery(terms)
+        reviews = reviews.filter(RawSQL(
+            '"{}"."search_vector" @@ to_tsquery(%s::regconfig, %s)'.format(table),
+            [POSTGRES_CONFIG, tsquery],
+            output_field=BooleanField(),
+        ))
+        if rank:
+            reviews = reviews.annotate(search_rank=RawSQL(
+                'ts_rank("{}"."search_vector", to_tsquery(%s::regconfig, %s))'.format(table),
+                [POSTGRES_CONFIG, tsquery],
+                output_field=FloatField(),
+            ))
+        return reviews
+
+    match = _fts5_match(terms)
+    reviews = reviews.filter(pk__in=RawSQL(
+        'SELECT rowid FROM {0} WHERE {0} MATCH %s'.format(FTS5_TABLE), [match],
+    ))
+    if rank:
+        # A correlated bm25() lookup re-reads every matching doclist per row,
+        # so score per column instead: each IN subquery is evaluated once.
+        scores, params = [], []
+        for column, weight in FTS5_WEIGHTS:
+            for term in terms:
+                scores.append('{0} * ("{1}"."id" IN (SELECT rowid FROM {2} WHERE {2} MATCH %s))'.format(weight, table, FTS5_TABLE))
+                params.append('{} : "{}"*'.format(column, term))
+        reviews = reviews.annotate(search_rank=RawSQL('({})'.format(' + '.join(scores)), params, output_field=FloatField()))
+    return reviews
@@ -1,16 +1,40 @@
-from django.db.models import Q
+from django.db.models import F
+from django.db.models.functions import Lower
 from typing import Optional
 from review.serializers import ReviewSerializer
 from review.models import Review
+from review.utils import review_search, trigram_search
 
-ORDERING_DICT = {
-    'alpha': 'review_item__title',
-    '-alpha': '-review_item__title',
-    'rating': 'review_rating',
-    '-rating': '-review_rating',
-    'date': 'modified_date',
-    '-date': '-modified_date',
+MATCH_FUZZY = 'fuzzy'
+
+# Sort keys per ordering as (name, expression, descending), most significant
+# first. Each ends in id, so the order is total and cursor pagination can
+# resume after any row.
+_ID = ('id', F('id'))
+ORDERING_KEYS = {
+    'alpha': (('title_lower', Lower('review_item__title'), False), ('title', F('review_item__title'), False), (*_ID, False)),
+    '-alpha': (('title_lower', Lower('review_item__title'), True), ('title', F('review_item__title'), True), (*_ID, True)),
+    'rating': (('review_rating', F('review_rating'), False), (*_ID, False)),
+    '-rating': (('review_rating', F('review_rating'), True), (*_ID, True)),
+    'date': (('modified_date', F('modified_date'), False), (*_ID, False)),
+    '-date': (('modified_date', F('modified_date'), True), (*_ID, True)),
+    # Most relevant first when searching; newest first without a query or search ranking.
+    'relevance': (('search_rank', F('search_rank'), True), ('modified_date', F('modified_date'), True), (*_ID, True)),
 }
+RELEVANCE_FALLBACK_KEYS = (('modified_date', F('modified_date'), True), (*_ID, True))
+# Unordered requests keep the database's order under limit/offset; cursors need a total order.
+DEFAULT_CURSOR_KEYS = ((*_ID, False),)
+
+
+def order_by_args(keys) -> list:
+    return [expression.desc() if descending else expression.asc() for _, expression, descending in keys]
+
+
+def ordering_keys(reviews, ordering: str):
+    """Sort keys for ``ordering`` on ``reviews`` (as returned by get_filtered_review_objects), or None."""
+    if ordering == 'relevance' and 'search_rank' not in reviews.query.annotations:
+        return RELEVANCE_FALLBACK_KEYS
+    return ORDERING_KEYS.get(ordering)
 
 
 def _normalize_categories(values: Optional[list]) -> list:
@@ -33,22 +57,10 @@ def get_filtered_review_objects(
     categories: list=None,
     exclude_categories: list=None,
     item_id: str='',
+    match: str='',
 ) -> list[Review]:
-    query_obj = None
-    for word in query.split():
-        word_query_obj = Q(review_item__title__icontains=word)
-        word_query_obj |= Q(review_tags__icontains=word)
-        word_query_obj |= Q(review_item__description__icontains=word)
-        word_query_obj |= Q(review_item__attr1__icontains=word)
-        word_query_obj |= Q(review_item__attr2__icontains=word)
-        word_query_obj |= Q(review_item__year__icontains=word)
-        word_query_obj |= Q(review_item__attr3__icontains=word)
-        if query_obj is None:
-            query_obj = word_query_obj
-        else:
-            query_obj &= word_query_obj
-
-    reviews = Review.objects.filter(query_obj) if query_obj else Review.objects.all()
+    search = trigram_search.apply_fuzzy_search if match == MATCH_FUZZY else review_search.apply_search
+    reviews = search(Review.objects.all(), query, rank=(ordering == 'relevance'))
 
     if username:
         reviews = reviews.filter(user__username=username)
@@ -69,13 +81,12 @@ def get_filtered_review_objects(
     if explicit_exclude_categories:
         reviews = reviews.exclude(review_item__category__in=explicit_exclude_categories)
 
-    ordering = ORDERING_DICT.get(ordering, '')
-    if ordering in ('review_item__title', '-review_item__title'):
-        reviews = list(reviews.select_related('review_item'))
-        reviews.sort(key=lambda review: review.review_item.title, reverse=ordering.startswith('-'))
-        return reviews
-    if ordering:
-        reviews = reviews.order_by(ordering)
+    if ordering in ('alpha', '-alpha'):
+        # Served by the lower(title) index on ReviewItem.
+        reviews = reviews.select_related('review_item')
+    keys = ordering_keys(reviews, ordering)
+    if keys:
+        reviews = reviews.order_by(*order_by_args(keys))
     return reviews
 
 def convert_reviews_to_json(reviews: list) -> dict:
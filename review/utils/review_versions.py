@@ -0,0 +1,113 @@
+"""
+Version stamps behind ETag/Last-Modified on the v2 review endpoints.
+
+Writes bump per-scope counters in the ``shared`` cache and record when they
+happened. Web workers, the refresh CronJob and the refresh daemon all write
+there, so a bump in one process invalidates validators served by every other:
+
+- ``reviews``: any review write
+- ``user:<username>``: a write to one of that user's reviews
+- ``review:<pk>``: a write to that review
+- ``items``: a review item write visible in list output
+- ``users``: a username change (or a review write whose user is unknown)
+
+A response's validators are derived from the stamps of the scopes it depends
+on plus everything else that shapes its body (query string, media type), so
+checking them costs one cache round trip and no review queries.
+
+The signal handlers bump on transaction commit, never before the rows they
+describe are visible. Writes through update() or raw SQL bypass the signals; code doing them calls
+``bump()`` itself (see the refresh command's bulk updates).
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import caches
+
+SCOPE_REVIEWS = 'reviews'
+SCOPE_ITEMS = 'items'
+SCOPE_USERS = 'users'
+
+VERSION_CACHE_ALIAS = 'shared'
+_VERSION_PREFIX = 'review_version:'
+_CHANGED_AT_PREFIX = 'review_version_at:'
+_CLOCK_KEY = 'review_version_clock'
+
+
+def user_scope(username: str) -> str:
+    return 'user:{}'.format(username)
+
+
+def review_scope(pk) -> str:
+    return 'review:{}'.format(pk)
+
+
+def _cache():
+    return caches[VERSION_CACHE_ALIAS]
+
+
+def _incr(cache, key: str, initial: int) -> int:
+    cache.add(key, initial, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The key was evicted between add() and incr().
+        cache.set(key, initial + 1, None)
+        return initial + 1
+
+
+def _change_time(cache) -> int:
+    """
+    Unix time to record a change at, later than every change recorded before.
+
+    Last-Modified has one-second resolution; a second write within the same
+    second gets the next second, so If-Modified-Since never hides it.
+    """
+    now = int(time.time())
+    changed_at = _incr(cache, _CLOCK_KEY, now - 1)
+    if changed_at < now:
+        cache.set(_CLOCK_KEY, now, None)
+        changed_at = now
+    return changed_at
+
+
+def bump(*scopes: str):
+    cache = _cache()
+    for scope in scopes:
+        _incr(cache, _VERSION_PREFIX + scope, 0)
+    changed_at = _change_time(cache)
+    cache.set_many({_CHANGED_AT_PREFIX + scope: changed_at for scope in scopes}, None)
+
+
+def stamps(scopes) -> tuple[list, int]:
+    """``(versions, last_modified)`` for ``scopes``; last_modified is a Unix timestamp."""
+    cache = _cache()
+    keys = [_VERSION_PREFIX + scope for scope in scopes] + [_CHANGED_AT_PREFIX + scope for scope in scopes]
+    found = cache.get_many(keys)
+    versions = [found.get(_VERSION_PREFIX + scope, 0) for scope in scopes]
+    changed_at = []
+    for scope in scopes:
+        key = _CHANGED_AT_PREFIX + scope
+        if key not in found:
+            # Unknown (never written, or evicted): start the clock now, so
+            # clients holding an older date revalidate.
+            cache.add(key, int(time.time()), None)
+            found[key] = cache.get(key)
+        changed_at.append(found[key])
+    return versions, max(changed_at)
+
+
+def validators(scopes, *representation) -> tuple[str, int]:
+    """
+    ``(etag, last_modified)`` for a response that depends on ``scopes``.
+
+    ``representation`` holds whatever else selects the body (query parameters,
+    media type); it must be JSON-serializable.
+    """
+    scopes = tuple(scopes)
+    versions, last_modified = stamps(scopes)
+    payload = json.dumps([scopes, versions, representation], sort_keys=True, default=str)
+    # Weak: equal stamps mean an equivalent body, not byte-for-byte the same one.
+    return 'W/"{}"'.format(hashlib.sha1(payload.encode('utf-8')).hexdigest()), last_modified
@@ -0,0 +1,87 @@
+"""
+Shared cache for external provider search results.
+
+Results are stored through Django's cache framework (the ``lookup`` alias), so
+dev/test runs use an in-process LocMemCache (LRU-bounded by ``MAX_ENTRIES``)
+while production can point the alias at a shared backend.
+"""
+
+import hashlib
+from typing import Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics, single_flight
+
+SEARCH_CACHE_ALIAS = 'lookup'
+DEFAULT_SEARCH_CACHE_TTL_SECONDS = 3600
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+
+
+def normalize_search_query(query: str) -> str:
+    return ' '.join((query or '').casefold().split())
+
+
+def search_cache_key(category: str, query: str) -> str:
+    digest = hashlib.sha1(normalize_search_query(query).encode('utf-8')).hexdigest()
+    return 'search:{}:{}'.format(category, digest)
+
+
+def get_search_ttl(source_name: str) -> int:
+    provider = metrics.normalize_provider(source_name)
+    ttl_by_provider = getattr(settings, 'LOOKUP_SEARCH_CACHE_TTL_SECONDS', {})
+    return int(ttl_by_provider.get(provider, DEFAULT_SEARCH_CACHE_TTL_SECONDS))
+
+
+def cached_search(category: str, source_name: str, query: str, search: Callable[[str], dict]) -> tuple[dict, str]:
+    """
+    Return ``(result, cache_status)`` for a provider search.
+
+    Only successful provider responses are cached; upstream errors always
+    fall through to the provider on the next request.
+    """
+    cache = caches[SEARCH_CACHE_ALIAS]
+    key = search_cache_key(category, query)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.record_search_cache(source_name, CACHE_HIT)
+        return cached, CACHE_HIT
+
+    metrics.record_search_cache(source_name, CACHE_MISS)
+    result, _ = single_flight.coalesce(
+        single_flight.search_key(category, normalize_search_query(query)),
+        lambda: search(query),
+        source_name=source_name,
+    )
+    ttl = get_search_ttl(source_name)
+    if result.get('response') == 'True' and ttl > 0:
+        cache.set(key, result, ttl)
+    return result, CACHE_MISS
+
+
+async def cached_search_async(
+    category: str,
+    source_name: str,
+    query: str,
+    search: Callable[[str], Awaitable[dict]],
+) -> tuple[dict, str]:
+    """asyncio counterpart of ``cached_search``."""
+    cache = caches[SEARCH_CACHE_ALIAS]
+    key = search_cache_key(category, query)
+    cached = await cache.aget(key)
+    if cached is not None:
+        metrics.record_search_cache(source_name, CACHE_HIT)
+        return cached, CACHE_HIT
+
+    metrics.record_search_cache(source_name, CACHE_MISS)
+    result, _ = await single_flight.coalesce_async(
+        single_flight.search_key(category, normalize_search_query(query)),
+        lambda: search(query),
+        source_name=source_name,
+    )
+    ttl = get_search_ttl(source_name)
+    if result.get('response') == 'True' and ttl > 0:
+        await cache.aset(key, result, ttl)
+    return result, CACHE_MISS
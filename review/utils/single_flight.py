@@ -0,0 +1,268 @@
+"""
+Single-flight coalescing of identical upstream lookups.
+
+Only one caller per key talks to the provider at a time. Inside a worker,
+concurrent callers wait for the leader's result. Across gunicorn workers and
+the refresh cronjob, callers serialize on a named lock (a Postgres advisory
+lock, or a file lock on other databases) and reuse the leader's result from
+the shared ``lookup`` cache instead of calling upstream again.
+"""
+
+import asyncio
+import copy
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from . import deadlines, metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+RESULT_CACHE_ALIAS = 'lookup'
+DEFAULT_WAIT_TIMEOUT_SECONDS = 30
+DEFAULT_RESULT_TTL_SECONDS = 15
+LOCK_POLL_INTERVAL_SECONDS = 0.05
+# File locks hash keys onto a fixed set of lock files so the lock dir stays
+# bounded; unrelated keys sharing a stripe only wait for each other briefly.
+FILE_LOCK_STRIPES = 256
+
+
+def details_key(item_id: str) -> str:
+    return 'details:{}'.format(item_id)
+
+
+def search_key(category: str, normalized_query: str) -> str:
+    return 'search:{}:{}'.format(category, normalized_query)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        wait_timeout: Optional[float]=None,
+        result_ttl: Optional[int]=None,
+        lock_dir: Optional[str]=None,
+        cross_process: Optional[bool]=None,
+    ):
+        self._wait_timeout = wait_timeout
+        self._result_ttl = result_ttl
+        self._lock_dir = lock_dir
+        self._cross_process = cross_process
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], dict], source_name: str='Upstream API') -> tuple[dict, bool]:
+        """
+        Run ``fn`` once per in-flight ``key`` and return ``(result, coalesced)``.
+
+        ``coalesced`` is True when the result came from another caller's
+        upstream request rather than from calling ``fn`` here.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            metrics.record_coalesced_wait(source_name, 'process')
+            if call.done.wait(self._get_wait_timeout()):
+                if call.exception is not None:
+                    raise call.exception
+                return copy.deepcopy(call.result), True
+            # The leader is stuck; fall back to our own upstream call.
+            return fn(), False
+
+        try:
+            call.result, coalesced = self._do_cross_process(key, fn, source_name)
+            return call.result, coalesced
+        except BaseException as ex:
+            call.exception = ex
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _do_cross_process(self, key: str, fn: Callable[[], dict], source_name: str) -> tuple[dict, bool]:
+        if not self._is_cross_process_enabled():
+            return fn(), False
+
+        cache = caches[RESULT_CACHE_ALIAS]
+        result_key = 'flight:{}'.format(hashlib.sha1(key.encode('utf-8')).hexdigest())
+        with self._named_lock(key) as waited:
+            if waited:
+                cached = cache.get(result_key)
+                if cached is not None:
+                    metrics.record_coalesced_wait(source_name, 'cross_process')
+                    return cached, True
+            result = fn()
+            if isinstance(result, dict) and result.get('response') == 'True':
+                cache.set(result_key, result, self._get_result_ttl())
+            return result, False
+
+    @contextmanager
+    def _named_lock(self, key: str):
+        """Yield True if another process held the lock and we had to wait for it."""
+        if connection.vendor == 'postgresql':
+            with self._advisory_lock(key) as waited:
+                yield waited
+        elif fcntl is not None:
+            with self._file_lock(key) as waited:
+                yield waited
+        else:
+            yield False
+
+    @contextmanager
+    def _advisory_lock(self, key: str):
+        lock_id = int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'big', signed=True)
+        deadline = time.monotonic() + self._get_wait_timeout()
+        waited = False
+        acquired = False
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [lock_id])
+                acquired = cursor.fetchone()[0]
+                if acquired or time.monotonic() >= deadline:
+                    break
+                waited = True
+                time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+        try:
+            yield waited
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id])
+
+    @contextmanager
+    def _file_lock(self, key: str):
+        lock_dir = self._get_lock_dir()
+        os.makedirs(lock_dir, exist_ok=True)
+        stripe = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16) % FILE_LOCK_STRIPES
+        lock_path = os.path.join(lock_dir, 'stripe-{:03d}.lock'.format(stripe))
+        deadline = time.monotonic() + self._get_wait_timeout()
+        waited = False
+        acquired = False
+        with open(lock_path, 'a') as lock_file:
+            while True:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        break
+                    waited = True
+                    time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+            try:
+                yield waited
+            finally:
+                if acquired:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _get_wait_timeout(self) -> float:
+        timeout = self._wait_timeout
+        if timeout is None:
+            timeout = getattr(settings, 'SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS', DEFAULT_WAIT_TIMEOUT_SECONDS)
+        deadline = deadlines.current_deadline()
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        return timeout
+
+    def _get_result_ttl(self) -> int:
+        if self._result_ttl is not None:
+            return self._result_ttl
+        return getattr(settings, 'SINGLE_FLIGHT_RESULT_TTL_SECONDS', DEFAULT_RESULT_TTL_SECONDS)
+
+    def _get_lock_dir(self) -> str:
+        if self._lock_dir:
+            return self._lock_dir
+        return getattr(settings, 'SINGLE_FLIGHT_LOCK_DIR', '') or os.path.join(tempfile.gettempdir(), 'critic-single-flight')
+
+    def _is_cross_process_enabled(self) -> bool:
+        if self._cross_process is not None:
+            return self._cross_process
+        return getattr(settings, 'SINGLE_FLIGHT_CROSS_PROCESS', True)
+
+
+class AsyncSingleFlight:
+    """
+    In-process coalescing for coroutines sharing an event loop.
+
+    Cross-process locking stays on the sync path: waiting on an advisory or
+    file lock here would block every other request on the loop.
+    """
+
+    def __init__(self, wait_timeout: Optional[float]=None):
+        self._wait_timeout = wait_timeout
+        self._calls = weakref.WeakKeyDictionary()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[dict]], source_name: str='Upstream API') -> tuple[dict, bool]:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is not None:
+            metrics.record_coalesced_wait(source_name, 'process')
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), self._get_wait_timeout())
+            except asyncio.TimeoutError:
+                return await fn(), False
+            return copy.deepcopy(result), True
+
+        future = loop.create_future()
+        calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as ex:
+            future.set_exception(ex)
+            # Mark the exception as retrieved when nobody was waiting on it.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            calls.pop(key, None)
+
+    def _get_wait_timeout(self) -> float:
+        timeout = self._wait_timeout
+        if timeout is None:
+            timeout = getattr(settings, 'SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS', DEFAULT_WAIT_TIMEOUT_SECONDS)
+        deadline = deadlines.current_deadline()
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        return timeout
+
+
+_default_flight = SingleFlight()
+_default_async_flight = AsyncSingleFlight()
+
+
+def coalesce(key: str, fn: Callable[[], dict], source_name: str='Upstream API') -> tuple[dict, bool]:
+    return _default_flight.do(key, fn, source_name=source_name)
+
+
+async def coalesce_async(key: str, fn: Callable[[], Awaitable[dict]], source_name: str='Upstream API') -> tuple[dict, bool]:
+    return await _default_async_flight.do(key, fn, source_name=source_name)
@@ -0,0 +1,207 @@
+"""
+Typo-tolerant (``match=fuzzy``) review search on item titles and review tags.
+
+A query word matches a title or tag set when enough of its trigrams appear in
+one of their words, the way pg_trgm's ``word_similarity`` works, so
+"intersteller" finds "Interstellar" and "inter" finds it too.
+
+- PostgreSQL: pg_trgm GIN indexes on both columns (migration 0012) serve the
+  ``<%`` operator; the threshold is the server's
+  ``pg_trgm.word_similarity_threshold`` (0.6 by default).
+- SQLite (dev and tests): an in-process trigram index built from the
+  database on first use. Review and item saves/deletes drop it, and it is
+  rebuilt at least every ``REVIEW_TRIGRAM_INDEX_MAX_AGE_SECONDS`` to pick up
+  bulk writes and other processes. Threshold: ``REVIEW_FUZZY_THRESHOLD``.
+- PostgreSQL without pg_trgm, and other databases: no typo tolerance; the
+  query runs as a regular ``review_search`` query and a warning is logged
+  once per process. Rebuilding a full-table index in every worker after each
+  write does not scale to production tables.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Q, QuerySet, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from review.models import Review, ReviewItem
+from review.utils import review_search
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_MAX_AGE_SECONDS = 300
+
+_logger = logging.getLogger(__name__)
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+_pg_trgm_installed = {}
+_indexes = {}
+_indexes_lock = threading.Lock()
+_warned_unavailable = set()
+
+
+def word_trigrams(word: str) -> frozenset:
+    """pg_trgm-style trigrams of one word: lower-cased and padded with two leading blanks and one trailing."""
+    padded = '  {} '.format(word.lower())
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+def words(text: Optional[str]) -> list[str]:
+    return _WORD_RE.findall(text or '')
+
+
+class TrigramIndex:
+    """Inverted trigram index over the words of a set of keyed documents."""
+
+    def __init__(self, documents):
+        self._word_keys = defaultdict(set)
+        self._postings = defaultdict(set)
+        for key, text in documents:
+            for word in words(text):
+                self._word_keys[word.lower()].add(key)
+        for word in self._word_keys:
+            for trigram in word_trigrams(word):
+                self._postings[trigram].add(word)
+
+    def search(self, word: str, threshold: float) -> dict:
+        """Map each matching key to its best similarity (0-1) with ``word``."""
+        query = word_trigrams(word)
+        shared = defaultdict(int)
+        for trigram in query:
+            for indexed_word in self._postings.get(trigram, ()):
+                shared[indexed_word] += 1
+        scores = {}
+        for indexed_word, count in shared.items():
+            score = count / len(query)
+            if score < threshold:
+                continue
+            for key in self._word_keys[indexed_word]:
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+        return scores
+
+
+class _ReviewIndexes:
+    def __init__(self, using: str):
+        self.built_at = time.monotonic()
+        self.titles = TrigramIndex(ReviewItem.objects.using(using).values_list('item_id', 'title').iterator())
+        self.tags = TrigramIndex(
+            Review.objects.using(using).exclude(review_tags__isnull=True).exclude(review_tags='')
+            .values_list('id', 'review_tags').iterator()
+        )
+
+
+def invalidate(**kwargs):
+    """Drop the in-process indexes (connected to review and item saves/deletes)."""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def _in_process_indexes(using: str) -> _ReviewIndexes:
+    max_age = getattr(settings, 'REVIEW_TRIGRAM_INDEX_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS)
+    key = (using, str(connections[using].settings_dict['NAME']))
+    with _indexes_lock:
+        indexes = _indexes.get(key)
+        if indexes is None or time.monotonic() - indexes.built_at > max_age:
+            indexes = _indexes[key] = _ReviewIndexes(using)
+    return indexes
+
+
+def _pg_trgm_available(connection) -> bool:
+    key = (connection.alias, str(connection.settings_dict['NAME']))
+    if key not in _pg_trgm_installed:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _pg_trgm_installed[key] = cursor.fetchone() is not None
+    return _pg_trgm_installed[key]
+
+
+def uses_pg_trgm(using: str='default') -> bool:
+    connection = connections[using]
+    return connection.vendor == 'postgresql' and _pg_trgm_available(connection)
+
+
+def uses_in_process_index(using: str='default') -> bool:
+    return connections[using].vendor == 'sqlite'
+
+
+def _warn_unavailable(using: str):
+    if using not in _warned_unavailable:
+        _warned_unavailable.add(using)
+        _logger.warning(
+            'Fuzzy review search needs pg_trgm on database "%s"; match=fuzzy runs as a regular search there.', using,
+        )
+
+
+def _apply_pg_trgm(reviews: QuerySet, query_words: list[str], rank: bool) -> QuerySet:
+    for word in query_words:
+        reviews = reviews.filter(
+            Q(review_item__title__trigram_word_similar=word) | Q(review_tags__trigram_word_similar=word)
+        )
+    if rank:
+        scores = [
+            Greatest(
+                TrigramWordSimilarity(Value(word), 'review_item__title'),
+                Coalesce(TrigramWordSimilarity(Value(word), 'review_tags'), Value(0.0)),
+            )
+            for word in query_words
+        ]
+        total = scores[0]
+        for score in scores[1:]:
+            total = total + score
+        reviews = reviews.annotate(search_rank=total)
+    return reviews
+
+
+def _score_case(field: str, scores: dict):
+    if not scores:
+        return Value(0.0)
+    return Case(
+        *[When(**{field: key}, then=Value(score)) for key, score in scores.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _apply_in_process(reviews: QuerySet, query_words: list[str], rank: bool) -> QuerySet:
+    threshold = getattr(settings, 'REVIEW_FUZZY_THRESHOLD', DEFAULT_THRESHOLD)
+    indexes = _in_process_indexes(reviews.db)
+    rank_terms = []
+    for word in query_words:
+        title_scores = indexes.titles.search(word, threshold)
+        tag_scores = indexes.tags.search(word, threshold)
+        reviews = reviews.filter(Q(review_item_id__in=list(title_scores)) | Q(pk__in=list(tag_scores)))
+        if rank:
+            rank_terms.append(Greatest(
+                _score_case('review_item_id', title_scores), _score_case('pk', tag_scores),
+                output_field=FloatField(),
+            ))
+    if rank:
+        total = rank_terms[0]
+        for term in rank_terms[1:]:
+            total = total + term
+        reviews = reviews.annotate(search_rank=total)
+    return reviews
+
+
+def apply_fuzzy_search(reviews: QuerySet, query: str, rank: bool=False) -> QuerySet:
+    """
+    Filter ``reviews`` to those whose item title or tags fuzzily match every word of ``query``.
+
+    With ``rank``, matches are annotated with ``search_rank``: the summed best
+    similarity of each word.
+    """
+    query_words = [word.lower() for word in words(query)]
+    if not query_words:
+        return reviews.none() if query.strip() else reviews
+    if uses_pg_trgm(reviews.db):
+        return _apply_pg_trgm(reviews, query_words, rank)
+    if uses_in_process_index(reviews.db):
+        return _apply_in_process(reviews, query_words, rank)
+    _warn_unavailable(reviews.db)
+    return review_search.apply_search(reviews, query, rank)
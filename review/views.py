@@ -1,9 +1,15 @@
-from django.db import IntegrityError
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
 from django.conf import settings
-from django.http import HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import generics
@@ -12,11 +18,18 @@ from rest_framework import serializers
 from rest_framework import status
 from rest_framework.settings import api_settings
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from .forms import ReviewForm
+from .pagination import InvalidCursor, ReviewCursorPagination
 from .serializers import ReviewItemSerializer, ReviewSerializer, ExternalLookupSerializer
-from .utils import api_utils, review_utils, metrics
+from .utils import (
+    api_utils, deadlines, federated_search, http_sessions, item_refresh, refresh_priority, review_counts,
+    review_list_cache, review_rows, review_utils, review_versions, metrics, search_cache, single_flight,
+)
 from .models import ReviewItem, Review
 from .permissions import IsOwnerOrReadOnly
 from .response_formatters import success_response, error_response
@@ -37,6 +50,79 @@ def _build_search_result_from_item(item_data):
         'year': item_data['year'],
     }
 
+def _upstream_error_payload(result) -> tuple[dict, int]:
+    if result.get('circuit_open') or result.get('rate_limited'):
+        return error_response(
+            code='UPSTREAM_UNAVAILABLE',
+            message=result.get('error', 'Upstream API temporarily unavailable.'),
+            details={'source': result.get('source', '')},
+        ), status.HTTP_503_SERVICE_UNAVAILABLE
+    if result.get('deadline_exceeded'):
+        return error_response(
+            code='UPSTREAM_TIMEOUT',
+            message=result.get('error', 'Upstream API call exceeded its time budget.'),
+            details={'source': result.get('source', '')},
+        ), status.HTTP_504_GATEWAY_TIMEOUT
+    return error_response(
+        code='UPSTREAM_ERROR',
+        message=result.get('error', 'Bad response from API.'),
+    ), status.HTTP_502_BAD_GATEWAY
+
+def _upstream_error_response(result):
+    payload, status_code = _upstream_error_payload(result)
+    return Response(payload, status=status_code)
+
+def _lookup_request_error(category, lookup_data) -> Optional[tuple[dict, int]]:
+    if category not in CATEGORY_TO_API:
+        return error_response(
+            code='INVALID_CATEGORY',
+            message='Invalid category.',
+        ), status.HTTP_400_BAD_REQUEST
+
+    lookup_serializer = ExternalLookupSerializer(data=lookup_data)
+    if not lookup_serializer.is_valid():
+        return error_response(
+            code='VALIDATION_ERROR',
+            message='Invalid lookup request.',
+            details=lookup_serializer.errors,
+        ), status.HTTP_400_BAD_REQUEST
+    return None
+
+def _persist_review_item(category, item_id, item_data) -> tuple[Optional[dict], dict]:
+    """Store fetched provider data as a ReviewItem; returns (item_json, serializer_errors)."""
+    item_data = dict(item_data)
+    item_data['category'] = category
+    now = timezone.now()
+    item_data['last_refreshed_at'] = now
+    item_data['last_refresh_attempt_at'] = now
+    item_data['refresh_error_count'] = 0
+    serializer = ReviewItemSerializer(data=item_data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    try:
+        with transaction.atomic():
+            serializer.save()
+    except IntegrityError:
+        # A concurrent request stored the same item first.
+        return ReviewItemSerializer(ReviewItem.objects.get(item_id=item_id)).data, {}
+    return serializer.data, {}
+
+def _stored_item_meta(review_item) -> dict:
+    """Build response meta for a stored item, queueing a background refresh if it is stale."""
+    refresh_priority.record_lookup_hit(review_item.item_id)
+    stale = item_refresh.is_stale(review_item)
+    api_obj = CATEGORY_TO_API.get(review_item.category)
+    if stale and api_obj is not None:
+        item_refresh.schedule_refresh(review_item, api_obj)
+    return {'version': '2.0', 'stale': stale}
+
+def _serialization_error_payload(errors) -> tuple[dict, int]:
+    return error_response(
+        code='SERIALIZATION_ERROR',
+        message='Failed to process item data.',
+        details=errors,
+    ), status.HTTP_400_BAD_REQUEST
+
 def health_check(request):
     """Health check endpoint for k8s probes. Returns 200 OK."""
     return HttpResponse("OK", status=200)
@@ -69,6 +155,28 @@ def view_profile(request, username):
 # API v2 Views - RFC-compliant response format
 # ============================================================================
 
+def _conditional_get(request, scopes):
+    """
+    Validators for a GET that depends on ``scopes`` (see review_versions).
+
+    Returns ``(etag, last_modified, not_modified)``; ``not_modified`` is a 304
+    to return as-is when the client's If-None-Match/If-Modified-Since match.
+    """
+    etag, last_modified = review_versions.validators(
+        scopes, request.accepted_media_type, sorted(request.query_params.lists()),
+    )
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        _set_validators(not_modified, etag, last_modified)
+    return etag, last_modified, not_modified
+
+
+def _set_validators(response, etag: str, last_modified: int):
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+
 class ReviewListCreateV2(generics.ListCreateAPIView):
     """
     List all reviews or create a new review.
@@ -80,6 +188,11 @@ class ReviewListCreateV2(generics.ListCreateAPIView):
     queryset = Review.objects.select_related('user', 'review_item').all()
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # What a bare fields=review_item returns (without expand=review_item): what feed cards show.
+    ITEM_CARD_FIELDS = ('item_id', 'category', 'title', 'image_url', 'year', 'rating')
+    selection = None
+    excerpts = ()
+    row_mapper = None
 
     class OutputSerializer(serializers.ModelSerializer):
         user = serializers.ReadOnlyField(source='user.username')
@@ -98,17 +211,43 @@ class ReviewListCreateV2(generics.ListCreateAPIView):
         summary='List reviews (v2)',
         parameters=[
             OpenApiParameter('query', str, OpenApiParameter.QUERY, required=False),
+            OpenApiParameter('match', str, OpenApiParameter.QUERY, required=False, description='fuzzy: typo-tolerant matching on titles and tags'),
             OpenApiParameter('username', str, OpenApiParameter.QUERY, required=False),
             OpenApiParameter('item_id', str, OpenApiParameter.QUERY, required=False, description='Filter by review item ID'),
             OpenApiParameter('categories', str, OpenApiParameter.QUERY, required=False, description='Comma-separated include list'),
             OpenApiParameter('exclude_categories', str, OpenApiParameter.QUERY, required=False, description='Comma-separated exclude list'),
-            OpenApiParameter('ordering', str, OpenApiParameter.QUERY, required=False),
+            OpenApiParameter('ordering', str, OpenApiParameter.QUERY, required=False, description='alpha, rating, date (prefix - to reverse) or relevance'),
             OpenApiParameter('limit', int, OpenApiParameter.QUERY, required=False),
             OpenApiParameter('offset', int, OpenApiParameter.QUERY, required=False),
+            OpenApiParameter('pagination', str, OpenApiParameter.QUERY, required=False, description='cursor: keyset pagination instead of limit/offset'),
+            OpenApiParameter('cursor', str, OpenApiParameter.QUERY, required=False, description='next_cursor or prev_cursor from a previous page'),
+            OpenApiParameter('include_count', str, OpenApiParameter.QUERY, required=False, description='true (default), estimate or false'),
+            OpenApiParameter('fields', str, OpenApiParameter.QUERY, required=False, description='Comma-separated output fields; review_item.<field> for item fields'),
+            OpenApiParameter('expand', str, OpenApiParameter.QUERY, required=False, description='review_item: every item field when fields lists review_item'),
+            OpenApiParameter('review_data', str, OpenApiParameter.QUERY, required=False, description='full (default) or excerpt'),
         ],
-        responses={200: dict},
+        responses={200: dict, 304: None},
     )
     def list(self, request, *args, **kwargs):
+        # Checked before any query: a 304 costs one cache read.
+        etag, last_modified, not_modified = _conditional_get(request, self._version_scopes(request.GET.get('username', '')))
+        if not_modified is not None:
+            return not_modified
+        # The ETag names this exact representation, so it doubles as the response cache key.
+        cacheable = review_list_cache.cacheable(request)
+        if cacheable:
+            cached = review_list_cache.get(etag)
+            if cached is not None:
+                return _set_validators(Response(cached), etag, last_modified)
+
+        response = self._list_response(request)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        if cacheable:
+            review_list_cache.store(etag, response.data)
+        return _set_validators(response, etag, last_modified)
+
+    def _list_response(self, request):
         query = request.GET.get('query', '')
         username = request.GET.get('username', '')
         item_id = request.GET.get('item_id', '')
@@ -116,6 +255,7 @@ class ReviewListCreateV2(generics.ListCreateAPIView):
         categories = request.GET.getlist('categories')
         exclude_categories = request.GET.getlist('exclude_categories')
         ordering = request.GET.get('ordering', '')
+        match = request.GET.get('match', '')
         reviews = review_utils.get_filtered_review_objects(
             query,
             username,
@@ -124,7 +264,30 @@ class ReviewListCreateV2(generics.ListCreateAPIView):
             categories,
             exclude_categories,
             item_id,
+            match,
         )
+        count_filters = {
+            'query': query,
+            'username': username,
+            'item_id': item_id,
+            'filter_categories': filter_categories,
+            'categories': categories,
+            'exclude_categories': exclude_categories,
+            'match': match,
+        }
+        count_mode = review_counts.parse_count_mode(request.GET.get('include_count'))
+        try:
+            self.selection, self.excerpts = self._output_options(request)
+        except review_rows.InvalidFields as exc:
+            return Response(
+                error_response(code='VALIDATION_ERROR', message=str(exc), details={exc.param: [str(exc)]}),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Rows are read as values() dicts when the output serializer can be compiled.
+        self.row_mapper = review_rows.mapper_for(self.OutputSerializer, self.selection, self.excerpts)
+        rows = self.row_mapper.project(reviews) if self.row_mapper else self._sparse_queryset(reviews)
+        if ReviewCursorPagination.requested(request):
+            return self._cursor_page(request, reviews, rows, ordering, count_filters, count_mode)
 
         paginator_class = api_settings.DEFAULT_PAGINATION_CLASS
         if paginator_class is None:
@@ -137,7 +300,10 @@ class ReviewListCreateV2(generics.ListCreateAPIView):
             )
 
         paginator = paginator_class()
-        page = paginator.paginate_queryset(reviews, request, view=self)
+        count, count_type = review_counts.count_reviews(
+            reviews, count_filters, self._version_scopes(count_filters['username']), count_mode,
+        )
+        page = paginator.paginate_queryset(rows, request, view=self, count=count)
         if page is None:
             return Response(
                 error_response(
@@ -147,17 +313,77 @@ class ReviewListCreateV2(generics.ListCreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        data = self.OutputSerializer(page, many=True).data
+        data = self._serialize_page(page)
         meta = {
             'version': '2.0',
             'pagination': {
-                'count': paginator.count,
+                'count': count,
+                'count_type': count_type,
                 'limit': paginator.get_limit(request),
                 'offset': paginator.get_offset(request),
             },
         }
         return Response(success_response(data, meta=meta))
 
+    @staticmethod
+    def _version_scopes(username: str) -> tuple:
+        reviews = review_versions.user_scope(username) if username else review_versions.SCOPE_REVIEWS
+        return (reviews, review_versions.SCOPE_ITEMS, review_versions.SCOPE_USERS)
+
+    def _output_options(self, request) -> tuple:
+        """``(selection, excerpts)`` from the fields, expand and review_data query parameters."""
+        selection = review_rows.select_fields(
+            self.OutputSerializer,
+            request.GET.get('fields', ''),
+            request.GET.get('expand', ''),
+            summaries={'review_item': self.ITEM_CARD_FIELDS},
+        )
+        review_data = request.GET.get('review_data', 'full')
+        if review_data not in ('full', 'excerpt'):
+            raise review_rows.InvalidFields('review_data', 'review_data must be full or excerpt.')
+        excerpts = ()
+        if review_data == 'excerpt' and (selection is None or 'review_data' in dict(selection)):
+            excerpts = (('review_data', getattr(settings, 'REVIEW_EXCERPT_LENGTH', 280)),)
+        return selection, excerpts
+
+    def _sparse_queryset(self, reviews):
+        """Serializer path: load only the selected columns, with their relations joined."""
+        mapper = review_rows.compiled(self.OutputSerializer, self.selection)
+        if self.selection is None or mapper is None:
+            return reviews
+        relations = {path.split('__')[0] for path in mapper.paths if '__' in path}
+        return reviews.select_related(*relations).only(*mapper.paths)
+
+    def _serialize_page(self, page) -> list:
+        if self.row_mapper:
+            return self.row_mapper.to_representation(page)
+        data = review_rows.prune_serializer(self.OutputSerializer(page, many=True), self.selection).data
+        for name, length in self.excerpts:
+            for row in data:
+                if row[name] is not None:
+                    row[name] = review_rows.excerpt(row[name], length)
+        return data
+
+    def _cursor_page(self, request, reviews, rows, ordering, count_filters, count_mode):
+        keys = review_utils.ordering_keys(reviews, ordering) or review_utils.DEFAULT_CURSOR_KEYS
+        paginator = ReviewCursorPagination()
+        try:
+            page = paginator.paginate_queryset(rows, request, ordering, keys)
+        except InvalidCursor as exc:
+            return Response(
+                error_response(code='VALIDATION_ERROR', message=str(exc), details={'cursor': [str(exc)]}),
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        count, count_type = review_counts.count_reviews(
+            reviews, count_filters, self._version_scopes(count_filters['username']), count_mode,
+        )
+        data = self._serialize_page(page)
+        meta = {
+            'version': '2.0',
+            'pagination': {'count': count, 'count_type': count_type, **paginator.get_pagination_meta()},
+        }
+        return Response(success_response(data, meta=meta))
+
     @extend_schema(
         tags=['reviews'],
         summary='Create review (v2)',
@@ -207,10 +433,14 @@ class ReviewDetailV2(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
-    @extend_schema(tags=['reviews'], summary='Get review by id (v2)', responses={200: dict, 404: dict})
+    @extend_schema(tags=['reviews'], summary='Get review by id (v2)', responses={200: dict, 304: None, 404: dict})
     def retrieve(self, request, *args, **kwargs):
+        scopes = (review_versions.review_scope(kwargs[self.lookup_field]), review_versions.SCOPE_USERS)
+        etag, last_modified, not_modified = _conditional_get(request, scopes)
+        if not_modified is not None:
+            return not_modified
         response = super().retrieve(request, *args, **kwargs)
-        return Response(success_response(response.data, meta={"version": "2.0"}))
+        return _set_validators(Response(success_response(response.data, meta={"version": "2.0"})), etag, last_modified)
 
     @extend_schema(tags=['reviews'], summary='Update review by id (v2)', request=ReviewSerializer, responses={200: dict, 400: dict, 403: dict, 404: dict})
     def update(self, request, *args, **kwargs):
@@ -241,29 +471,14 @@ class SearchItemV2(APIView):
             OpenApiParameter(name='category', type=str, location=OpenApiParameter.PATH),
             OpenApiParameter(name='q', type=str, location=OpenApiParameter.QUERY),
         ],
-        responses={200: dict, 400: dict, 403: dict, 502: dict},
+        responses={200: dict, 400: dict, 403: dict, 502: dict, 503: dict, 504: dict},
     )
     def get(self, request, category):
-        if category not in CATEGORY_TO_API:
-            return Response(
-                error_response(
-                    code='INVALID_CATEGORY',
-                    message='Invalid category.',
-                ),
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         search_term = request.query_params.get('q', '')
-        lookup_serializer = ExternalLookupSerializer(data={'search_term': search_term})
-        if not lookup_serializer.is_valid():
-            return Response(
-                error_response(
-                    code='VALIDATION_ERROR',
-                    message='Invalid lookup request.',
-                    details=lookup_serializer.errors,
-                ),
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        request_error = _lookup_request_error(category, {'search_term': search_term})
+        if request_error is not None:
+            payload, status_code = request_error
+            return Response(payload, status=status_code)
 
         api_obj = CATEGORY_TO_API[category]
         normalized_item_id = None
@@ -271,31 +486,82 @@ class SearchItemV2(APIView):
             normalized_item_id = api_utils.normalize_imdb_title_url_to_item_id(search_term)
 
         if normalized_item_id is not None:
-            result = api_obj.get_details(normalized_item_id)
+            with deadlines.deadline_scope(settings.LOOKUP_SEARCH_DEADLINE_SECONDS):
+                result = api_obj.get_details(normalized_item_id)
             if result.get('response') == 'False':
-                return Response(
-                    error_response(
-                        code='UPSTREAM_ERROR',
-                        message=result.get('error', 'Bad response from API.'),
-                    ),
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
+                return _upstream_error_response(result)
             return Response(
                 success_response([_build_search_result_from_item(result)], meta={'version': '2.0'}),
             )
 
-        result = api_obj.search(search_term)
+        with deadlines.deadline_scope(settings.LOOKUP_SEARCH_DEADLINE_SECONDS):
+            result, cache_status = search_cache.cached_search(
+                category,
+                getattr(api_obj, 'source_name', category),
+                search_term,
+                api_obj.search,
+            )
         if result.get('response') == 'False':
+            return _upstream_error_response(result)
+
+        return Response(
+            success_response(result.get('results', []), meta={'version': '2.0', 'cache': cache_status}),
+        )
+
+
+class FederatedSearchV2(APIView):
+    """Search all external providers concurrently and merge the results (v2 format)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        tags=['lookup'],
+        summary='Search external review items across categories (v2)',
+        parameters=[
+            OpenApiParameter(name='q', type=str, location=OpenApiParameter.QUERY),
+            OpenApiParameter('categories', str, OpenApiParameter.QUERY, required=False, description='Comma-separated include list'),
+        ],
+        responses={200: dict, 400: dict, 403: dict, 502: dict, 503: dict, 504: dict},
+    )
+    def get(self, request):
+        search_term = request.query_params.get('q', '')
+        categories = [
+            part.strip()
+            for value in request.query_params.getlist('categories')
+            for part in value.split(',')
+            if part.strip()
+        ] or list(CATEGORY_TO_API)
+        for category in categories:
+            request_error = _lookup_request_error(category, {'search_term': search_term})
+            if request_error is not None:
+                payload, status_code = request_error
+                return Response(payload, status=status_code)
+
+        providers = {category: CATEGORY_TO_API[category] for category in dict.fromkeys(categories)}
+        results, provider_status = federated_search.federated_search(search_term, providers)
+
+        statuses = {provider['status'] for provider in provider_status.values()}
+        if federated_search.STATUS_OK not in statuses:
+            if statuses == {federated_search.STATUS_UNAVAILABLE}:
+                code, status_code = 'UPSTREAM_UNAVAILABLE', status.HTTP_503_SERVICE_UNAVAILABLE
+            elif statuses == {federated_search.STATUS_TIMEOUT}:
+                code, status_code = 'UPSTREAM_TIMEOUT', status.HTTP_504_GATEWAY_TIMEOUT
+            else:
+                code, status_code = 'UPSTREAM_ERROR', status.HTTP_502_BAD_GATEWAY
             return Response(
                 error_response(
-                    code='UPSTREAM_ERROR',
-                    message=result.get('error', 'Bad response from API.'),
+                    code=code,
+                    message='No external provider returned results.',
+                    details={'providers': provider_status},
                 ),
-                status=status.HTTP_502_BAD_GATEWAY,
+                status=status_code,
             )
 
         return Response(
-            success_response(result.get('results', []), meta={'version': '2.0'}),
+            success_response(results, meta={
+                'version': '2.0',
+                'partial': statuses != {federated_search.STATUS_OK},
+                'providers': provider_status,
+            }),
         )
 
 
@@ -310,65 +576,191 @@ class GetItemInfoV2(APIView):
             OpenApiParameter(name='category', type=str, location=OpenApiParameter.PATH),
             OpenApiParameter(name='item_id', type=str, location=OpenApiParameter.PATH),
         ],
-        responses={200: dict, 400: dict, 403: dict, 502: dict},
+        responses={200: dict, 400: dict, 403: dict, 502: dict, 503: dict, 504: dict},
     )
     def get(self, request, category, item_id):
-        if category not in CATEGORY_TO_API:
-            return Response(
-                error_response(
-                    code='INVALID_CATEGORY',
-                    message='Invalid category.',
-                ),
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        lookup_serializer = ExternalLookupSerializer(data={'item_id': item_id})
-        if not lookup_serializer.is_valid():
-            return Response(
-                error_response(
-                    code='VALIDATION_ERROR',
-                    message='Invalid lookup request.',
-                    details=lookup_serializer.errors,
-                ),
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        request_error = _lookup_request_error(category, {'item_id': item_id})
+        if request_error is not None:
+            payload, status_code = request_error
+            return Response(payload, status=status_code)
 
         try:
             review_item = ReviewItem.objects.get(item_id=item_id)
+            # Serve what we have, even if stale; a refresh runs in the background.
             return Response(
-                success_response(ReviewItemSerializer(review_item).data, meta={'version': '2.0'}),
+                success_response(ReviewItemSerializer(review_item).data, meta=_stored_item_meta(review_item)),
             )
         except ReviewItem.DoesNotExist:
             pass
 
         api_obj = CATEGORY_TO_API[category]
-        item_data = api_obj.get_details(item_id)
+        with deadlines.deadline_scope(settings.LOOKUP_DETAILS_DEADLINE_SECONDS):
+            item_data, coalesced = single_flight.coalesce(
+                single_flight.details_key(item_id),
+                lambda: api_obj.get_details(item_id),
+                source_name=getattr(api_obj, 'source_name', category),
+            )
         if item_data.get('response') == 'False':
-            return Response(
-                error_response(
-                    code='UPSTREAM_ERROR',
-                    message=item_data.get('error', 'Bad response from API.'),
-                ),
-                status=status.HTTP_502_BAD_GATEWAY,
+            return _upstream_error_response(item_data)
+
+        if coalesced:
+            # The leading request has usually persisted the row already.
+            review_item = ReviewItem.objects.filter(item_id=item_id).first()
+            if review_item is not None:
+                return Response(
+                    success_response(ReviewItemSerializer(review_item).data, meta={'version': '2.0', 'stale': False}),
+                )
+
+        item_json, errors = _persist_review_item(category, item_id, item_data)
+        if item_json is None:
+            payload, status_code = _serialization_error_payload(errors)
+            return Response(payload, status=status_code)
+        return Response(
+            success_response(item_json, meta={'version': '2.0', 'stale': False}),
+        )
+
+
+# ============================================================================
+# API v2 Async Lookup Views - ASGI variants of the lookup endpoints
+# ============================================================================
+
+async def _aauthentication_error(request) -> Optional[JsonResponse]:
+    """
+    The response the sync lookup views give an unauthenticated request, or None.
+
+    Mirrors APIView.permission_denied/handle_exception: NotAuthenticated or the
+    token's AuthenticationFailed, rendered by the configured exception handler
+    with the JWT challenge, so both variants return the same status and body.
+    """
+    user = await request.auser()
+    if user.is_authenticated:
+        return None
+    authenticator = JWTAuthentication()
+    try:
+        authenticated = await sync_to_async(authenticator.authenticate)(request)
+    except AuthenticationFailed as exc:
+        error = exc
+    else:
+        if authenticated is not None:
+            return None
+        error = NotAuthenticated()
+    error.auth_header = authenticator.authenticate_header(request)
+    response = api_settings.EXCEPTION_HANDLER(error, {'request': request})
+    return JsonResponse(
+        response.data,
+        status=response.status_code,
+        headers={'WWW-Authenticate': response['WWW-Authenticate']},
+    )
+
+
+class _AsyncLookupView(View):
+    """
+    Base for the async lookup views.
+
+    Under WSGI, Django runs each async view on a fresh event loop that is
+    discarded afterwards, so the upstream sessions opened on it can never be
+    reused: close them before the loop goes away. Under ASGI they stay pooled
+    on the server's loop.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        finally:
+            if not isinstance(request, ASGIRequest):
+                await http_sessions.close_async_sessions()
+
+
+class SearchItemAsyncV2(_AsyncLookupView):
+    """
+    Async variant of SearchItemV2.
+
+    Served under ASGI, upstream waits do not hold a worker thread, so one
+    worker can keep many provider lookups in flight.
+    """
+
+    async def get(self, request, category):
+        authentication_error = await _aauthentication_error(request)
+        if authentication_error is not None:
+            return authentication_error
+
+        search_term = request.GET.get('q', '')
+        request_error = _lookup_request_error(category, {'search_term': search_term})
+        if request_error is not None:
+            payload, status_code = request_error
+            return JsonResponse(payload, status=status_code)
+
+        api_obj = CATEGORY_TO_API[category]
+        normalized_item_id = None
+        if category == 'movie':
+            normalized_item_id = api_utils.normalize_imdb_title_url_to_item_id(search_term)
+
+        if normalized_item_id is not None:
+            with deadlines.deadline_scope(settings.LOOKUP_SEARCH_DEADLINE_SECONDS):
+                result = await api_obj.get_details_async(normalized_item_id)
+            if result.get('response') == 'False':
+                payload, status_code = _upstream_error_payload(result)
+                return JsonResponse(payload, status=status_code)
+            return JsonResponse(
+                success_response([_build_search_result_from_item(result)], meta={'version': '2.0'}),
             )
 
-        item_data['category'] = category
-        now = timezone.now()
-        item_data['last_refreshed_at'] = now
-        item_data['last_refresh_attempt_at'] = now
-        item_data['refresh_error_count'] = 0
-        serializer = ReviewItemSerializer(data=item_data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(
-                success_response(serializer.data, meta={'version': '2.0'}),
+        with deadlines.deadline_scope(settings.LOOKUP_SEARCH_DEADLINE_SECONDS):
+            result, cache_status = await search_cache.cached_search_async(
+                category,
+                getattr(api_obj, 'source_name', category),
+                search_term,
+                api_obj.search_async,
             )
+        if result.get('response') == 'False':
+            payload, status_code = _upstream_error_payload(result)
+            return JsonResponse(payload, status=status_code)
 
-        return Response(
-            error_response(
-                code='SERIALIZATION_ERROR',
-                message='Failed to process item data.',
-                details=serializer.errors,
-            ),
-            status=status.HTTP_400_BAD_REQUEST,
+        return JsonResponse(
+            success_response(result.get('results', []), meta={'version': '2.0', 'cache': cache_status}),
         )
+
+
+class GetItemInfoAsyncV2(_AsyncLookupView):
+    """Async variant of GetItemInfoV2."""
+
+    async def get(self, request, category, item_id):
+        authentication_error = await _aauthentication_error(request)
+        if authentication_error is not None:
+            return authentication_error
+
+        request_error = _lookup_request_error(category, {'item_id': item_id})
+        if request_error is not None:
+            payload, status_code = request_error
+            return JsonResponse(payload, status=status_code)
+
+        review_item = await ReviewItem.objects.filter(item_id=item_id).afirst()
+        if review_item is not None:
+            meta = await sync_to_async(_stored_item_meta)(review_item)
+            return JsonResponse(
+                success_response(ReviewItemSerializer(review_item).data, meta=meta),
+            )
+
+        api_obj = CATEGORY_TO_API[category]
+        with deadlines.deadline_scope(settings.LOOKUP_DETAILS_DEADLINE_SECONDS):
+            item_data, coalesced = await single_flight.coalesce_async(
+                single_flight.details_key(item_id),
+                lambda: api_obj.get_details_async(item_id),
+                source_name=getattr(api_obj, 'source_name', category),
+            )
+        if item_data.get('response') == 'False':
+            payload, status_code = _upstream_error_payload(item_data)
+            return JsonResponse(payload, status=status_code)
+
+        if coalesced:
+            review_item = await ReviewItem.objects.filter(item_id=item_id).afirst()
+            if review_item is not None:
+                return JsonResponse(
+                    success_response(ReviewItemSerializer(review_item).data, meta={'version': '2.0', 'stale': False}),
+                )
+
+        item_json, errors = await sync_to_async(_persist_review_item)(category, item_id, item_data)
+        if item_json is None:
+            payload, status_code = _serialization_error_payload(errors)
+            return JsonResponse(payload, status=status_code)
+        return JsonResponse(success_response(item_json, meta={'version': '2.0', 'stale': False}))
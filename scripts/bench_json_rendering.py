@@ -0,0 +1,112 @@
+"""
+Render and parse throughput: DRF's stdlib JSON classes vs the orjson-backed ones.
+
+Payloads are built in memory: a v2 review list page (``--page-size`` rows shaped
+like OutputSerializer output) and an item lookup response with a long upstream
+description. Both renderers must produce identical bytes. Run from the repo root:
+
+    python scripts/bench_json_rendering.py --page-size 100 --description-chars 20000
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'critic.settings.test')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('OMDB_API_KEY', 'bench')
+os.environ.setdefault('RAWG_API_KEY', 'bench')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from review import renderers  # noqa: E402
+
+REFRESHED_AT = datetime(2024, 3, 1, 12, 30, 15, 250000, tzinfo=dt_timezone.utc)
+
+
+def item(index: int, description: str) -> dict:
+    return {
+        'item_id': 'tt{:07d}'.format(index),
+        'category': 'movie',
+        'title': 'Synthetic title {}'.format(index),
+        'image_url': 'https://example.com/posters/{}.jpg'.format(index),
+        'year': '2021',
+        'attr1': 'Director Name',
+        'attr2': 'Drama, Sci-Fi',
+        'attr3': 'Actor One, Actor Two, Actor Three',
+        'description': description,
+        'rating': '8.1',
+        'last_refreshed_at': REFRESHED_AT + timedelta(minutes=index),
+        'last_refresh_attempt_at': REFRESHED_AT,
+        'refresh_error_count': 0,
+    }
+
+
+def list_payload(page_size: int) -> dict:
+    rows = [{
+        'id': index,
+        'user': 'user{}'.format(index % 50),
+        'review_item': item(index, 'A short plot summary for the card view. ' * 5),
+        'review_rating': '{:.2f}'.format(index % 10 + 0.5),
+        'review_data': 'Review text with ünïcode and “quotes”. ' * 40,
+        'review_tags': 'favourite,rewatch',
+        'modified_date': date(2024, 1, 1) + timedelta(days=index),
+    } for index in range(page_size)]
+    meta = {'version': '2.0', 'pagination': {'count': 5000, 'count_type': 'exact', 'limit': page_size, 'offset': 0}}
+    return {'data': rows, 'meta': meta}
+
+
+def lookup_payload(description_chars: int) -> dict:
+    description = ('An upstream description blob, repeated. ' * (description_chars // 40 + 1))[:description_chars]
+    return {'data': item(1, description), 'meta': {'version': '2.0', 'stale': False}}
+
+
+def rate(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return 1 / statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--description-chars', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    if renderers.orjson is None:
+        raise SystemExit('orjson is not installed; both paths would be the DRF classes.')
+    context = {'encoding': 'utf-8'}
+    print('{:<8} {:>10} {:<8} {:>12} {:>12} {:>8}'.format('payload', 'bytes', 'op', 'drf/s', 'orjson/s', 'speedup'))
+    for name, payload in (('list', list_payload(args.page_size)), ('lookup', lookup_payload(args.description_chars))):
+        body = JSONRenderer().render(payload)
+        if renderers.FastJSONRenderer().render(payload) != body:
+            raise SystemExit('Rendered output differs for the {} payload'.format(name))
+        operations = (
+            ('render', lambda: JSONRenderer().render(payload), lambda: renderers.FastJSONRenderer().render(payload)),
+            ('parse', lambda: JSONParser().parse(io.BytesIO(body), parser_context=context),
+             lambda: renderers.FastJSONParser().parse(io.BytesIO(body), parser_context=context)),
+        )
+        for operation, drf, fast in operations:
+            drf_rate, fast_rate = rate(drf, args.repeat), rate(fast, args.repeat)
+            print('{:<8} {:>10} {:<8} {:>12.0f} {:>12.0f} {:>7.1f}x'.format(
+                name, len(body), operation, drf_rate, fast_rate, fast_rate / drf_rate,
+            ))
+
+
+if __name__ == '__main__':
+    main()
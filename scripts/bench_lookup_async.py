@@ -0,0 +1,150 @@
+"""
+Compare sync vs async upstream lookup throughput against a local fake OMDB.
+
+The fake upstream answers every request after a fixed delay, so the numbers
+show how many lookups each client style keeps in flight rather than how fast
+OMDB is. Run from the repo root:
+
+    python scripts/bench_lookup_async.py --requests 200 --concurrency 50 --latency-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'critic.settings.test')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('OMDB_API_KEY', 'bench')
+os.environ.setdefault('RAWG_API_KEY', 'bench')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.utils import override_settings  # noqa: E402
+
+from review.utils import api_utils, http_sessions  # noqa: E402
+
+OMDB_DETAILS = {
+    'Response': 'True',
+    'imdbID': 'tt0133093',
+    'Title': 'The Matrix',
+    'Poster': 'https://example.com/poster.jpg',
+    'Year': '1999',
+    'Director': 'Lana Wachowski, Lilly Wachowski',
+    'Writer': 'Lana Wachowski, Lilly Wachowski',
+    'Type': 'movie',
+    'Genre': 'Action, Sci-Fi',
+    'Actors': 'Keanu Reeves',
+    'Plot': 'A hacker learns the truth.',
+    'imdbRating': '8.7',
+}
+
+
+class _FakeOMDBHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency_seconds = 0.1
+
+    def do_GET(self):
+        time.sleep(self.latency_seconds)
+        body = json.dumps(OMDB_DETAILS).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _FakeUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 stalls bursts of new connections.
+    request_queue_size = 1024
+
+
+def _start_fake_upstream(latency_seconds: float) -> ThreadingHTTPServer:
+    handler = type('Handler', (_FakeOMDBHandler,), {'latency_seconds': latency_seconds})
+    server = _FakeUpstreamServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _build_api(server: ThreadingHTTPServer) -> api_utils.OMDBItemAPI:
+    api = api_utils.OMDBItemAPI()
+    api._base_url = 'http://127.0.0.1:{}/?apikey=bench'.format(server.server_address[1])
+    return api
+
+
+def run_sync(api, total: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: api.get_details('omdb_tt0133093'), range(total)))
+    elapsed = time.perf_counter() - started
+    _check(results)
+    return elapsed
+
+
+async def _run_async(api, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await api.get_details_async('omdb_tt0133093')
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    await http_sessions.close_async_sessions()
+    _check(results)
+    return elapsed
+
+
+def run_async(api, total: int, concurrency: int) -> float:
+    return asyncio.run(_run_async(api, total, concurrency))
+
+
+def _check(results):
+    failures = [result for result in results if result.get('response') != 'True']
+    if failures:
+        raise SystemExit('{} lookups failed, first error: {}'.format(len(failures), failures[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = _start_fake_upstream(args.latency_ms / 1000.0)
+    api = _build_api(server)
+    # Size both client pools for the requested concurrency and keep the
+    # breaker out of the measurement.
+    with override_settings(
+        UPSTREAM_HTTP_POOL_MAXSIZE=args.concurrency,
+        UPSTREAM_ASYNC_HTTP_MAX_CONNECTIONS=args.concurrency,
+        UPSTREAM_CIRCUIT_BREAKER_ENABLED=False,
+    ):
+        http_sessions.close_sessions()
+        sync_elapsed = run_sync(api, args.requests, args.concurrency)
+        async_elapsed = run_async(api, args.requests, args.concurrency)
+    server.shutdown()
+
+    print('requests={} concurrency={} upstream_latency_ms={}'.format(args.requests, args.concurrency, args.latency_ms))
+    for label, elapsed in (('sync (threads)', sync_elapsed), ('async (asyncio)', async_elapsed)):
+        print('{:<16} {:>8.2f}s {:>10.1f} req/s'.format(label, elapsed, args.requests / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Time the first page of ``ordering=alpha`` with in-Python sorting vs the database sort.
+
+The old implementation loaded every filtered review and sorted the list in
+Python before the paginator sliced it. This builds a throwaway test database
+(see bench_review_search.py for backends), fills it with synthetic reviews and
+compares both ways of fetching one page, including peak Python memory. Run
+from the repo root:
+
+    python scripts/bench_review_ordering.py --reviews 100000
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from bench_review_search import populate
+
+from django.db import connection
+
+from review.models import Review
+from review.utils import review_utils
+
+
+def python_sorted_page(ordering: str, page_size: int) -> list:
+    reviews = list(Review.objects.select_related('review_item'))
+    reviews.sort(key=lambda review: review.review_item.title, reverse=ordering.startswith('-'))
+    return reviews[:page_size]
+
+
+def database_sorted_page(ordering: str, page_size: int) -> list:
+    return list(review_utils.get_filtered_review_objects(ordering=ordering)[:page_size])
+
+
+def measure(fetch, ordering: str, page_size: int, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fetch(ordering, page_size)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fetch(ordering, page_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        populate(args.reviews, args.users, args.seed)
+        print('reviews={} vendor={} page_size={}'.format(Review.objects.count(), connection.vendor, args.page_size))
+        print('{:<8} {:<10} {:>10} {:>10}'.format('ordering', 'sort', 'time (ms)', 'peak (MB)'))
+        for ordering in ('alpha', '-alpha'):
+            for label, fetch in (('python', python_sorted_page), ('database', database_sorted_page)):
+                seconds, peak_mb = measure(fetch, ordering, args.page_size, args.repeat)
+                print('{:<8} {:<10} {:>10.1f} {:>10.1f}'.format(ordering, label, seconds * 1000, peak_mb))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Compare review list search backends: the original icontains scan vs full-text search.
+
+Builds a throwaway test database (SQLite FTS5 with the default test settings,
+PostgreSQL tsvector/GIN with ``DJANGO_SETTINGS_MODULE=critic.settings.development``),
+fills it with synthetic reviews and times ``get_filtered_review_objects``
+for a few queries with each backend. Run from the repo root:
+
+    python scripts/bench_review_search.py --reviews 50000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'critic.settings.test')
+os.environ.setdefault('SECRET_KEY', 'bench-secret')
+os.environ.setdefault('OMDB_API_KEY', 'bench')
+os.environ.setdefault('RAWG_API_KEY', 'bench')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from review.models import Review, ReviewItem  # noqa: E402
+from review.utils import review_search, review_utils  # noqa: E402
+
+SYLLABLES = 'ka lo mi ne ru sa ti vo ze an el is or um ba de fi go hu'.split()
+# Every two- and three-syllable combination: a 7,600 word vocabulary.
+WORDS = [a + b for a in SYLLABLES for b in SYLLABLES]
+WORDS += [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+# Word frequencies follow Zipf's law, like natural text.
+WEIGHTS = [1.0 / rank for rank in range(1, len(WORDS) + 1)]
+QUERIES = (
+    ('common word', WORDS[2]),
+    ('mid word', WORDS[300]),
+    ('rare word', WORDS[1500]),
+    ('two words', '{} {}'.format(WORDS[10], WORDS[40])),
+    ('prefix', WORDS[700][:3]),
+    ('no match', 'qqqq'),
+)
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choices(WORDS, weights=WEIGHTS, k=words))
+
+
+def populate(reviews: int, users: int, seed: int):
+    rng = random.Random(seed)
+    user_model = get_user_model()
+    user_objs = user_model.objects.bulk_create(
+        [user_model(username='bench{}'.format(index)) for index in range(users)]
+    )
+    items_count = max(reviews // users, 1)
+    items = ReviewItem.objects.bulk_create([
+        ReviewItem(
+            item_id='bench_{}'.format(index),
+            category=rng.choice(('movie', 'game', 'anime', 'manga')),
+            title=_text(rng, 3).title(),
+            image_url='https://example.com/{}.jpg'.format(index),
+            year=str(rng.randint(1950, 2025)),
+            attr1=_text(rng, 2),
+            attr2=_text(rng, 2),
+            attr3=_text(rng, 2),
+            description=_text(rng, 40),
+            rating='7.0',
+        )
+        for index in range(items_count)
+    ], batch_size=1000)
+    Review.objects.bulk_create([
+        Review(
+            user=user,
+            review_item=item,
+            review_rating=rng.randint(0, 10),
+            review_data=_text(rng, 20),
+            review_tags=','.join(rng.choices(WORDS, weights=WEIGHTS, k=2)),
+        )
+        for user in user_objs
+        for item in items
+    ][:reviews], batch_size=1000)
+
+
+def time_query(query: str, ordering: str, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        reviews = review_utils.get_filtered_review_objects(query=query, ordering=ordering)
+        list(reviews[:20])
+        count = reviews.count()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        populate(args.reviews, args.users, args.seed)
+        full_text = review_search.backend_for()
+        print('reviews={} backend={} vendor={}'.format(Review.objects.count(), full_text, connection.vendor))
+        print('{:<14} {:<16} {:>13} {:>10} {:>10} {:>8}'.format(
+            'query', 'text', 'matches', 'like (ms)', 'fts (ms)', 'speedup',
+        ))
+        for label, query in QUERIES:
+            with override_settings(REVIEW_SEARCH_BACKEND=review_search.BACKEND_LIKE):
+                like_seconds, like_count = time_query(query, '-date', args.repeat)
+            fts_seconds, fts_count = time_query(query, 'relevance', args.repeat)
+            print('{:<14} {:<16} {:>13} {:>10.1f} {:>10.1f} {:>7.1f}x'.format(
+                label, query, '{}/{}'.format(fts_count, like_count), like_seconds * 1000, fts_seconds * 1000,
+                like_seconds / fts_seconds if fts_seconds else float('inf'),
+            ))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
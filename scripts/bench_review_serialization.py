@@ -0,0 +1,75 @@
+"""
+Rows per second for v2 review list pages: DRF OutputSerializer vs the values() row mapper.
+
+Builds a throwaway test database (see bench_review_search.py for backends),
+fills it with synthetic reviews and serializes pages of ``--page-size`` rows
+both ways, query included. The list view loaded relations per row; the
+``serializer+join`` line isolates the DRF cost with the relations joined.
+Run from the repo root:
+
+    python scripts/bench_review_serialization.py --reviews 5000 --page-size 100
+"""
+
+import argparse
+import statistics
+import time
+
+from bench_review_search import populate
+
+from django.db import connection
+
+from review.models import Review
+from review.utils import review_rows, review_utils
+from review.views import ReviewListCreateV2
+
+
+def serializer_page(reviews, page_size: int) -> list:
+    return ReviewListCreateV2.OutputSerializer(list(reviews[:page_size]), many=True).data
+
+
+def joined_serializer_page(reviews, page_size: int) -> list:
+    return serializer_page(reviews.select_related('user', 'review_item'), page_size)
+
+
+def mapper_page(reviews, page_size: int) -> list:
+    mapper = review_rows.mapper_for(ReviewListCreateV2.OutputSerializer)
+    return mapper.to_representation(list(mapper.project(reviews)[:page_size]))
+
+
+def measure(serialize, reviews, page_size: int, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(reviews, page_size)
+        timings.append(time.perf_counter() - started)
+    return page_size / statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reviews', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        populate(args.reviews, args.users, args.seed)
+        print('reviews={} vendor={} page_size={}'.format(Review.objects.count(), connection.vendor, args.page_size))
+        print('{:<8} {:<16} {:>12}'.format('ordering', 'path', 'rows/s'))
+        for ordering in ('-date', 'alpha'):
+            reviews = review_utils.get_filtered_review_objects(ordering=ordering)
+            if serializer_page(reviews, args.page_size) != mapper_page(reviews, args.page_size):
+                raise SystemExit('Serializer and mapper output differ for ordering={}'.format(ordering))
+            paths = (('serializer', serializer_page), ('serializer+join', joined_serializer_page), ('values', mapper_page))
+            for label, serialize in paths:
+                rate = measure(serialize, reviews, args.page_size, args.repeat)
+                print('{:<8} {:<16} {:>12.0f}'.format(ordering, label, rate))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
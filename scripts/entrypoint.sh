@@ -11,6 +11,7 @@ fi
 if [ "${DJANGO_MIGRATE:-0}" = "1" ]; then
   echo "Running migrations..."
   python manage.py migrate --noinput
+  python manage.py createcachetable
 fi
 
 if [ "${DJANGO_SEED:-0}" = "1" ]; then